@@ -0,0 +1,253 @@
+"""Load-test every API endpoint and report throughput and latency percentiles.
+
+Each scenario sends `--requests` requests with `--concurrency` in flight, with
+query parameters drawn from the seeded corpus (see `seed_corpus.py`), and the
+results are written as JSON. Pass `--baseline` with an earlier result file to
+flag scenarios whose p95 latency or throughput regressed.
+
+Usage:
+    python benchmarks/bench_load.py --base-url http://localhost:8000 --output results.json
+    python benchmarks/bench_load.py --in-process --baseline baseline.json --max-regression 0.2
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+import httpx
+sys.path.append(str(Path(__file__).parent.parent))  # Add project root to path
+
+OBJECT_CLASSES = ["bottle", "syringe", "person", "pill"]
+SEARCH_TERMS = ["para", "panadol", "amox", "vitamin", "insulin", "ፓራ", "ዋጋ", "delivery", "bole pharmacy"]
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return None
+    rank = max(int(round(pct / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def build_scenarios(channels: list, cursor: str, rng: random.Random, days: int) -> dict:
+    """Request generators for every endpoint, keyed by scenario name.
+
+    Args:
+        channels (list): Channel names to sample from
+        cursor (str): `next_cursor` of the first message page, for the keyset page scenario
+        rng (random.Random): Seeded generator for the sampled parameters
+        days (int): Date range the corpus was seeded over
+
+    Returns:
+        dict: Scenario name to a callable returning (path, params) for one request
+    """
+    today = date.today()
+
+    def date_range():
+        end = today - timedelta(days=rng.randint(0, days // 2))
+        return (end - timedelta(days=rng.randint(1, 90))).isoformat(), end.isoformat()
+
+    def messages_filtered():
+        start, end = date_range()
+        return "/messages/", {"channel": rng.choice(channels), "start_date": start, "end_date": end, "limit": 100}
+
+    def channel_activity_batch():
+        start, end = date_range()
+        return "/api/channels/activity", {
+            "channels": ",".join(rng.sample(channels, min(len(channels), rng.randint(2, 10)))),
+            "start_date": start, "end_date": end, "bucket": rng.choice(["day", "week", "month"])
+        }
+
+    def top_products():
+        start, end = date_range()
+        return "/api/reports/top-products", {"limit": 10, "start_date": start, "end_date": end}
+
+    def detection_summary():
+        start, end = date_range()
+        return "/api/detections/summary", {
+            "object_class": rng.choice(OBJECT_CLASSES), "min_confidence": rng.choice([0.5, 0.7, 0.9]),
+            "start_date": start, "end_date": end
+        }
+
+    return {
+        "messages": lambda: ("/messages/", {"limit": 100}),
+        "messages_next_page": lambda: ("/messages/", {"limit": 100, "cursor": cursor}),
+        "messages_filtered": messages_filtered,
+        "channels": lambda: ("/channels/", {"limit": 100}),
+        "image_detections": lambda: ("/image-detections/", {
+            "object_class": rng.choice(OBJECT_CLASSES), "min_confidence": 0.5, "limit": 100
+        }),
+        "top_products": top_products,
+        "channel_activity": lambda: (f"/api/channels/{rng.choice(channels)}/activity", {}),
+        "channel_activity_batch": channel_activity_batch,
+        "search_messages": lambda: ("/api/search/messages", {"query": rng.choice(SEARCH_TERMS), "limit": 20}),
+        "detection_summary": detection_summary,
+        "detection_summary_unaligned": lambda: ("/api/detections/summary", {
+            "min_confidence": round(rng.uniform(0.5, 0.9), 3)
+        }),
+        "export_messages_ndjson": lambda: ("/export/messages", {
+            "channel": rng.choice(channels), "start_date": (today - timedelta(days=30)).isoformat()
+        }),
+        "export_detections_csv": lambda: ("/export/image-detections", {
+            "format": "csv", "channel": rng.choice(channels), "start_date": (today - timedelta(days=30)).isoformat()
+        }),
+        "metrics": lambda: ("/metrics", {}),
+    }
+
+
+async def run_scenario(client: httpx.AsyncClient, make_request, requests: int, concurrency: int) -> dict:
+    """Send `requests` requests with at most `concurrency` in flight.
+
+    Returns:
+        dict: Throughput, latency percentiles (ms, None without requests) and error counts
+    """
+    latencies, errors = [], 0
+    queue = asyncio.Queue()
+    for _ in range(requests):
+        queue.put_nowait(make_request())
+
+    async def worker():
+        nonlocal errors
+        while not queue.empty():
+            path, params = queue.get_nowait()
+            started = time.perf_counter()
+            try:
+                response = await client.get(path, params=params)
+                await response.aread()
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    latency_ms = dict.fromkeys(["mean", "p50", "p95", "p99", "max"])
+    if latencies:
+        latency_ms = {
+            "mean": round(sum(latencies) / len(latencies), 2),
+            "p50": round(percentile(latencies, 50), 2),
+            "p95": round(percentile(latencies, 95), 2),
+            "p99": round(percentile(latencies, 99), 2),
+            "max": round(latencies[-1], 2),
+        }
+    return {
+        "requests": requests,
+        "errors": errors,
+        "duration_seconds": round(elapsed, 3),
+        "requests_per_second": round(requests / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": latency_ms,
+    }
+
+
+async def run(args) -> dict:
+    if args.in_process:
+        from src.api.main import app
+        transport = httpx.ASGITransport(app=app)
+        client = httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=args.timeout)
+    else:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout)
+
+    async with client:
+        channels = [item["name"] for item in (await client.get("/channels/", params={"limit": 1000})).json()["items"]]
+        if not channels:
+            raise SystemExit("No channels found; seed the database first (benchmarks/seed_corpus.py)")
+
+        cursor = (await client.get("/messages/", params={"limit": 100})).json()["next_cursor"]
+
+        rng = random.Random(args.seed)
+        scenarios = build_scenarios(channels, cursor, rng, args.days)
+        if not cursor:
+            del scenarios["messages_next_page"]
+        selected = [name for name in (args.scenarios or scenarios) if name in scenarios]
+
+        results = {}
+        for name in selected:
+            make_request = scenarios[name]
+            if args.warmup:
+                # Warm up connections, caches and prepared statements outside the measurement
+                await run_scenario(client, make_request, args.warmup, min(args.concurrency, args.warmup))
+            results[name] = await run_scenario(client, make_request, args.requests, args.concurrency)
+            latency = results[name]["latency_ms"]
+            print(f"{name:<30}{results[name]['requests_per_second']:>10.1f} req/s  p50 {latency['p50']:>8.1f} ms"
+                  f"  p95 {latency['p95']:>8.1f} ms  p99 {latency['p99']:>8.1f} ms  errors {results[name]['errors']}",
+                  file=sys.stderr)
+
+    return {
+        "generated_at": datetime.utcnow().isoformat(),
+        "target": "in-process" if args.in_process else args.base_url,
+        "python": platform.python_version(),
+        "concurrency": args.concurrency,
+        "requests_per_scenario": args.requests,
+        "channels": len(channels),
+        "scenarios": results,
+    }
+
+
+def compare(results: dict, baseline: dict, max_regression: float) -> list:
+    """List scenarios whose p95 latency grew, or throughput fell, by more than `max_regression`."""
+    regressions = []
+    for name, current in results["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous:
+            continue
+        p95_change = current["latency_ms"]["p95"] / previous["latency_ms"]["p95"] - 1
+        rps_change = current["requests_per_second"] / previous["requests_per_second"] - 1
+        if p95_change > max_regression or rps_change < -max_regression:
+            regressions.append({"scenario": name, "p95_change": round(p95_change, 3), "rps_change": round(rps_change, 3)})
+    return regressions
+
+
+def count(minimum: int):
+    """argparse type accepting integers of at least `minimum`."""
+    def parse(value: str) -> int:
+        number = int(value)
+        if number < minimum:
+            raise argparse.ArgumentTypeError(f"must be at least {minimum}")
+        return number
+    return parse
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--in-process", action="store_true", help="Drive the app in this process instead of over HTTP")
+    parser.add_argument("--requests", type=count(1), default=500, help="Measured requests per scenario")
+    parser.add_argument("--warmup", type=count(0), default=20, help="Unmeasured requests per scenario, 0 to skip")
+    parser.add_argument("--concurrency", type=count(1), default=16)
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--days", type=int, default=365, help="Date range the corpus was seeded over")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--scenarios", nargs="+", help="Only run these scenarios")
+    parser.add_argument("--output", help="Write results JSON here instead of stdout")
+    parser.add_argument("--baseline", help="Results JSON of an earlier run to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="Tolerated relative p95/throughput change")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            results["regressions"] = compare(results, json.load(f), args.max_regression)
+        for regression in results["regressions"]:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        exit_code = 1 if results["regressions"] else 0
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).write_text(output, encoding='utf-8')
+    else:
+        print(output)
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Compare the cost of serializing large list responses.
+
+Measures the default FastAPI path (response_model validation, `jsonable_encoder`
+and the standard json encoder) against the fast path used by the list endpoints
+(crud dicts rendered directly with orjson), on synthetic pages shaped like the
+real `/messages/` and `/image-detections/` responses.
+
+Usage:
+    python benchmarks/bench_serialization.py --rows 1000 5000 --repeat 20
+"""
+import argparse
+import statistics
+import time
+from datetime import datetime, timedelta
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))  # Add project root to path
+from src.api import schemas
+
+
+def message_page(rows: int) -> dict:
+    start = datetime(2024, 1, 1)
+    return {
+        "items": [{
+            "id": i,
+            "channel_name": "tikvahpharma",
+            "date": (start + timedelta(minutes=i)).isoformat(),
+            "message": "ፓራሲታሞል 500mg and amoxicillin available, call 0911000000 for delivery",
+            "views": 1000 + i,
+            "forwards": i % 17,
+            "media": i % 3 == 0
+        } for i in range(rows)],
+        "next_cursor": "WyIyMDI0LTAxLTAxVDAwOjAwOjAwIiwiYWJjIl0"
+    }
+
+
+def detection_page(rows: int) -> dict:
+    start = datetime(2024, 1, 1)
+    return {
+        "items": [{
+            "detection_id": f"{i:032x}",
+            "message_id": i,
+            "channel_name": "lobelia4cosmetics",
+            "object_class": "bottle",
+            "confidence": 0.5 + (i % 50) / 100,
+            "image_path": f"data/raw/telegram_images/2024-01-01/lobelia4cosmetics/{i}.jpg",
+            "detected_at": (start + timedelta(seconds=i)).isoformat()
+        } for i in range(rows)],
+        "next_cursor": None
+    }
+
+
+def validated_json(model, payload: dict) -> bytes:
+    """What FastAPI does for an endpoint that returns data with a response_model."""
+    return JSONResponse(jsonable_encoder(model(**payload))).body
+
+
+def fast_orjson(model, payload: dict) -> bytes:
+    """What the list endpoints do now: render the trusted crud payload directly."""
+    return ORJSONResponse(payload).body
+
+
+def time_it(func, model, payload: dict, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(model, payload)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[100, 1000, 10000], help="Rows per response")
+    parser.add_argument("--repeat", type=int, default=10, help="Timed runs per case (median is reported)")
+    args = parser.parse_args()
+
+    cases = [("messages", schemas.MessagePage, message_page), ("image-detections", schemas.ImageDetectionPage, detection_page)]
+    print(f"{'endpoint':<18}{'rows':>8}{'validated+json ms':>20}{'orjson ms':>12}{'speedup':>10}")
+    for name, model, build in cases:
+        for rows in args.rows:
+            payload = build(rows)
+            # Both paths must produce the same document for the comparison to be fair
+            assert orjson.loads(validated_json(model, payload)) == orjson.loads(fast_orjson(model, payload))
+            slow = time_it(validated_json, model, payload, args.repeat)
+            fast = time_it(fast_orjson, model, payload, args.repeat)
+            print(f"{name:<18}{rows:>8}{slow * 1000:>20.2f}{fast * 1000:>12.2f}{slow / fast:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Measure cold-start latency of each pipeline and API entry point.
+
+Every measurement runs in a fresh interpreter, so nothing is cached in
+`sys.modules` and the numbers are what a Dagster code-location reload, an op
+subprocess or an API worker pays before doing any work. Heavy modules that an
+entry point pulls in eagerly are listed, to show which imports should move
+into the stages that need them.
+
+Usage:
+    python benchmarks/bench_startup.py --repeat 5
+    python benchmarks/bench_startup.py --entry-points dagster_definitions yolo_model --output startup.json
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+# Entry point name to the statement it runs at startup
+ENTRY_POINTS = {
+    "dagster_definitions": "import pipelines.orchestration.dagster_pipeline",
+    "telegram_scraper": "import pipelines.data_collection.telegram_scraper",
+    "image_downloader": "import pipelines.data_collection.image_downloader",
+    "database_loader": "import pipelines.data_processing.database_loader",
+    "product_extraction": "import pipelines.data_processing.product_extraction",
+    "object_detection": "import pipelines.data_processing.object_detection",
+    "dbt_runner": "import pipelines.data_processing.dbt_runner",
+    "api": "import src.api.main",
+    "yolo_model": "from pipelines.data_processing.object_detection import get_model; get_model()",
+}
+
+# Modules worth flagging when an entry point loads them without needing them
+HEAVY_MODULES = ["telethon", "pandas", "numpy", "ultralytics", "torch", "cv2", "sqlalchemy", "pyarrow", "dagster"]
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - started
+heavy = [name for name in {heavy!r} if name in sys.modules]
+print(json.dumps({{"seconds": elapsed, "heavy_modules": heavy, "modules": len(sys.modules)}}))
+"""
+
+
+def measure(statement: str) -> dict:
+    """Run `statement` in a fresh interpreter and time it.
+
+    Returns:
+        dict: Elapsed seconds, heavy modules loaded and total module count, or the error
+    """
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE.format(statement=statement, heavy=HEAVY_MODULES)],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        return {"error": result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "failed"}
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per entry point")
+    parser.add_argument("--entry-points", nargs="+", choices=list(ENTRY_POINTS), help="Only measure these")
+    parser.add_argument("--output", help="Write results JSON here")
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'entry point':<22}{'median':>10}{'min':>10}{'modules':>9}  heavy modules loaded")
+    for name in args.entry_points or ENTRY_POINTS:
+        runs = [measure(ENTRY_POINTS[name]) for _ in range(args.repeat)]
+        errors = [run["error"] for run in runs if "error" in run]
+        if errors:
+            results[name] = {"error": errors[0]}
+            print(f"{name:<22}  unavailable: {errors[0]}")
+            continue
+        seconds = [run["seconds"] for run in runs]
+        results[name] = {
+            "median_seconds": round(statistics.median(seconds), 4),
+            "min_seconds": round(min(seconds), 4),
+            "modules": runs[-1]["modules"],
+            "heavy_modules": runs[-1]["heavy_modules"],
+        }
+        print(f"{name:<22}{results[name]['median_seconds'] * 1000:>8.0f}ms{results[name]['min_seconds'] * 1000:>8.0f}ms"
+              f"{results[name]['modules']:>9}  {', '.join(results[name]['heavy_modules']) or '-'}")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2), encoding='utf-8')
+
+
+if __name__ == "__main__":
+    main()
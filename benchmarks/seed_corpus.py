@@ -0,0 +1,184 @@
+"""Seed the configured Postgres database with a synthetic Telegram corpus.
+
+Writes channels, messages and image detections into the raw tables the pipeline
+loads, then runs product extraction and a full dbt build so the marts, indexes
+and aggregates the API reads are exactly what production would have.
+
+Point POSTGRES_* at a scratch database: `--reset` truncates the raw tables.
+
+Usage:
+    python benchmarks/seed_corpus.py --reset --channels 20 --messages 200000 --days 365
+"""
+import argparse
+import csv
+import random
+from datetime import datetime, timedelta
+from sqlalchemy import MetaData, Table, Column, Float, DateTime, Text, text
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))  # Add project root to path
+
+from src.common.logger import get_logger
+from src.common.database import get_engine
+from src.common.data_version import mark_data_updated
+from pipelines.data_processing.database_loader import DatabaseLoader
+from pipelines.data_processing.product_extraction import DEFAULT_LEXICON_PATH, run_product_extraction
+from pipelines.data_processing.dbt_runner import run_dbt_transformations
+
+logger = get_logger(__name__)
+
+OBJECT_CLASSES = ["bottle", "syringe", "person", "pill", "box", "cup"]
+FILLER = [
+    "available", "in stock", "call us", "delivery", "new arrival", "price", "discount", "original",
+    "pharmacy", "Addis Ababa", "Bole", "አለ", "ዋጋ", "ይደውሉ", "አዲስ", "ቅናሽ", "በቅርብ", "ፋርማሲ",
+]
+
+
+def load_aliases() -> list:
+    with open(DEFAULT_LEXICON_PATH, 'r', encoding='utf-8') as f:
+        return [row['alias'] for row in csv.DictReader(f)]
+
+
+def detections_table(metadata: MetaData) -> Table:
+    # Mirrors the columns ObjectDetector writes with pandas.to_sql
+    return Table('raw_image_detections', metadata,
+        Column('channel_name', Text),
+        Column('message_id', Text),
+        Column('object_class', Text),
+        Column('confidence', Float),
+        Column('x1', Float),
+        Column('y1', Float),
+        Column('x2', Float),
+        Column('y2', Float),
+        Column('image_path', Text),
+        Column('created_at', DateTime)
+    )
+
+
+def synthetic_message(rng: random.Random, aliases: list) -> str:
+    words = rng.sample(FILLER, rng.randint(3, 8)) + rng.sample(aliases, rng.randint(0, 3))
+    rng.shuffle(words)
+    return " ".join(words) + rng.choice([".", "።", "!", ""])
+
+
+def seed(channels: int, messages: int, days: int, detections_per_image: int, batch_size: int, seed_value: int):
+    """Insert the synthetic corpus into the raw tables.
+
+    Args:
+        channels (int): Number of channels
+        messages (int): Total number of messages, spread evenly over the channels
+        days (int): Messages are dated uniformly over this many days before now
+        detections_per_image (int): Maximum detections per message with media
+        batch_size (int): Rows per insert round trip
+        seed_value (int): Random seed, so runs are reproducible
+    """
+    rng = random.Random(seed_value)
+    aliases = load_aliases()
+    engine = get_engine()
+    loader = DatabaseLoader()  # Creates the raw message and image tables
+    raw_messages = loader.tables['raw_telegram_messages']
+    metric_snapshots = loader.tables['message_metrics_snapshots']
+    metadata = MetaData()
+    raw_detections = detections_table(metadata)
+    metadata.create_all(engine, tables=[raw_detections])
+
+    now = datetime.utcnow()
+    channel_names = [f"bench_channel_{i:03d}" for i in range(channels)]
+    per_channel = max(messages // channels, 1)
+    message_rows, snapshot_rows, detection_rows = [], [], []
+    total_messages = total_detections = 0
+
+    def flush():
+        nonlocal message_rows, snapshot_rows, detection_rows
+        with engine.begin() as conn:
+            if message_rows:
+                conn.execute(raw_messages.insert(), message_rows)
+                conn.execute(metric_snapshots.insert(), snapshot_rows)
+            if detection_rows:
+                conn.execute(raw_detections.insert(), detection_rows)
+        message_rows, snapshot_rows, detection_rows = [], [], []
+
+    for channel_name in channel_names:
+        for message_id in range(1, per_channel + 1):
+            message_date = now - timedelta(seconds=rng.randint(0, days * 86400))
+            has_media = rng.random() < 0.3
+            message_rows.append({
+                'message_id': message_id,
+                'channel_name': channel_name,
+                'message_text': synthetic_message(rng, aliases),
+                'message_date': message_date,
+                'has_media': has_media,
+                'scraped_date': now,
+                'created_at': now,
+                'updated_at': now
+            })
+            snapshot_rows.append({
+                'channel_name': channel_name,
+                'message_id': message_id,
+                'scraped_at': now,
+                'views': rng.randint(0, 20000),
+                'forwards': rng.randint(0, 200)
+            })
+            if has_media:
+                image_path = f"data/raw/telegram_images/{message_date:%Y-%m-%d}/{channel_name}/{message_id}.jpg"
+                for _ in range(rng.randint(1, detections_per_image)):
+                    x1, y1 = rng.uniform(0, 600), rng.uniform(0, 600)
+                    detection_rows.append({
+                        'channel_name': channel_name,
+                        'message_id': str(message_id),
+                        'object_class': rng.choice(OBJECT_CLASSES),
+                        'confidence': round(rng.random(), 3),
+                        'x1': x1,
+                        'y1': y1,
+                        'x2': x1 + rng.uniform(10, 200),
+                        'y2': y1 + rng.uniform(10, 200),
+                        'image_path': image_path,
+                        'created_at': message_date + timedelta(minutes=5)
+                    })
+            total_messages += 1
+            if len(message_rows) >= batch_size:
+                total_detections += len(detection_rows)
+                flush()
+
+    total_detections += len(detection_rows)
+    flush()
+    logger.info(f"Seeded {total_messages} messages and {total_detections} detections across {channels} channels")
+
+
+def reset():
+    """Empty the raw tables the corpus is written to."""
+    with get_engine().begin() as conn:
+        # Cluster ids are message row ids, so the dedupe tables go with the restarted identity
+        for table in ['raw_telegram_messages', 'message_metrics_snapshots', 'raw_image_detections',
+                      'raw_product_mentions', 'telegram_images', 'message_duplicate_clusters',
+                      'message_lsh_buckets']:
+            exists = conn.execute(text("SELECT to_regclass(:name)"), {'name': table}).scalar()
+            if exists:
+                conn.execute(text(f"TRUNCATE {table} RESTART IDENTITY"))
+    logger.info("Truncated raw tables")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--channels", type=int, default=20)
+    parser.add_argument("--messages", type=int, default=100000, help="Total messages across all channels")
+    parser.add_argument("--days", type=int, default=365, help="Date range the messages are spread over")
+    parser.add_argument("--detections-per-image", type=int, default=3)
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="Truncate the raw tables first")
+    parser.add_argument("--skip-transform", action="store_true", help="Don't run product extraction and dbt")
+    args = parser.parse_args()
+
+    if args.reset:
+        reset()
+    seed(args.channels, args.messages, args.days, args.detections_per_image, args.batch_size, args.seed)
+    if not args.skip_transform:
+        run_product_extraction(rebuild=args.reset)
+        run_dbt_transformations(full_refresh=True)
+        # Running APIs drop cached responses computed from the previous corpus
+        mark_data_updated(get_engine(), run_id="benchmark-seed")
+
+
+if __name__ == "__main__":
+    main()
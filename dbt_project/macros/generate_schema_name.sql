@@ -0,0 +1,9 @@
+-- Build models into the configured custom schema (e.g. 'marts') rather than
+-- dbt's default '<target_schema>_<custom_schema>', which is what the API queries.
+{% macro generate_schema_name(custom_schema_name, node) -%}
+    {%- if custom_schema_name is none -%}
+        {{ target.schema }}
+    {%- else -%}
+        {{ custom_schema_name | trim }}
+    {%- endif -%}
+{%- endmacro %}
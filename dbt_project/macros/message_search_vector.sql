@@ -0,0 +1,11 @@
+-- Full-text search document for a message. Text is indexed twice: with the
+-- 'english' configuration (stemmed, stop words removed) and with 'simple'
+-- (unstemmed), which is what matches Amharic words and product names. The
+-- channel name is added at a lower weight. Ethiopic punctuation (U+1360-U+1368,
+-- e.g. '።' and '፣') is turned into spaces first, because the text search parser
+-- would otherwise treat it as part of the neighbouring word.
+{% macro message_search_vector(text_column, channel_column) -%}
+    setweight(to_tsvector('english', translate(coalesce({{ text_column }}, ''), '፠፡።፣፤፥፦፧፨', '         ')), 'A') ||
+    setweight(to_tsvector('simple', translate(coalesce({{ text_column }}, ''), '፠፡።፣፤፥፦፧፨', '         ')), 'A') ||
+    setweight(to_tsvector('simple', coalesce({{ channel_column }}, '')), 'B')
+{%- endmacro %}
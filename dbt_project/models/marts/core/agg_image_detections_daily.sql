@@ -0,0 +1,24 @@
+{{
+  config(
+    materialized='table',
+    indexes=[
+      {'columns': ['detection_date']},
+      {'columns': ['object_class', 'detection_date', 'confidence_bucket']},
+      {'columns': ['channel_name', 'detection_date', 'confidence_bucket']}
+    ],
+    description='Daily image detection counts per channel, object class and confidence bucket.'
+  )
+}}
+
+-- Confidence is bucketed in steps of 0.05 (bucket n covers [n * 0.05, (n + 1) * 0.05)),
+-- so any threshold on that grid is answered exactly from this table. The numeric cast
+-- keeps values such as 0.35 from falling into the bucket below through float rounding.
+select
+    detected_at::date as detection_date,
+    channel_name,
+    object_class,
+    floor(confidence::numeric * 20)::int as confidence_bucket,
+    count(*) as detection_count,
+    sum(confidence) as confidence_sum
+from {{ ref('fct_image_detections') }}  -- Source: image detection facts
+group by detection_date, channel_name, object_class, confidence_bucket
@@ -0,0 +1,24 @@
+{{
+  config(
+    materialized='table',
+    indexes=[
+      {'columns': ['mention_date']},
+      {'columns': ['channel_name', 'mention_date']}
+    ],
+    description='Daily product mention counts per channel and duplicate cluster.'
+  )
+}}
+
+-- Pre-aggregated so top-product reports never scan the message facts; the
+-- cluster lets reports count an advertisement copied across channels once
+select
+    p.mention_date,
+    p.channel_name,
+    p.product_name,
+    coalesce(m.duplicate_cluster_id, m.id) as duplicate_cluster_id,
+    count(*) as mention_count
+from {{ ref('fct_product_mentions') }} p  -- Source: product mention facts
+join {{ source('raw', 'raw_telegram_messages') }} m  -- Source: duplicate cluster of each message
+    on m.channel_name = p.channel_name
+    and m.message_id = p.message_id
+group by p.mention_date, p.channel_name, p.product_name, coalesce(m.duplicate_cluster_id, m.id)
@@ -1,14 +1,19 @@
 {{ 
   config(
     materialized='table',
+    indexes=[
+      {'columns': ['channel_name'], 'unique': True}
+    ],
     description='Dimension table for Telegram channels.'
   ) 
 }}
 
 select
-    id as channel_id, -- Unique identifier for each Telegram channel
-    name as channel_name, -- The display name of the Telegram channel
-    description as channel_description -- Optional: channel description text
+    channel_key, -- Unique identifier for each Telegram channel
+    channel_name, -- The display name of the Telegram channel
+    first_seen_date, -- Date of the earliest message collected from the channel
+    message_count, -- Number of messages collected from the channel
+    loaded_at
 from {{ ref('stg_telegram_channels') }}
 
--- dbt test: unique and not null for channel_id are defined in schema.yml
\ No newline at end of file
+-- dbt test: unique and not null for channel_id are defined in schema.yml
@@ -1,8 +1,24 @@
 {{
   config(
     materialized='table',
-    description='Date dimension for analytics.'  -- This table provides a row for each date to support time-based analysis
+    description='Date dimension for analytics.'
   )
 }}
 
-select * from calendar_dates  -- Source table containing all calendar dates
\ No newline at end of file
+-- This table provides a row for each date to support time-based analysis
+with bounds as (
+    select
+        coalesce(min(message_date)::date, current_date) as start_date,
+        greatest(coalesce(max(message_date)::date, current_date), current_date) as end_date
+    from {{ ref('stg_telegram_messages') }}
+)
+
+select
+    day::date as date,  -- Calendar dates spanning the collected messages
+    to_char(day, 'YYYYMMDD')::int as date_id,
+    extract(year from day)::int as year,
+    extract(month from day)::int as month,
+    extract(day from day)::int as day,
+    trim(to_char(day, 'Day')) as day_of_week,
+    extract(isodow from day) in (6, 7) as is_weekend
+from bounds, generate_series(bounds.start_date, bounds.end_date, interval '1 day') as day
@@ -0,0 +1,23 @@
+{{
+  config(
+    materialized='table',
+    indexes=[
+      {'columns': ['duplicate_cluster_id'], 'unique': True},
+      {'columns': ['member_count']}
+    ],
+    description='Near-duplicate message clusters with more than one member.'
+  )
+}}
+
+-- How far each advertisement spread: one row per cluster of copies
+select
+    duplicate_cluster_id,
+    max(case when is_canonical then message_key end) as canonical_message_key,
+    count(*) as member_count,
+    count(distinct channel_name) as channel_count,
+    min(message_date) as first_posted_at,
+    max(message_date) as last_posted_at,
+    sum(views) as total_views
+from {{ ref('stg_telegram_messages') }}  -- Source: staging table for Telegram messages
+group by duplicate_cluster_id
+having count(*) > 1
@@ -1,8 +1,40 @@
 {{
   config(
     materialized='table',
-    description='Fact table for image detections from object detection.'  -- This table stores results of object detection performed on images from Telegram messages
+    indexes=[
+      {'columns': ['detection_key'], 'unique': True},
+      {'columns': ['detected_at', 'detection_key']},
+      {'columns': ["coalesce(detected_at, '-infinity'::timestamp)", 'detection_key']},
+      {'columns': ['channel_name', 'detected_at']},
+      {'columns': ['object_class', 'detected_at']}
+    ],
+    description='Fact table for image detections from object detection.'
   )
 }}
 
-select * from raw_image_detections  -- Source: raw detections from image processing pipeline
\ No newline at end of file
+-- This table stores results of object detection performed on images from Telegram messages
+-- The coalesce indexes back the API's newest-first pagination, which sorts undated rows last
+with detections as (
+    select
+        -- The box tells apart objects of one class detected in one image with the same confidence
+        {{ dbt_utils.generate_surrogate_key(['channel_name', 'message_id', 'image_path', 'object_class', 'confidence', 'x1', 'y1', 'x2', 'y2']) }} as detection_key,
+        {{ dbt_utils.generate_surrogate_key(['message_id', 'channel_name']) }} as message_key,
+        message_id::int as message_id,
+        channel_name,
+        object_class,
+        confidence,
+        x1,
+        y1,
+        x2,
+        y2,
+        image_path,
+        created_at as detected_at
+    from {{ source('raw', 'raw_image_detections') }}  -- Source: raw detections from image processing pipeline
+)
+
+-- Re-running detection over the same image yields the same rows; keep the first run's
+select distinct on (detection_key)
+    *,
+    current_timestamp as loaded_at
+from detections
+order by detection_key, detected_at
@@ -0,0 +1,28 @@
+{{
+  config(
+    materialized='table',
+    indexes=[
+      {'columns': ['message_key', 'scraped_at']},
+      {'columns': ['channel_name', 'scraped_at']}
+    ],
+    description='Growth curve of each message: its views and forwards at every scrape.'
+  )
+}}
+
+-- One row per message and scrape; the latest values are also on fct_messages
+select
+    s.message_key,
+    s.message_id,
+    s.channel_name,
+    m.message_date,
+    s.scraped_at,
+    extract(epoch from (s.scraped_at - m.message_date)) / 3600 as hours_since_posted,
+    s.views,
+    s.forwards,
+    s.views - lag(s.views) over message_scrapes as views_gained,
+    s.forwards - lag(s.forwards) over message_scrapes as forwards_gained,
+    row_number() over (partition by s.message_key order by s.scraped_at desc) = 1 as is_latest
+from {{ ref('stg_message_metrics_snapshots') }} s  -- Source: per-scrape counts
+join {{ ref('stg_telegram_messages') }} m  -- Source: message post dates
+    on m.message_key = s.message_key
+window message_scrapes as (partition by s.message_key order by s.scraped_at)
@@ -1,8 +1,22 @@
 {{
   config(
     materialized='table',
-    description='Fact table for Telegram messages.'  -- This table stores all Telegram messages for analytics
+    indexes=[
+      {'columns': ['message_key'], 'unique': True},
+      {'columns': ['message_date', 'message_key']},
+      {'columns': ['channel_name', 'message_date', 'message_key']},
+      {'columns': ["coalesce(message_date, '-infinity'::timestamp)", 'message_key']},
+      {'columns': ['channel_name', "coalesce(message_date, '-infinity'::timestamp)", 'message_key']},
+      {'columns': ['search_vector'], 'type': 'gin'}
+    ],
+    description='Fact table for Telegram messages.'
   )
 }}
 
-select * from {{ ref('stg_telegram_messages') }}  -- Source: staging table for Telegram messages
\ No newline at end of file
+-- This table stores all Telegram messages for analytics
+-- The coalesce indexes back the API's newest-first pagination, which sorts undated rows last
+select
+    *,
+    message_date::date as date_key,  -- Joins to dim_dates
+    {{ message_search_vector('message_text', 'channel_name') }} as search_vector  -- Backs /api/search/messages
+from {{ ref('stg_telegram_messages') }}  -- Source: staging table for Telegram messages
@@ -0,0 +1,33 @@
+{{
+  config(
+    materialized='incremental',
+    unique_key='mention_key',
+    indexes=[
+      {'columns': ['mention_key'], 'unique': True},
+      {'columns': ['product_name', 'mention_date']},
+      {'columns': ['channel_name', 'mention_date']}
+    ],
+    description='Fact table of product mentions extracted from Telegram messages.',
+    post_hook="delete from {{ this }} f where not exists (select 1 from {{ source('raw', 'raw_product_mentions') }} r where r.id = f.mention_id)"
+  )
+}}
+
+-- One row per product mentioned in a message
+-- Rescanning an edited message replaces its raw mentions under new ids: the
+-- incremental run merges the new ones and the post-hook drops the removed ones
+select
+    {{ dbt_utils.generate_surrogate_key(['channel_name', 'message_id', 'product_name']) }} as mention_key,
+    {{ dbt_utils.generate_surrogate_key(['message_id', 'channel_name']) }} as message_key,
+    id as mention_id,
+    message_id,
+    channel_name,
+    product_name,
+    matched_alias,
+    message_date::date as mention_date,
+    current_timestamp as loaded_at
+from {{ source('raw', 'raw_product_mentions') }}  -- Source: mentions written by the product extraction stage
+
+{% if is_incremental() %}
+-- Only pick up mentions extracted since the last run
+where id > (select coalesce(max(mention_id), 0) from {{ this }})
+{% endif %}
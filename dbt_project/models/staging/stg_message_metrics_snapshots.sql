@@ -0,0 +1,15 @@
+{{
+  config(
+    materialized='view'
+  )
+}}
+
+-- View and forward counts of a message at each scrape
+SELECT
+    {{ dbt_utils.generate_surrogate_key(['message_id', 'channel_name']) }} AS message_key,
+    message_id,
+    channel_name,
+    scraped_at,
+    views,
+    forwards
+FROM {{ source('raw', 'message_metrics_snapshots') }}
@@ -7,9 +7,9 @@
 WITH source AS (
     SELECT
         channel_name,
-        MIN(date) AS first_seen_date,
+        MIN(message_date) AS first_seen_date,
         COUNT(*) AS message_count
-    FROM {{ source('raw', 'raw_telegram_messages') }}
+    FROM {{ ref('stg_telegram_messages') }}
     GROUP BY channel_name
 )
 
@@ -19,4 +19,4 @@ SELECT
     first_seen_date,
     message_count,
     CURRENT_TIMESTAMP AS loaded_at
-FROM source
\ No newline at end of file
+FROM source
@@ -4,15 +4,33 @@
   )
 }}
 
+-- Messages are stored once; their counts come from the most recent scrape
+WITH latest_metrics AS (
+    SELECT DISTINCT ON (channel_name, message_id)
+        channel_name,
+        message_id,
+        views,
+        forwards
+    FROM {{ source('raw', 'message_metrics_snapshots') }}
+    ORDER BY channel_name, message_id, scraped_at DESC
+)
+
 SELECT
-    {{ dbt_utils.generate_surrogate_key(['id', 'channel_name']) }} AS message_key,
-    id AS message_id,
-    channel_name,
-    date::timestamp AS message_date,
-    message AS message_text,
-    views,
-    forwards,
-    media AS has_media,
-    scraped_date,
+    {{ dbt_utils.generate_surrogate_key(['m.message_id', 'm.channel_name']) }} AS message_key,
+    {{ dbt_utils.generate_surrogate_key(['m.channel_name']) }} AS channel_key,
+    m.message_id,
+    m.channel_name,
+    m.message_date::timestamp AS message_date,
+    m.message_text,
+    lm.views,
+    lm.forwards,
+    m.has_media,
+    -- Copies of a message, in any channel, share the row id of the first one loaded
+    COALESCE(m.duplicate_cluster_id, m.id) AS duplicate_cluster_id,
+    COALESCE(m.duplicate_cluster_id, m.id) = m.id AS is_canonical,
+    m.scraped_date,
     CURRENT_TIMESTAMP AS loaded_at
-FROM {{ source('raw', 'raw_telegram_messages') }}
\ No newline at end of file
+FROM {{ source('raw', 'raw_telegram_messages') }} m
+LEFT JOIN latest_metrics lm
+    ON lm.channel_name = m.channel_name
+    AND lm.message_id = m.message_id
@@ -1,7 +1,8 @@
 import asyncio
 import os
 from pathlib import Path
-from datetime import datetime
+from datetime import date, datetime
+from typing import List
 from telethon import TelegramClient
 from telethon.tl.types import MessageMediaPhoto
 from telethon.errors import FloodWaitError
@@ -10,40 +11,55 @@ sys.path.append(str(Path(__file__).parent.parent.parent))  # Add project root to
 
 from src.common.logger import get_logger
 from src.common.config import settings
+from src.common.stage_metrics import StageMetrics
+from pipelines.data_collection.telegram_utils import iter_messages_on
 
 logger = get_logger(__name__)
 
 class ImageDownloader:
     """A class to download images from Telegram channels."""
     
-    def __init__(self):
-        """Initialize the image downloader."""
+    def __init__(self, channels: List[str] = None, session: str = 'image_downloader'):
+        """Initialize the image downloader.
+        
+        Args:
+            channels (List[str], optional): Channels to download from, defaults to the configured channels
+            session (str): Telethon session name
+        """
         self.client = TelegramClient(
-            'image_downloader',
+            session,
             settings.telegram_api_id,
             settings.telegram_api_hash
         )
         self.data_dir = Path(settings.data_dir) / "raw" / "telegram_images"
         self.data_dir.mkdir(parents=True, exist_ok=True)
         
-        # Channels with images to download (matching telegram_scraper.py)
-        self.channels = [
-            'chemed', 
-            'lobelia4cosmetics', 
-            'tikvahpharma'
-        ]
+        # Channels with images to download (the same ones the scraper collects)
+        self.channels = channels or settings.channels
+        self.metrics = StageMetrics('download_telegram_images')
+        
+    async def download_images(self, channel_name: str, limit: int = 50, day: date = None):
+        """Download images from a Telegram channel.
         
-    async def download_images(self, channel_name: str, limit: int = 50):
-        """Download images from a Telegram channel."""
+        Args:
+            channel_name (str): Channel to download from
+            limit (int): Number of latest messages to check
+            day (date, optional): Download the images of every message posted on this
+                UTC day instead of the latest ones, and file them under that day
+        """
         try:
             logger.info(f"Starting image download from {channel_name}")
-            date_str = datetime.now().strftime('%Y-%m-%d')
+            date_str = (day or datetime.now()).strftime('%Y-%m-%d')
             clean_channel_name = channel_name.replace('@', '')  # Remove '@' if present for folder naming
             channel_dir = self.data_dir / date_str / clean_channel_name
             channel_dir.mkdir(parents=True, exist_ok=True)
             entity = await self.client.get_entity(channel_name)
             downloaded_count = 0
-            async for message in self.client.iter_messages(entity, limit=limit):
+            if day is None:
+                message_iter = self.client.iter_messages(entity, limit=limit)
+            else:
+                message_iter = iter_messages_on(self.client, entity, day)
+            async for message in message_iter:
                 try:
                     # Check if the message contains a photo
                     if message.media and isinstance(message.media, MessageMediaPhoto):
@@ -52,29 +68,37 @@ class ImageDownloader:
                         if not file_path.exists():
                             await self.client.download_media(message, file=file_path)
                             downloaded_count += 1
+                            self.metrics.add(items=1, bytes=file_path.stat().st_size)
                             logger.debug(f"Downloaded image {file_path.name}")
                 except Exception as e:
                     # Log warning if a single image fails to download/process, but continue
-                    logger.warning(f"Failed to download/process image for message {getattr(message, 'id', 'unknown')}: {e}", exc_info=True)
+                    logger.warning(f"Failed to download/process image for message {getattr(message, 'id', 'unknown')}: {e}")
             logger.info(f"Completed image download from {channel_name}: {downloaded_count} images downloaded")
         except FloodWaitError as e:
             # Handle Telegram API rate limiting
             logger.error(f"Flood wait error for {channel_name}: {e}")
             await asyncio.sleep(e.seconds)
+            if day is not None:
+                # Fail the partition so it is retried rather than recorded as complete
+                raise
         except Exception as e:
             # Log and re-raise any other errors
-            logger.error(f"Error downloading images from {channel_name}: {e}", exc_info=True)
+            logger.error(f"Error downloading images from {channel_name}: {e}")
             raise
             
-    async def download_all_images(self):
-        """Download images from all configured channels."""
+    async def download_all_images(self, day: date = None):
+        """Download images from all configured channels.
+        
+        Args:
+            day (date, optional): Download only the images posted on this UTC day
+        """
         try:
             logger.info("Starting image download process")
             
             # Use async context manager for TelegramClient session
             async with self.client:
                 for channel in self.channels:
-                    await self.download_images(channel)
+                    await self.download_images(channel, day=day)
                     
             logger.info("Completed image download process")
         except Exception as e:
@@ -82,10 +106,21 @@ class ImageDownloader:
             logger.error(f"Error in image download process: {e}")
             raise
 
-def run_image_downloader():
-    """Run the image downloader."""
-    downloader = ImageDownloader()
-    asyncio.run(downloader.download_all_images())  # Run the async download process
+def run_image_downloader(channels: List[str] = None, day: date = None, session: str = 'image_downloader'):
+    """Run the image downloader.
+    
+    Args:
+        channels (List[str], optional): Channels to download from, defaults to the configured channels
+        day (date, optional): Download only the images posted on this UTC day
+        session (str): Telethon session name
+    
+    Returns:
+        dict: Stage metrics of the run
+    """
+    downloader = ImageDownloader(channels, session)
+    with downloader.metrics.track():
+        asyncio.run(downloader.download_all_images(day))  # Run the async download process
+    return downloader.metrics.to_dict()
 
 def main():
     """Main function to run the image downloader."""
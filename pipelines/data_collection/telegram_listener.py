@@ -0,0 +1,206 @@
+import asyncio
+import json
+from collections import defaultdict
+from datetime import datetime, time
+from typing import List
+from telethon import TelegramClient, events, utils
+from telethon.tl.types import MessageMediaPhoto
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent.parent))  # Add project root to path
+
+from src.common.logger import get_logger
+from src.common.config import settings
+from src.common.stage_metrics import StageMetrics
+from pipelines.data_collection.telegram_utils import message_record
+from pipelines.data_processing.database_loader import DatabaseLoader
+
+logger = get_logger(__name__)
+
+class TelegramListener:
+    """Stream new and edited channel messages into the raw store and PostgreSQL.
+
+    Messages arrive through Telegram update events instead of being polled.
+    They are buffered and written as a micro-batch once `batch_size` messages
+    are pending or `flush_seconds` have passed:
+    - appended as JSON lines to `raw/telegram_stream/YYYY-MM-DD/<channel>.jsonl`
+    - upserted into `raw_telegram_messages`, with their counts appended to `message_metrics_snapshots`
+    Photos are downloaded into the same `raw/telegram_images/YYYY-MM-DD/<channel>/` layout
+    the image downloader uses, so the day's detection partition picks them up.
+    """
+
+    def __init__(self, channels: List[str] = None, session: str = 'medical_listener',
+                 batch_size: int = None, flush_seconds: float = None, download_photos: bool = True):
+        """Initialize the listener.
+
+        Args:
+            channels (List[str], optional): Channels to follow, defaults to the configured channels
+            session (str): Telethon session name, separate from the batch scraper's
+            batch_size (int, optional): Pending messages that trigger a write
+            flush_seconds (float, optional): Longest time a message waits before being written
+            download_photos (bool): Download photos as they arrive
+        """
+        self.client = TelegramClient(
+            session,
+            settings.telegram_api_id,
+            settings.telegram_api_hash
+        )
+        self.channels = channels or settings.channels
+        self.batch_size = batch_size or settings.listener_batch_size
+        self.flush_seconds = flush_seconds or settings.listener_flush_seconds
+        self.download_photos = download_photos
+        self.stream_dir = Path(settings.data_dir) / "raw" / "telegram_stream"
+        self.images_dir = Path(settings.data_dir) / "raw" / "telegram_images"
+        self.loader = DatabaseLoader()
+        self.metrics = StageMetrics('telegram_listener')
+
+        self._channel_names = {}  # Peer id of each followed channel to its configured name
+        self._pending_messages = []  # (channel_name, message record, edited)
+        self._pending_images = []
+        self._flush_lock = asyncio.Lock()
+
+    async def _on_message(self, event, edited: bool = False):
+        """Buffer a new or edited message and download its photo."""
+        try:
+            channel_name = self._channel_names.get(event.chat_id)
+            if channel_name is None:
+                return
+            message = event.message
+            # Buffered before the photo, so a failed download never loses the text
+            self._pending_messages.append((channel_name, message_record(message), edited))
+
+            if self.download_photos and isinstance(message.media, MessageMediaPhoto):
+                try:
+                    await self._download_photo(message, channel_name)
+                except Exception as e:
+                    logger.warning(f"Failed to download photo of message {message.id}: {e}")
+
+            if len(self._pending_messages) >= self.batch_size:
+                await self.flush()
+        except Exception as e:
+            logger.warning(f"Failed to handle message {getattr(event.message, 'id', 'unknown')}: {e}")
+
+    async def _download_photo(self, message, channel_name: str):
+        """Download a message's photo and buffer its image row."""
+        image_date = message.date or datetime.utcnow()
+        channel_dir = self.images_dir / image_date.strftime('%Y-%m-%d') / channel_name
+        channel_dir.mkdir(parents=True, exist_ok=True)
+        file_path = channel_dir / f"{message.id}.jpg"
+        if file_path.exists():
+            return
+        try:
+            await self.client.download_media(message, file=file_path)
+            self.metrics.add(bytes=file_path.stat().st_size)
+        except Exception:
+            # A partial file would be taken as downloaded by the next edit or the batch loader
+            file_path.unlink(missing_ok=True)
+            raise
+        # Stamped with the folder's day, like the batch loader, so the day's
+        # partition replace deletes these rows instead of duplicating them
+        partition_date = datetime.combine(image_date.date(), time.min)
+        self._pending_images.append({
+            'message_id': message.id,
+            'channel_name': channel_name,
+            'image_path': str(file_path.relative_to(Path(settings.data_dir))),
+            'image_date': partition_date,
+            'scraped_date': partition_date,
+            'created_at': datetime.utcnow()
+        })
+
+    async def _on_new_message(self, event):
+        await self._on_message(event)
+
+    async def _on_edited_message(self, event):
+        await self._on_message(event, edited=True)
+
+    def _write_batch(self, messages: list, images: list, received_at: datetime):
+        """Append a micro-batch to the stream files and insert it into PostgreSQL.
+
+        The stream files are written first: if the database is unavailable the
+        batch is still on disk, and the nightly partition run reloads the day.
+        """
+        by_file = defaultdict(list)
+        for channel_name, record, edited in messages:
+            day = (record['date'] or received_at.isoformat())[:10]
+            by_file[(day, channel_name)].append(
+                dict(record, channel_name=channel_name, edited=edited, received_at=received_at.isoformat())
+            )
+        for (day, channel_name), records in by_file.items():
+            stream_file = self.stream_dir / day / f"{channel_name}.jsonl"
+            stream_file.parent.mkdir(parents=True, exist_ok=True)
+            lines = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+            with open(stream_file, 'a', encoding='utf-8') as f:
+                f.write(lines)
+            self.metrics.add(bytes=len(lines.encode('utf-8')))
+
+        try:
+            self.loader.load_message_batch([(channel_name, record) for channel_name, record, _ in messages], received_at)
+            self.loader.load_image_batch(images)
+        except Exception as e:
+            logger.error(f"Error writing batch of {len(messages)} messages to the database: {e}")
+            return
+        self.metrics.add(items=len(messages), edits=sum(1 for *_, edited in messages if edited))
+        logger.info(f"Wrote {len(messages)} messages and {len(images)} images")
+
+    async def flush(self):
+        """Write the pending messages and images, if any."""
+        async with self._flush_lock:
+            messages, self._pending_messages = self._pending_messages, []
+            images, self._pending_images = self._pending_images, []
+            if not messages and not images:
+                return
+            # File and database writes block, so they run off the event loop
+            await asyncio.get_running_loop().run_in_executor(
+                None, self._write_batch, messages, images, datetime.utcnow()
+            )
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.flush_seconds)
+            await self.flush()
+
+    async def listen(self):
+        """Follow the configured channels until disconnected or cancelled."""
+        try:
+            async with self.client:
+                for channel in self.channels:
+                    entity = await self.client.get_entity(channel)
+                    self._channel_names[utils.get_peer_id(entity)] = channel
+                chats = list(self._channel_names)
+                self.client.add_event_handler(self._on_new_message, events.NewMessage(chats=chats))
+                self.client.add_event_handler(self._on_edited_message, events.MessageEdited(chats=chats))
+                logger.info(f"Listening to {', '.join(self.channels)}")
+
+                flusher = asyncio.create_task(self._flush_periodically())
+                try:
+                    await self.client.run_until_disconnected()
+                finally:
+                    flusher.cancel()
+                    await self.flush()
+        except Exception as e:
+            logger.error(f"Error in Telegram listener: {e}")
+            raise
+
+def run_listener(channels: List[str] = None):
+    """Run the streaming listener until interrupted.
+
+    Args:
+        channels (List[str], optional): Channels to follow, defaults to the configured channels
+
+    Returns:
+        dict: Stage metrics of the session
+    """
+    listener = TelegramListener(channels)
+    with listener.metrics.track():
+        try:
+            asyncio.run(listener.listen())
+        except KeyboardInterrupt:
+            logger.info("Listener stopped")
+    return listener.metrics.to_dict()
+
+def main():
+    """Main function to run the streaming listener."""
+    run_listener()
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,9 @@
 import asyncio
 import json
 import os
-from datetime import datetime
-from telethon import TelegramClient, events
+from datetime import date, datetime
+from typing import List
+from telethon import TelegramClient
 from telethon.errors import FloodWaitError
 import sys
 from pathlib import Path
@@ -10,18 +11,23 @@ sys.path.append(str(Path(__file__).parent.parent.parent))  # Add project root to
 
 from src.common.logger import get_logger
 from src.common.config import settings
-import logging
-logging.basicConfig(filename='logs/scraper.log', level=logging.INFO)
+from src.common.stage_metrics import StageMetrics
+from pipelines.data_collection.telegram_utils import iter_messages_on, message_record
 
 logger = get_logger(__name__)
 
 class TelegramScraper:
     """A class to scrape messages from Telegram channels."""
     
-    def __init__(self):
-        """Initialize the Telegram scraper with API credentials."""
+    def __init__(self, channels: List[str] = None, session: str = 'medical_scraper'):
+        """Initialize the Telegram scraper with API credentials.
+        
+        Args:
+            channels (List[str], optional): Channels to scrape, defaults to the configured channels
+            session (str): Telethon session name
+        """
         self.client = TelegramClient(
-            'medical_scraper',
+            session,
             settings.telegram_api_id,
             settings.telegram_api_hash
         )
@@ -29,45 +35,49 @@ class TelegramScraper:
         self.data_dir.mkdir(parents=True, exist_ok=True)
         
         # List of channels to scrape
-        self.channels = [
-            'chemed', 
-            'lobelia4cosmetics', 
-            'tikvahpharma'
-        ]
+        self.channels = channels or settings.channels
+        self.metrics = StageMetrics('scrape_telegram_data')
         
-    async def scrape_channel(self, channel_name: str):
-        """Scrape messages from a specific Telegram channel."""
+    async def scrape_channel(self, channel_name: str, day: date = None):
+        """Scrape messages from a specific Telegram channel.
+        
+        Args:
+            channel_name (str): Channel to scrape
+            day (date, optional): Scrape every message posted on this UTC day instead
+                of the latest 100, and file them under that day
+        """
         try:
             logger.info(f"Starting to scrape channel: {channel_name}")
             entity = await self.client.get_entity(channel_name)
             messages = []
-            # Iterate over the last 100 messages in the channel
-            async for message in self.client.iter_messages(entity, limit=100):
+            if day is None:
+                # Iterate over the last 100 messages in the channel
+                message_iter = self.client.iter_messages(entity, limit=100)
+            else:
+                message_iter = iter_messages_on(self.client, entity, day)
+            async for message in message_iter:
                 try:
                     # Extract relevant fields from each message
-                    messages.append({
-                        'id': message.id,
-                        'date': message.date.isoformat() if message.date else None,
-                        'message': message.text,
-                        'views': message.views,
-                        'forwards': message.forwards,
-                        'media': bool(message.media)
-                    })
+                    messages.append(message_record(message))
                 except Exception as e:
                     # Log a warning if a message cannot be processed
-                    logger.warning(f"Failed to process message {getattr(message, 'id', 'unknown')}: {e}", exc_info=True)
-            self.save_to_json(messages, channel_name)
+                    logger.warning(f"Failed to process message {getattr(message, 'id', 'unknown')}: {e}")
+            filename = self.save_to_json(messages, channel_name, day)
+            self.metrics.add(items=len(messages), bytes=os.path.getsize(filename), channels=1)
             logger.info(f"Successfully scraped {len(messages)} messages from {channel_name}")
         except FloodWaitError as e:
             # Handle Telegram API rate limiting
             logger.error(f"Flood wait error for {channel_name}: {e}")
             await asyncio.sleep(e.seconds)
+            if day is not None:
+                # Fail the partition so it is retried rather than recorded as empty
+                raise
         except Exception as e:
             # Log any other errors encountered during scraping
-            logger.error(f"Error scraping channel {channel_name}: {e}", exc_info=True)
+            logger.error(f"Error scraping channel {channel_name}: {e}")
             raise
 
-    def save_to_json(self, data, channel_name):
+    def save_to_json(self, data, channel_name, day: date = None):
         """Save scraped data to JSON file"""
         """
         Save scraped messages to a JSON file in the data lake.
@@ -75,32 +85,38 @@ class TelegramScraper:
         Args:
             data (list): List of message dicts.
             channel_name (str): Channel name for file naming.
+            day (date, optional): Day the messages were posted, defaults to today.
         Returns:
-            None
+            str: Path of the written file.
         """
         try:
-            date_str = datetime.now().strftime('%Y-%m-%d')
+            date_str = (day or datetime.now()).strftime('%Y-%m-%d')
             # Enforce strict naming: YYYY-MM-DD/channel_name.json
-            output_dir = f"data/raw/telegram_messages/{date_str}"
+            output_dir = self.data_dir / date_str
             os.makedirs(output_dir, exist_ok=True)
-            filename = f"{output_dir}/{channel_name}.json"
+            filename = output_dir / f"{channel_name}.json"
             # Write the messages to a JSON file
             with open(filename, 'w', encoding='utf-8') as f:
                 json.dump(data, f, ensure_ascii=False, indent=2)
             logger.info(f"Saved {len(data)} messages to {filename}")
+            return str(filename)
         except Exception as e:
-            logger.error(f"Error saving messages to JSON for channel {channel_name}: {e}", exc_info=True)
+            logger.error(f"Error saving messages to JSON for channel {channel_name}: {e}")
             raise
             
-    async def scrape_all_channels(self):
-        """Scrape all configured Telegram channels."""
+    async def scrape_all_channels(self, day: date = None):
+        """Scrape all configured Telegram channels.
+        
+        Args:
+            day (date, optional): Scrape only the messages posted on this UTC day
+        """
         try:
             logger.info("Starting Telegram scraping process")
             
             # Use async context manager for the Telegram client
             async with self.client:
                 for channel in self.channels:
-                    await self.scrape_channel(channel)
+                    await self.scrape_channel(channel, day)
                     
             logger.info("Completed Telegram scraping process")
         except Exception as e:
@@ -108,23 +124,35 @@ class TelegramScraper:
             logger.error(f"Error in Telegram scraping process: {e}")
             raise
 
-def run_scraper():
-    """Run the Telegram scraper."""
+def run_scraper(channels: List[str] = None, day: date = None, session: str = 'medical_scraper'):
+    """Run the Telegram scraper.
+    
+    Args:
+        channels (List[str], optional): Channels to scrape, defaults to the configured channels
+        day (date, optional): Scrape only the messages posted on this UTC day
+        session (str): Telethon session name
+    
+    Returns:
+        dict: Stage metrics of the run
+    """
     try:
-        scraper = TelegramScraper()
+        scraper = TelegramScraper(channels, session)
         # Run the asynchronous scraping process
-        asyncio.run(scraper.scrape_all_channels())
+        with scraper.metrics.track():
+            asyncio.run(scraper.scrape_all_channels(day))
+        return scraper.metrics.to_dict()
     except Exception as e:
-        logger.error(f"Error running the Telegram scraper: {e}", exc_info=True)
+        logger.error(f"Error running the Telegram scraper: {e}")
+        raise
 
 def main():
     try:
         run_scraper()
     except Exception as e:
-        logger.error(f"Error in main: {e}", exc_info=True)
+        logger.error(f"Error in main: {e}")
 
 if __name__ == "__main__":
     try:
         main()
     except Exception as e:
-        logger.error(f"Unhandled exception in __main__: {e}", exc_info=True)
+        logger.error(f"Unhandled exception in __main__: {e}")
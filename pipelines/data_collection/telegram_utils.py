@@ -0,0 +1,76 @@
+import os
+import shutil
+from contextlib import contextmanager
+from datetime import date, datetime, time, timedelta, timezone
+from pathlib import Path
+import sys
+sys.path.append(str(Path(__file__).parent.parent.parent))  # Add project root to path
+
+from src.common.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+@contextmanager
+def isolated_session(name: str):
+    """Provide a private copy of an authorized Telethon session.
+
+    Telethon keeps a session in a SQLite file that concurrent processes can't
+    share, so partition runs executing in parallel each work on their own copy,
+    removed when the block exits.
+
+    Args:
+        name (str): Session name, i.e. the `<name>.session` file in the working directory
+
+    Yields:
+        str: Session name to pass to `TelegramClient`
+    """
+    source = Path(f"{name}.session")
+    if not source.exists():
+        # Not authorized yet: Telethon creates the session interactively
+        yield name
+        return
+    copy = source.with_name(f"{name}-{os.getpid()}.session")
+    shutil.copy2(source, copy)
+    try:
+        yield str(copy.with_suffix(""))
+    finally:
+        copy.unlink(missing_ok=True)
+
+
+def message_record(message) -> dict:
+    """Extract the fields stored in the raw message files from a Telethon message.
+
+    Args:
+        message (Message): Telethon message
+
+    Returns:
+        dict: Message id, date, text, views, forwards and whether it has media
+    """
+    return {
+        'id': message.id,
+        'date': message.date.isoformat() if message.date else None,
+        'message': message.text,
+        'views': message.views,
+        'forwards': message.forwards,
+        'media': bool(message.media)
+    }
+
+
+async def iter_messages_on(client, entity, day: date):
+    """Iterate over the messages a channel posted on one UTC day, newest first.
+
+    Args:
+        client (TelegramClient): Connected client
+        entity: Channel entity
+        day (date): Day to fetch
+
+    Yields:
+        Message: Telethon messages dated within the day
+    """
+    start = datetime.combine(day, time.min, tzinfo=timezone.utc)
+    # offset_date returns messages strictly older than it
+    async for message in client.iter_messages(entity, offset_date=start + timedelta(days=1)):
+        if message.date and message.date < start:
+            break
+        yield message
@@ -1,15 +1,20 @@
 import json
 import os
 from pathlib import Path
-from datetime import datetime
+from datetime import date, datetime
+from typing import List
 import pandas as pd
-from sqlalchemy import create_engine, text, MetaData, Table, Column, Integer, String, DateTime, Text, Boolean
+from sqlalchemy import text, inspect, and_, or_, MetaData, Table, Column, Integer, String, DateTime, Text, Boolean, UniqueConstraint, Index
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import SQLAlchemyError
 import sys
 sys.path.append(str(Path(__file__).parent.parent.parent))  # Add project root to path
 
 from src.common.logger import get_logger
 from src.common.config import settings
+from src.common.database import get_engine
+from src.common.stage_metrics import StageMetrics
+from pipelines.data_processing.message_dedupe import MessageDeduplicator
 
 logger = get_logger(__name__)
 
@@ -18,33 +23,44 @@ class DatabaseLoader:
     
     def __init__(self):
         """Initialize the database loader with enhanced capabilities."""
-        self.engine = create_engine(
-            f"postgresql://{settings.postgres_user}:{settings.postgres_password}@"
-            f"{settings.postgres_host}:{settings.postgres_port}/{settings.postgres_db}"
-        )
+        self.engine = get_engine()
         self.data_dir = Path(settings.data_dir) / "raw" / "telegram_messages"
         self.images_dir = Path(settings.data_dir) / "raw" / "telegram_images"
+        self.metrics = StageMetrics('load_raw_to_postgres')
         
         # Initialize database tables
         self._create_tables()
+        self.deduplicator = MessageDeduplicator(self.engine)
         
     def _create_tables(self):
         """Create database tables if they don't exist."""
         try:
             metadata = MetaData()
             
-            # Telegram messages table
+            # Telegram messages table, one row per message; updated_at moves when it is edited
             Table('raw_telegram_messages', metadata,
                 Column('id', Integer, primary_key=True),
                 Column('message_id', Integer, nullable=False),
                 Column('channel_name', String(100), nullable=False),
                 Column('message_text', Text),
                 Column('message_date', DateTime),
-                Column('views', Integer),
-                Column('forwards', Integer),
                 Column('has_media', Boolean),
                 Column('scraped_date', DateTime, nullable=False),
-                Column('created_at', DateTime, default=datetime.utcnow)
+                Column('created_at', DateTime, default=datetime.utcnow),
+                Column('updated_at', DateTime, default=datetime.utcnow),
+                Column('duplicate_cluster_id', Integer),  # Row id of the cluster's canonical message
+                Column('mentions_extracted_at', DateTime),  # Set by product extraction, cleared by an edit
+                UniqueConstraint('channel_name', 'message_id', name='uq_raw_telegram_messages_channel_message'),
+                Index('ix_raw_telegram_messages_unextracted', 'id', postgresql_where=text('mentions_extracted_at IS NULL'))
+            )
+            
+            # View and forward counts of every message at every scrape, append-only
+            Table('message_metrics_snapshots', metadata,
+                Column('channel_name', String(100), primary_key=True),
+                Column('message_id', Integer, primary_key=True),
+                Column('scraped_at', DateTime, primary_key=True),
+                Column('views', Integer),
+                Column('forwards', Integer)
             )
             
             # Image metadata table
@@ -59,35 +75,109 @@ class DatabaseLoader:
             )
             
             metadata.create_all(self.engine)
+            self.tables = metadata.tables
+            with self.engine.begin() as conn:
+                self._compact_message_copies(conn)
+                columns = {column['name'] for column in inspect(conn).get_columns('raw_telegram_messages')}
+                if 'duplicate_cluster_id' not in columns:
+                    conn.execute(text("ALTER TABLE raw_telegram_messages ADD COLUMN duplicate_cluster_id INTEGER"))
+                if 'mentions_extracted_at' not in columns:
+                    # Existing messages are scanned once more; their mentions are not duplicated
+                    conn.execute(text("ALTER TABLE raw_telegram_messages ADD COLUMN mentions_extracted_at TIMESTAMP"))
+                    conn.execute(text(
+                        "CREATE INDEX ix_raw_telegram_messages_unextracted ON raw_telegram_messages (id) "
+                        "WHERE mentions_extracted_at IS NULL"
+                    ))
             logger.info("Database tables created/verified successfully")
             
         except SQLAlchemyError as e:
             logger.error(f"Error creating database tables: {e}")
             raise
         
-    def load_messages_to_db(self):
-        """Load scraped Telegram messages into the database with validation."""
+    def _compact_message_copies(self, conn):
+        """Fold the per-scrape message copies of an older schema into one row per message.
+        
+        Earlier loads inserted a full copy of a message at every scrape to record
+        its counts. Each copy's counts become a metrics snapshot, the most recent
+        copy is kept as the message's row, and the unique key is added. Does
+        nothing once the table has the current schema.
+        
+        Args:
+            conn (Connection): Connection inside a transaction
+        """
+        # Concurrent partition loads must not both migrate
+        conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('raw_telegram_messages'))"))
+        columns = {column['name'] for column in inspect(conn).get_columns('raw_telegram_messages')}
+        if 'views' not in columns:
+            return
+        
+        logger.info("Compacting per-scrape message copies into message_metrics_snapshots")
+        conn.execute(text("""
+            INSERT INTO message_metrics_snapshots (channel_name, message_id, scraped_at, views, forwards)
+            SELECT channel_name, message_id, scraped_date, MAX(views), MAX(forwards)
+            FROM raw_telegram_messages
+            GROUP BY channel_name, message_id, scraped_date
+            ON CONFLICT DO NOTHING
+        """))
+        removed = conn.execute(text("""
+            WITH latest AS (
+                SELECT DISTINCT ON (channel_name, message_id) id
+                FROM raw_telegram_messages
+                ORDER BY channel_name, message_id, scraped_date DESC, id DESC
+            )
+            DELETE FROM raw_telegram_messages m
+            WHERE NOT EXISTS (SELECT 1 FROM latest WHERE latest.id = m.id)
+        """)).rowcount
+        # CASCADE drops the dbt staging views still reading the old columns; the next dbt run recreates them
+        conn.execute(text("""
+            ALTER TABLE raw_telegram_messages
+                DROP COLUMN views CASCADE,
+                DROP COLUMN forwards CASCADE,
+                ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP,
+                ADD CONSTRAINT uq_raw_telegram_messages_channel_message UNIQUE (channel_name, message_id)
+        """))
+        conn.execute(text("UPDATE raw_telegram_messages SET updated_at = COALESCE(created_at, scraped_date)"))
+        logger.info(f"Removed {removed} duplicate message copies; VACUUM FULL raw_telegram_messages reclaims their space")
+    
+    def load_messages_to_db(self, channel_name: str = None, day: date = None):
+        """Load scraped Telegram messages into the database with validation.
+        
+        Without arguments every file in the data lake is loaded, otherwise only
+        the file of one channel and day. Loading is idempotent: messages are
+        upserted and a file's counts are recorded once, so partitions can be re-run.
+        
+        Args:
+            channel_name (str, optional): Channel of the partition to load
+            day (date, optional): Day of the partition to load
+            
+        Returns:
+            int: Number of messages loaded
+        """
         try:
             logger.info("Starting message data loading process")
             
             total_messages = 0
             processed_channels = 0
             
-            # Process each day's data
-            for date_dir in self.data_dir.iterdir():
-                if date_dir.is_dir():
-                    date_str = date_dir.name
-                    process_date = datetime.strptime(date_str, "%Y-%m-%d").date()
-                    
-                    for channel_dir in date_dir.iterdir():
-                        if channel_dir.is_dir():
-                            channel_name = channel_dir.name
-                            data_file = channel_dir / "messages.json"
-                            
-                            if data_file.exists():
-                                messages_loaded = self._process_channel_messages(data_file, channel_name, process_date)
-                                total_messages += messages_loaded
-                                processed_channels += 1
+            if channel_name and day:
+                # Scraper layout: YYYY-MM-DD/channel_name.json
+                data_file = self.data_dir / day.isoformat() / f"{channel_name}.json"
+                if not data_file.exists():
+                    logger.warning(f"No message file for {channel_name} on {day}: {data_file}")
+                    return 0
+                total_messages = self._process_channel_messages(data_file, channel_name, day)
+                processed_channels = 1
+            else:
+                # Process each day's data
+                for date_dir in self.data_dir.iterdir():
+                    if date_dir.is_dir():
+                        date_str = date_dir.name
+                        process_date = datetime.strptime(date_str, "%Y-%m-%d").date()
+                        
+                        for data_file in sorted(date_dir.glob("*.json")):
+                            messages_loaded = self._process_channel_messages(data_file, data_file.stem, process_date)
+                            total_messages += messages_loaded
+                            processed_channels += 1
             
             logger.info(f"Completed message loading: {total_messages} messages from {processed_channels} channels")
             return total_messages
@@ -96,24 +186,36 @@ class DatabaseLoader:
             logger.error(f"Error in message loading process: {e}")
             raise
             
-    def load_images_to_db(self):
-        """Load image metadata into the database."""
+    def load_images_to_db(self, channel_name: str = None, day: date = None):
+        """Load image metadata into the database.
+        
+        Args:
+            channel_name (str, optional): Channel of the partition to load, replacing earlier rows
+            day (date, optional): Day of the partition to load
+            
+        Returns:
+            int: Number of images loaded
+        """
         try:
             logger.info("Starting image metadata loading process")
             
             total_images = 0
             
-            # Process each day's images
-            for date_dir in self.images_dir.iterdir():
-                if date_dir.is_dir():
-                    date_str = date_dir.name
-                    process_date = datetime.strptime(date_str, "%Y-%m-%d").date()
-                    
-                    for channel_dir in date_dir.iterdir():
-                        if channel_dir.is_dir():
-                            channel_name = channel_dir.name
-                            images_loaded = self._process_channel_images(channel_dir, channel_name, process_date)
-                            total_images += images_loaded
+            if channel_name and day:
+                channel_dir = self.images_dir / day.isoformat() / channel_name
+                if channel_dir.is_dir():
+                    total_images = self._process_channel_images(channel_dir, channel_name, day, replace=True)
+            else:
+                # Process each day's images
+                for date_dir in self.images_dir.iterdir():
+                    if date_dir.is_dir():
+                        date_str = date_dir.name
+                        process_date = datetime.strptime(date_str, "%Y-%m-%d").date()
+                        
+                        for channel_dir in date_dir.iterdir():
+                            if channel_dir.is_dir():
+                                images_loaded = self._process_channel_images(channel_dir, channel_dir.name, process_date)
+                                total_images += images_loaded
             
             logger.info(f"Completed image metadata loading: {total_images} images")
             return total_images
@@ -122,9 +224,28 @@ class DatabaseLoader:
             logger.error(f"Error in image metadata loading process: {e}")
             raise
     
+    def _replace_partition(self, table: str, df: pd.DataFrame, channel_name: str, process_date: date):
+        """Replace the rows of one channel and day in a table with `df`, in one transaction.
+        
+        Args:
+            table (str): Table name
+            df (pd.DataFrame): Rows to insert
+            channel_name (str): Name of the Telegram channel
+            process_date (date): Date of the data
+        """
+        with self.engine.begin() as conn:
+            conn.execute(
+                text(f"DELETE FROM {table} WHERE channel_name = :channel_name AND scraped_date = :process_date"),
+                {'channel_name': channel_name, 'process_date': process_date}
+            )
+            df.to_sql(table, conn, if_exists='append', index=False)
+    
     def _process_channel_messages(self, data_file: Path, channel_name: str, process_date: datetime):
         """Process and load message data for a single channel with validation.
         
+        The counts are recorded as of the file's modification time, when the
+        scraper wrote it.
+        
         Args:
             data_file (Path): Path to the JSON data file
             channel_name (str): Name of the Telegram channel
@@ -148,48 +269,121 @@ class DatabaseLoader:
             for msg in messages:
                 if self._validate_message(msg):
                     validated_msg = self._clean_message_data(msg)
+                    validated_msg['channel_name'] = channel_name
                     validated_messages.append(validated_msg)
             
             if not validated_messages:
                 logger.warning(f"No valid messages found in {data_file}")
                 return 0
-                
-            # Create DataFrame
-            df = pd.DataFrame(validated_messages)
-            
-            # Add metadata
-            df['channel_name'] = channel_name
-            df['scraped_date'] = process_date
-            df['created_at'] = datetime.utcnow()
             
             # Load to database
-            df.to_sql(
-                'raw_telegram_messages',
-                self.engine,
-                if_exists='append',
-                index=False
-            )
+            scraped_at = datetime.utcfromtimestamp(data_file.stat().st_mtime)
+            loaded = self._upsert_messages(validated_messages, scraped_at)
             
-            logger.info(f"Successfully loaded {len(df)} messages from {channel_name}")
-            return len(df)
+            self.metrics.add(items=loaded, bytes=data_file.stat().st_size, messages=loaded)
+            logger.info(f"Successfully loaded {loaded} messages from {channel_name}")
+            return loaded
             
         except json.JSONDecodeError as e:
             logger.error(f"Error decoding JSON from {data_file}: {e}")
             return 0
         except SQLAlchemyError as e:
+            # Fail the stage rather than report a partial load as complete
             logger.error(f"Database error loading {channel_name} messages: {e}")
-            return 0
+            raise
         except Exception as e:
             logger.error(f"Error processing {channel_name} messages: {e}")
             return 0
     
-    def _process_channel_images(self, channel_dir: Path, channel_name: str, process_date: datetime):
+    def _upsert_messages(self, messages: List[dict], scraped_at: datetime) -> int:
+        """Store each message once and append its current counts as a snapshot.
+        
+        A message seen again only has its row rewritten when its text or media
+        changed in a scrape at least as recent as the stored one; its new views
+        and forwards go to `message_metrics_snapshots`. New messages are assigned
+        a near-duplicate cluster in the same transaction.
+        Counts captured at the same `scraped_at` are only stored once.
+        
+        Args:
+            messages (List[dict]): Cleaned messages, each with its channel_name
+            scraped_at (datetime): When the counts were captured
+            
+        Returns:
+            int: Number of messages written
+        """
+        # A batch may hold a message and its later edit; keep the edit
+        latest = {(message['channel_name'], message['message_id']): message for message in messages}
+        now = datetime.utcnow()
+        bodies, snapshots = [], []
+        for message in latest.values():
+            message_date = message['message_date']
+            if message_date is not None:
+                # Telegram dates are UTC; the column is a naive timestamp
+                if message_date.tzinfo is not None:
+                    message_date = message_date.tz_convert(None)
+                message_date = message_date.to_pydatetime()
+            bodies.append({
+                'message_id': message['message_id'],
+                'channel_name': message['channel_name'],
+                'message_text': message['message_text'],
+                'message_date': message_date,
+                'has_media': message['has_media'],
+                'scraped_date': scraped_at,
+                'created_at': now,
+                'updated_at': now
+            })
+            snapshots.append({
+                'channel_name': message['channel_name'],
+                'message_id': message['message_id'],
+                'scraped_at': scraped_at,
+                'views': message['views'],
+                'forwards': message['forwards']
+            })
+        if not bodies:
+            return 0
+        
+        table = self.tables['raw_telegram_messages']
+        upsert = insert(table)
+        upsert = upsert.on_conflict_do_update(
+            constraint='uq_raw_telegram_messages_channel_message',
+            set_={
+                'message_text': upsert.excluded.message_text,
+                'message_date': upsert.excluded.message_date,
+                'has_media': upsert.excluded.has_media,
+                'scraped_date': upsert.excluded.scraped_date,
+                'updated_at': upsert.excluded.updated_at,
+                'mentions_extracted_at': None  # Edited text is scanned for mentions again
+            },
+            # Reloading an older file must not undo a later edit
+            where=and_(
+                table.c.scraped_date <= upsert.excluded.scraped_date,
+                or_(
+                    table.c.message_text.is_distinct_from(upsert.excluded.message_text),
+                    table.c.has_media.is_distinct_from(upsert.excluded.has_media)
+                )
+            )
+        )
+        with self.engine.begin() as conn:
+            written = conn.execute(
+                upsert.returning(table.c.id, table.c.channel_name, table.c.message_id, table.c.message_text,
+                                 table.c.duplicate_cluster_id),
+                bodies
+            ).fetchall()
+            conn.execute(insert(self.tables['message_metrics_snapshots']).on_conflict_do_nothing(), snapshots)
+            # New messages join a duplicate cluster; edited ones keep theirs
+            new_messages = sorted((row for row in written if row.duplicate_cluster_id is None), key=lambda row: row.id)
+            duplicates = self.deduplicator.assign(conn, new_messages)
+        self.metrics.add(duplicates=duplicates)
+        return len(bodies)
+    
+    def _process_channel_images(self, channel_dir: Path, channel_name: str, process_date: datetime, replace: bool = False):
         """Process and load image metadata for a single channel.
         
         Args:
             channel_dir (Path): Directory containing images
             channel_name (str): Name of the Telegram channel
             process_date (datetime): Date of the data
+            replace (bool): Replace the rows loaded earlier for this channel and date
             
         Returns:
             int: Number of images processed
@@ -217,13 +411,17 @@ class DatabaseLoader:
             
             # Create DataFrame and load to database
             df = pd.DataFrame(image_data)
-            df.to_sql(
-                'telegram_images',
-                self.engine,
-                if_exists='append',
-                index=False
-            )
+            if replace:
+                self._replace_partition('telegram_images', df, channel_name, process_date)
+            else:
+                df.to_sql(
+                    'telegram_images',
+                    self.engine,
+                    if_exists='append',
+                    index=False
+                )
             
+            self.metrics.add(items=len(df), images=len(df))
             logger.info(f"Successfully loaded {len(df)} image records from {channel_name}")
             return len(df)
             
@@ -231,6 +429,43 @@ class DatabaseLoader:
             logger.error(f"Error processing images for {channel_name}: {e}")
             return 0
     
+    def load_message_batch(self, channel_messages: List[tuple], scraped_date: datetime) -> int:
+        """Upsert a micro-batch of messages from different channels in one transaction.
+        
+        Used by the streaming listener; invalid messages are skipped.
+        
+        Args:
+            channel_messages (List[tuple]): (channel_name, message dict) pairs, with messages
+                shaped like the scraper's JSON records
+            scraped_date (datetime): When the batch was received
+            
+        Returns:
+            int: Number of messages written
+        """
+        messages = [
+            dict(self._clean_message_data(message), channel_name=channel_name)
+            for channel_name, message in channel_messages if self._validate_message(message)
+        ]
+        loaded = self._upsert_messages(messages, scraped_date)
+        if loaded:
+            self.metrics.add(items=loaded, messages=loaded)
+        return loaded
+    
+    def load_image_batch(self, images: List[dict]) -> int:
+        """Insert a micro-batch of image metadata rows in one round trip.
+        
+        Args:
+            images (List[dict]): Rows with message_id, channel_name, image_path, image_date and scraped_date
+            
+        Returns:
+            int: Number of images inserted
+        """
+        if images:
+            with self.engine.begin() as conn:
+                conn.execute(self.tables['telegram_images'].insert(), images)
+            self.metrics.add(items=len(images), images=len(images))
+        return len(images)
+    
     def _validate_message(self, message: dict) -> bool:
         """Validate a message dictionary.
         
@@ -291,20 +526,36 @@ class DatabaseLoader:
             logger.error(f"Error getting data summary: {e}")
             return None
 
-def run_database_loader():
-    """Run the comprehensive database loader."""
-    loader = DatabaseLoader()
+def run_database_loader(channel_name: str = None, day: date = None, messages: bool = True, images: bool = True):
+    """Run the comprehensive database loader.
+    
+    Args:
+        channel_name (str, optional): Only load this channel's partition for `day`
+        day (date, optional): Only load this day's partition for `channel_name`
+        messages (bool): Load scraped messages
+        images (bool): Load downloaded image metadata
     
-    # Load messages
-    messages_loaded = loader.load_messages_to_db()
+    Returns:
+        dict: Stage metrics of the run
+    """
+    loader = DatabaseLoader()
+    messages_loaded = images_loaded = 0
     
-    # Load image metadata
-    images_loaded = loader.load_images_to_db()
+    with loader.metrics.track():
+        # Load messages
+        if messages:
+            messages_loaded = loader.load_messages_to_db(channel_name, day)
+        
+        # Load image metadata
+        if images:
+            images_loaded = loader.load_images_to_db(channel_name, day)
     
-    # Get summary
-    summary = loader.get_data_summary()
+    # Get summary (whole-table counts, skipped for single partitions)
+    if day is None:
+        summary = loader.get_data_summary()
     
     logger.info(f"Database loading completed - Messages: {messages_loaded}, Images: {images_loaded}")
+    return loader.metrics.to_dict()
 
 def main():
     """Main function to run the database loader."""
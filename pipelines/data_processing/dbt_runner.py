@@ -0,0 +1,130 @@
+import json
+import shutil
+import subprocess
+from pathlib import Path
+import sys
+sys.path.append(str(Path(__file__).parent.parent.parent))  # Add project root to path
+
+from src.common.logger import get_logger
+from src.common.config import settings
+
+logger = get_logger(__name__)
+
+# Sources whose newest `loaded_at_field` moved since the last successful run, plus
+# models whose definition changed, together with everything downstream of them
+SELECTIVE_SELECTOR = "source_status:fresher+ state:modified+"
+
+# Artifacts from a successful run that the next run compares against
+STATE_ARTIFACTS = ["manifest.json", "sources.json"]
+
+
+class DbtRunner:
+    """A class to run dbt transformations, rebuilding only what new raw data affects."""
+
+    def __init__(self, project_dir: str = None, state_dir: str = None):
+        """Initialize the dbt runner.
+
+        Args:
+            project_dir (str, optional): dbt project directory (also holds profiles.yml)
+            state_dir (str, optional): Directory holding the artifacts of the last successful run
+        """
+        self.project_dir = Path(project_dir or settings.dbt_project_dir).resolve()
+        self.state_dir = Path(state_dir or settings.dbt_state_dir).resolve()
+        self.target_dir = self.project_dir / "target"
+
+    def _dbt(self, *args) -> subprocess.CompletedProcess:
+        """Invoke the dbt CLI against the project.
+
+        Args:
+            *args: dbt command and arguments
+
+        Returns:
+            CompletedProcess: The finished dbt process
+        """
+        command = ["dbt", *args, "--project-dir", str(self.project_dir), "--profiles-dir", str(self.project_dir)]
+        logger.info(f"Running {' '.join(command)}")
+        result = subprocess.run(command, cwd=self.project_dir, capture_output=True, text=True)
+        for line in result.stdout.splitlines():
+            logger.debug(line)
+        return result
+
+    def has_state(self) -> bool:
+        """Check whether artifacts from a previous successful run are available."""
+        return all((self.state_dir / name).exists() for name in STATE_ARTIFACTS)
+
+    def _save_state(self):
+        """Keep this run's artifacts as the comparison point for the next run."""
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        for name in STATE_ARTIFACTS:
+            artifact = self.target_dir / name
+            if artifact.exists():
+                shutil.copy2(artifact, self.state_dir / name)
+
+    def _run_results(self) -> list:
+        """Read the node results of the last dbt invocation."""
+        try:
+            with open(self.target_dir / "run_results.json", 'r', encoding='utf-8') as f:
+                return json.load(f).get('results', [])
+        except (OSError, json.JSONDecodeError):
+            return []
+
+    def run(self, full_refresh: bool = False) -> dict:
+        """Run the dbt models affected by raw data changed since the last successful run.
+
+        Falls back to building every model when there is no previous state to
+        compare against, or when source freshness could not be collected.
+
+        Args:
+            full_refresh (bool): Rebuild every model, including incremental ones, from scratch
+
+        Returns:
+            dict: Build mode and the models that were run
+        """
+        packages_dir = self.project_dir / "dbt_packages"
+        if not packages_dir.exists() or not any(packages_dir.iterdir()):
+            result = self._dbt("deps")
+            if result.returncode != 0:
+                raise RuntimeError(f"dbt deps failed:\n{result.stdout[-2000:]}")
+
+        # Records the newest loaded_at of every raw source in target/sources.json
+        (self.target_dir / "sources.json").unlink(missing_ok=True)
+        freshness = self._dbt("source", "freshness")
+        if freshness.returncode != 0:
+            logger.warning("dbt source freshness reported stale or missing sources")
+
+        args = ["run"]
+        if full_refresh:
+            mode = "full-refresh"
+            args.append("--full-refresh")
+        elif self.has_state() and (self.target_dir / "sources.json").exists():
+            mode = "selective"
+            args += ["--select", SELECTIVE_SELECTOR, "--state", str(self.state_dir)]
+        else:
+            mode = "full"
+
+        logger.info(f"Starting {mode} dbt run")
+        (self.target_dir / "run_results.json").unlink(missing_ok=True)
+        result = self._dbt(*args)
+        if result.returncode != 0:
+            raise RuntimeError(f"dbt {mode} run failed:\n{result.stdout[-2000:]}")
+
+        models = [node['unique_id'] for node in self._run_results() if node.get('status') == 'success']
+        self._save_state()
+
+        logger.info(f"Completed {mode} dbt run: {len(models)} models built")
+        return {'mode': mode, 'models': models}
+
+
+def run_dbt_transformations(full_refresh: bool = False):
+    """Run the dbt transformations."""
+    runner = DbtRunner()
+    return runner.run(full_refresh=full_refresh)
+
+
+def main():
+    """Main function to run the dbt transformations."""
+    run_dbt_transformations()
+
+
+if __name__ == "__main__":
+    main()
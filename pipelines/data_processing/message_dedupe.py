@@ -0,0 +1,324 @@
+import hashlib
+import zlib
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+import numpy as np
+from sqlalchemy import text, MetaData, Table, Column, Integer, SmallInteger, BigInteger, String, DateTime, LargeBinary
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+import sys
+sys.path.append(str(Path(__file__).parent.parent.parent))  # Add project root to path
+
+from src.common.logger import get_logger
+from src.common.config import settings
+from src.common.database import get_engine
+from src.common.stage_metrics import StageMetrics
+from pipelines.data_processing.product_extraction import normalize_text
+
+logger = get_logger(__name__)
+
+# Signatures are stored, so changing these requires `run_message_dedupe(rebuild=True)`
+NUM_PERM = 128
+BANDS = 16  # 8 rows per band: pairs at 0.8 similarity share a bucket 95% of the time, at 0.9 almost always
+SHINGLE_SIZE = 5
+_PRIME = (1 << 32) - 5  # Largest 32-bit prime; a * hash + b stays below 2**64
+
+
+class MinHasher:
+    """MinHash signatures over character shingles of normalized message text.
+
+    Character shingles survive the small changes copies of an advertisement
+    carry (a price, a phone number, punctuation) and work the same for Amharic
+    and Latin script. Each of the `num_perm` hash functions is a random
+    universal hash `(a * x + b) mod p` of the shingle's CRC32.
+    """
+
+    def __init__(self, num_perm: int = NUM_PERM, shingle_size: int = SHINGLE_SIZE, seed: int = 1):
+        """Initialize the hash functions.
+
+        Args:
+            num_perm (int): Number of hash functions, i.e. the signature length
+            shingle_size (int): Characters per shingle
+            seed (int): Seed of the hash coefficients; fixed so stored signatures stay comparable
+        """
+        rng = np.random.RandomState(seed)
+        self.shingle_size = shingle_size
+        self._a = rng.randint(1, _PRIME, size=num_perm, dtype=np.uint64)[:, None]
+        self._b = rng.randint(0, _PRIME, size=num_perm, dtype=np.uint64)[:, None]
+
+    def shingles(self, message_text: Optional[str]) -> set:
+        """Get the distinct character shingles of a message's normalized text."""
+        value = normalize_text(message_text or "")
+        if len(value) <= self.shingle_size:
+            return {value} if value else set()
+        return {value[i:i + self.shingle_size] for i in range(len(value) - self.shingle_size + 1)}
+
+    def signature(self, message_text: Optional[str]) -> Optional[np.ndarray]:
+        """Compute the MinHash signature of a message.
+
+        Args:
+            message_text (str): Message text
+
+        Returns:
+            np.ndarray: uint32 signature, or None for messages without text
+        """
+        shingles = self.shingles(message_text)
+        if not shingles:
+            return None
+        hashes = np.fromiter((zlib.crc32(shingle.encode('utf-8')) for shingle in shingles),
+                             dtype=np.uint64, count=len(shingles))
+        return ((self._a * hashes + self._b) % _PRIME).min(axis=1).astype(np.uint32)
+
+
+def similarity(signature: np.ndarray, other: np.ndarray) -> float:
+    """Estimate the Jaccard similarity of two messages from their signatures."""
+    return float(np.mean(signature == other))
+
+
+def band_keys(signature: np.ndarray, bands: int = BANDS) -> List[int]:
+    """Hash each band of a signature to a signed 64-bit bucket key."""
+    return [
+        int.from_bytes(hashlib.blake2b(band.tobytes(), digest_size=8).digest(), 'big', signed=True)
+        for band in signature.reshape(bands, -1)
+    ]
+
+
+class LSHIndex:
+    """In-memory LSH index from band buckets to the clusters whose canonical signature falls in them."""
+
+    def __init__(self, bands: int = BANDS):
+        self.bands = bands
+        self._buckets = defaultdict(set)
+        self._signatures = {}
+
+    def add(self, cluster_id: int, signature: np.ndarray, keys: List[int] = None):
+        """Index a cluster's canonical signature.
+
+        Args:
+            cluster_id (int): Cluster id
+            signature (np.ndarray): Signature of the cluster's canonical message
+            keys (List[int], optional): Its band keys, if already computed
+        """
+        self._signatures[cluster_id] = signature
+        for band, bucket in enumerate(keys or band_keys(signature, self.bands)):
+            self._buckets[(band, bucket)].add(cluster_id)
+
+    def match(self, signature: np.ndarray, threshold: float, keys: List[int] = None) -> Optional[int]:
+        """Find the cluster most similar to a signature.
+
+        Only clusters sharing a bucket with the signature are compared.
+
+        Args:
+            signature (np.ndarray): Signature to look up
+            threshold (float): Lowest estimated similarity that counts as a duplicate
+            keys (List[int], optional): Its band keys, if already computed
+
+        Returns:
+            int: Id of the most similar cluster at or above the threshold (lowest id on ties), or None
+        """
+        candidates = set()
+        for band, bucket in enumerate(keys or band_keys(signature, self.bands)):
+            candidates |= self._buckets.get((band, bucket), set())
+        best, best_similarity = None, 0.0
+        for cluster_id in sorted(candidates):
+            candidate_similarity = similarity(signature, self._signatures[cluster_id])
+            if candidate_similarity >= threshold and candidate_similarity > best_similarity:
+                best, best_similarity = cluster_id, candidate_similarity
+        return best
+
+
+class MessageDeduplicator:
+    """Group near-duplicate messages, within and across channels, into clusters.
+
+    A cluster is founded by the first message loaded with its content. That
+    message is the cluster's canonical one, and its row id is the
+    `duplicate_cluster_id` of every member. Only canonical signatures are
+    indexed, in `message_lsh_buckets`, so a message is compared against the
+    few clusters sharing a bucket with it rather than every stored message,
+    and all members stay close to their canonical message.
+    """
+
+    def __init__(self, engine=None, threshold: float = None):
+        """Initialize the deduplicator.
+
+        Args:
+            engine (Engine, optional): Database engine, defaults to the shared one
+            threshold (float, optional): Lowest estimated Jaccard similarity of a duplicate,
+                defaults to the configured threshold
+        """
+        self.engine = engine or get_engine()
+        self.threshold = threshold or settings.dedupe_threshold
+        self.hasher = MinHasher()
+        self.metrics = StageMetrics('deduplicate_messages')
+        self.clusters, self.buckets = self._create_tables()
+
+    def _create_tables(self):
+        """Create the cluster and bucket tables if they don't exist.
+
+        Returns:
+            tuple: The `message_duplicate_clusters` and `message_lsh_buckets` tables
+        """
+        try:
+            metadata = MetaData()
+
+            clusters = Table('message_duplicate_clusters', metadata,
+                Column('cluster_id', Integer, primary_key=True),
+                Column('channel_name', String(100), nullable=False),
+                Column('message_id', Integer, nullable=False),
+                Column('signature', LargeBinary, nullable=False),
+                Column('created_at', DateTime, default=datetime.utcnow)
+            )
+
+            buckets = Table('message_lsh_buckets', metadata,
+                Column('band', SmallInteger, primary_key=True),
+                Column('bucket', BigInteger, primary_key=True),
+                Column('cluster_id', Integer, primary_key=True)
+            )
+
+            metadata.create_all(self.engine)
+            return clusters, buckets
+
+        except SQLAlchemyError as e:
+            logger.error(f"Error creating deduplication tables: {e}")
+            raise
+
+    def assign(self, conn, messages: list) -> int:
+        """Assign clusters to messages and store the ones that found new clusters.
+
+        Args:
+            conn (Connection): Connection inside the transaction that wrote the messages
+            messages (list): Rows with `id`, `channel_name`, `message_id` and `message_text`, oldest first
+
+        Returns:
+            int: Number of messages that joined an existing cluster
+        """
+        if not messages:
+            return 0
+        # Loads assign one at a time, so copies loaded concurrently still find each other
+        conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('message_lsh_buckets'))"))
+
+        signed = []
+        for message in messages:
+            signature = self.hasher.signature(message.message_text)
+            signed.append((message, signature, band_keys(signature) if signature is not None else None))
+
+        # Load only the stored clusters sharing a bucket with the batch
+        wanted = [(band, bucket) for _, _, keys in signed if keys for band, bucket in enumerate(keys)]
+        index = LSHIndex()
+        if wanted:
+            bands, keys = zip(*wanted)
+            stored = conn.execute(text("""
+                SELECT DISTINCT c.cluster_id, c.signature
+                FROM unnest(CAST(:bands AS smallint[]), CAST(:buckets AS bigint[])) AS k(band, bucket)
+                JOIN message_lsh_buckets b ON b.band = k.band AND b.bucket = k.bucket
+                JOIN message_duplicate_clusters c ON c.cluster_id = b.cluster_id
+            """), {'bands': list(bands), 'buckets': list(keys)})
+            for row in stored:
+                index.add(row.cluster_id, np.frombuffer(row.signature, dtype=np.uint32))
+
+        row_ids, cluster_ids, new_clusters, new_buckets = [], [], [], []
+        for message, signature, keys in signed:
+            cluster_id = index.match(signature, self.threshold, keys) if signature is not None else None
+            if cluster_id is None:
+                # Founds its own cluster; messages without text are never duplicates
+                cluster_id = message.id
+                if signature is not None:
+                    index.add(cluster_id, signature, keys)
+                    new_clusters.append({
+                        'cluster_id': cluster_id,
+                        'channel_name': message.channel_name,
+                        'message_id': message.message_id,
+                        'signature': signature.tobytes(),
+                        'created_at': datetime.utcnow()
+                    })
+                    new_buckets.extend({'band': band, 'bucket': bucket, 'cluster_id': cluster_id}
+                                       for band, bucket in enumerate(keys))
+            row_ids.append(message.id)
+            cluster_ids.append(cluster_id)
+
+        if new_clusters:
+            conn.execute(insert(self.clusters).on_conflict_do_nothing(), new_clusters)
+            conn.execute(insert(self.buckets).on_conflict_do_nothing(), new_buckets)
+        conn.execute(text("""
+            UPDATE raw_telegram_messages m
+            SET duplicate_cluster_id = a.cluster_id
+            FROM unnest(CAST(:row_ids AS integer[]), CAST(:cluster_ids AS integer[])) AS a(row_id, cluster_id)
+            WHERE m.id = a.row_id
+        """), {'row_ids': row_ids, 'cluster_ids': cluster_ids})
+        return sum(1 for row_id, cluster_id in zip(row_ids, cluster_ids) if row_id != cluster_id)
+
+    def deduplicate(self, rebuild: bool = False, batch_size: int = 5000) -> int:
+        """Assign clusters to the stored messages that have none, oldest first.
+
+        The loader assigns clusters as it writes messages; this backfills rows
+        loaded before, or all rows after the signature parameters changed.
+
+        Args:
+            rebuild (bool): Drop every cluster and assign them again from scratch
+            batch_size (int): Messages assigned per transaction
+
+        Returns:
+            int: Number of messages that joined an existing cluster
+        """
+        try:
+            logger.info("Starting message deduplication")
+
+            if rebuild:
+                with self.engine.begin() as conn:
+                    conn.execute(text("TRUNCATE message_lsh_buckets, message_duplicate_clusters"))
+                    conn.execute(text("UPDATE raw_telegram_messages SET duplicate_cluster_id = NULL"))
+
+            total_scanned = total_duplicates = 0
+            last_id = 0
+            while True:
+                with self.engine.begin() as conn:
+                    rows = conn.execute(text("""
+                        SELECT id, channel_name, message_id, message_text
+                        FROM raw_telegram_messages
+                        WHERE id > :last_id AND duplicate_cluster_id IS NULL
+                        ORDER BY id
+                        LIMIT :batch_size
+                    """), {'last_id': last_id, 'batch_size': batch_size}).fetchall()
+
+                    if not rows:
+                        break
+
+                    duplicates = self.assign(conn, rows)
+
+                total_scanned += len(rows)
+                total_duplicates += duplicates
+                self.metrics.add(items=len(rows), duplicates=duplicates)
+                last_id = rows[-1].id
+
+            logger.info(f"Completed message deduplication: {total_duplicates} duplicates among {total_scanned} messages")
+            return total_duplicates
+
+        except SQLAlchemyError as e:
+            logger.error(f"Database error deduplicating messages: {e}")
+            raise
+
+
+def run_message_dedupe(rebuild: bool = False):
+    """Run the message deduplication backfill.
+
+    Args:
+        rebuild (bool): Reassign every message from scratch
+
+    Returns:
+        dict: Stage metrics of the run
+    """
+    deduplicator = MessageDeduplicator()
+    with deduplicator.metrics.track():
+        deduplicator.deduplicate(rebuild=rebuild)
+    return deduplicator.metrics.to_dict()
+
+
+def main():
+    """Main function to run the message deduplication backfill."""
+    run_message_dedupe()
+
+
+if __name__ == "__main__":
+    main()
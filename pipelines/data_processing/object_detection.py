@@ -15,55 +15,130 @@
 # For more details, see the README section on Machine Learning Integration.
 
 import os
+import threading
 from pathlib import Path
-from ultralytics import YOLO
+from datetime import date, datetime
 import pandas as pd
-from sqlalchemy import create_engine
+from sqlalchemy import inspect, text
 from src.common.logger import get_logger
 from src.common.config import settings
+from src.common.database import get_engine
+from src.common.stage_metrics import StageMetrics
 
 logger = get_logger(__name__)
 
+# Loaded models by weights path, shared by every detector in the process
+_models = {}
+_models_lock = threading.Lock()
+
+def get_model(weights: str = None):
+    """Get a loaded YOLO model, loading it on first use in this process.
+    
+    ultralytics (and torch) are imported here rather than at module load, so
+    processes that import this module without detecting anything don't pay for them.
+    
+    Args:
+        weights (str, optional): Weights file, defaults to `settings.yolo_weights`
+        
+    Returns:
+        YOLO: The loaded model
+    """
+    weights = weights or settings.yolo_weights
+    with _models_lock:
+        if weights not in _models:
+            from ultralytics import YOLO
+            logger.info(f"Loading YOLO model {weights}")
+            _models[weights] = YOLO(weights)
+        return _models[weights]
+
 class ObjectDetector:
     """A class to detect objects in downloaded images using YOLOv8."""
     
-    def __init__(self):
-        """Initialize the object detector."""
-        self.model = YOLO('yolov8n.pt')  # Load pretrained model
-        self.engine = create_engine(
-            f"postgresql://{settings.postgres_user}:{settings.postgres_password}@"
-            f"{settings.postgres_host}:{settings.postgres_port}/{settings.postgres_db}"
-        )
+    def __init__(self, model=None):
+        """Initialize the object detector.
+        
+        Args:
+            model (YOLO, optional): Loaded model to use, defaults to the process-wide cached one
+        """
+        self.model = model or get_model()
+        self.engine = get_engine()
         self.image_dir = Path(settings.data_dir) / "raw" / "telegram_images"
         self.results = []
+        self.metrics = StageMetrics('run_yolo_enrichment')
+        
+    def detect_objects(self, channel_name: str = None, day: date = None):
+        """Detect objects in downloaded images.
+        
+        Without arguments every image in the data lake is processed. Given a
+        channel and day, only that partition's images are, and the detections
+        stored for them by an earlier run are replaced.
         
-    def detect_objects(self):
-        """Detect objects in all downloaded images."""
+        Args:
+            channel_name (str, optional): Channel of the partition to process
+            day (date, optional): Day of the partition to process
+        """
         try:
             logger.info("Starting object detection process")
             
-            # Process each channel's images
-            for channel_dir in self.image_dir.iterdir():
+            if channel_name and day:
+                channel_dir = self.image_dir / day.isoformat() / channel_name
                 if channel_dir.is_dir():
-                    channel_name = channel_dir.name
                     self._process_channel_images(channel_dir, channel_name)
+            else:
+                # Images are stored as YYYY-MM-DD/channel_name/message_id.jpg
+                for date_dir in self.image_dir.iterdir():
+                    if date_dir.is_dir():
+                        for channel_dir in date_dir.iterdir():
+                            if channel_dir.is_dir():
+                                self._process_channel_images(channel_dir, channel_dir.name)
             
             # Save results to database
-            if self.results:
-                df = pd.DataFrame(self.results)
-                df.to_sql(
-                    'raw_image_detections',
-                    self.engine,
-                    if_exists='append',
-                    index=False
-                )
-                logger.info(f"Saved {len(df)} detections to database")
+            with self.engine.begin() as conn:
+                table_exists = self._migrate_detections_table(conn)
+                if channel_name and day and table_exists:
+                    conn.execute(
+                        text("DELETE FROM raw_image_detections WHERE channel_name = :channel_name AND image_path LIKE :prefix"),
+                        {'channel_name': channel_name, 'prefix': f"{channel_dir}/%"}
+                    )
+                if self.results:
+                    df = pd.DataFrame(self.results)
+                    df.to_sql(
+                        'raw_image_detections',
+                        conn,
+                        if_exists='append',
+                        index=False
+                    )
+                    logger.info(f"Saved {len(df)} detections to database")
             
             logger.info("Completed object detection process")
         except Exception as e:
             logger.error(f"Error in object detection process: {e}")
             raise
             
+    def _migrate_detections_table(self, conn) -> bool:
+        """Add the columns current detections carry to a table created by an earlier version.
+        
+        pandas creates the table from the first detections it writes, so an
+        existing table may lack columns added since.
+        
+        Args:
+            conn (Connection): Connection inside the transaction that writes the detections
+            
+        Returns:
+            bool: Whether the `raw_image_detections` table exists
+        """
+        if not inspect(conn).has_table('raw_image_detections'):
+            return False
+        columns = {column['name'] for column in inspect(conn).get_columns('raw_image_detections')}
+        if 'created_at' not in columns:
+            # Freshness column of the dbt source
+            conn.execute(text("ALTER TABLE raw_image_detections ADD COLUMN IF NOT EXISTS created_at TIMESTAMP"))
+        for column in ['x1', 'y1', 'x2', 'y2']:
+            if column not in columns:
+                # Box corners, which tell apart same-class detections in one image
+                conn.execute(text(f"ALTER TABLE raw_image_detections ADD COLUMN IF NOT EXISTS {column} DOUBLE PRECISION"))
+        return True
+    
     def _process_channel_images(self, channel_dir: Path, channel_name: str):
         """Process images for a single channel.
         
@@ -92,22 +167,42 @@ class ObjectDetector:
         """
         try:
             results = self.model(image_path)
+            detections = 0
             
             for result in results:
+                detections += len(result.boxes)
                 for box in result.boxes:
+                    x1, y1, x2, y2 = (float(value) for value in box.xyxy[0])
                     self.results.append({
                         'channel_name': channel_name,
                         'message_id': message_id,
                         'object_class': result.names[int(box.cls)],
                         'confidence': float(box.conf),
-                        'image_path': str(image_path)
+                        'x1': x1,
+                        'y1': y1,
+                        'x2': x2,
+                        'y2': y2,
+                        'image_path': str(image_path),
+                        'created_at': datetime.utcnow()
                     })
             
-            logger.debug(f"Processed image {image_path.name} with {len(result.boxes)} detections")
+            self.metrics.add(items=1, bytes=image_path.stat().st_size, detections=detections)
+            logger.debug(f"Processed image {image_path.name} with {detections} detections")
         except Exception as e:
             logger.error(f"Error processing image {image_path.name}: {e}")
 
-def run_object_detection():
-    """Run the object detection process."""
-    detector = ObjectDetector()
-    detector.detect_objects()
\ No newline at end of file
+def run_object_detection(channel_name: str = None, day: date = None, model=None):
+    """Run the object detection process.
+    
+    Args:
+        channel_name (str, optional): Only process this channel's images for `day`
+        day (date, optional): Only process this day's images for `channel_name`
+        model (YOLO, optional): Loaded model to use, defaults to the process-wide cached one
+    
+    Returns:
+        dict: Stage metrics of the run
+    """
+    detector = ObjectDetector(model)
+    with detector.metrics.track():
+        detector.detect_objects(channel_name, day)
+    return detector.metrics.to_dict()
\ No newline at end of file
@@ -0,0 +1,287 @@
+import csv
+import unicodedata
+from collections import deque
+from pathlib import Path
+from datetime import datetime
+from sqlalchemy import text, MetaData, Table, Column, Integer, String, DateTime, UniqueConstraint, Index
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+import sys
+sys.path.append(str(Path(__file__).parent.parent.parent))  # Add project root to path
+
+from src.common.logger import get_logger
+from src.common.database import get_engine
+from src.common.stage_metrics import StageMetrics
+
+logger = get_logger(__name__)
+
+# The lexicon is maintained as a dbt seed so the marts can join against it as well
+DEFAULT_LEXICON_PATH = Path(__file__).parent.parent.parent / "dbt_project" / "seeds" / "product_lexicon.csv"
+
+
+def normalize_text(value: str) -> str:
+    """Normalize text for lexicon matching.
+
+    Applies NFKC normalization and case folding, and turns every character that is
+    not a letter or digit (including Ethiopic punctuation such as '።' and '፣') into
+    a single space.
+
+    Args:
+        value (str): Raw text
+
+    Returns:
+        str: Normalized text
+    """
+    value = unicodedata.normalize("NFKC", value).casefold()
+    chars = [ch if ch.isalnum() else " " for ch in value]
+    return " ".join("".join(chars).split())
+
+
+def _is_ascii_alnum(ch: str) -> bool:
+    return ch.isascii() and ch.isalnum()
+
+
+class ProductMatcher:
+    """Multi-pattern product matcher backed by an Aho-Corasick automaton.
+
+    Every message is scanned once regardless of the lexicon size. Latin aliases must
+    match whole words, while Ethiopic aliases may carry attached prefixes and
+    suffixes (e.g. 'የፓራሲታሞል'), which is how they usually appear in Amharic text.
+    """
+
+    def __init__(self, lexicon: dict):
+        """Build the automaton.
+
+        Args:
+            lexicon (dict): Mapping of alias to canonical product name
+        """
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+
+        for alias, product_name in lexicon.items():
+            alias = normalize_text(alias)
+            if alias:
+                self._add(alias, product_name)
+        self._build()
+
+    @classmethod
+    def from_csv(cls, path: Path = DEFAULT_LEXICON_PATH):
+        """Load a matcher from a lexicon CSV with `product_name` and `alias` columns.
+
+        Args:
+            path (Path): Path to the lexicon file
+
+        Returns:
+            ProductMatcher: Matcher for the lexicon
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            lexicon = {row['alias']: row['product_name'] for row in csv.DictReader(f)}
+        logger.info(f"Loaded {len(lexicon)} product aliases from {path}")
+        return cls(lexicon)
+
+    def _add(self, alias: str, product_name: str):
+        state = 0
+        for ch in alias:
+            if ch not in self._goto[state]:
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[state][ch] = len(self._goto) - 1
+            state = self._goto[state][ch]
+        self._output[state].append((alias, product_name))
+
+    def _build(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(ch, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def find(self, message_text: str) -> dict:
+        """Find the products mentioned in a message.
+
+        Args:
+            message_text (str): Message text
+
+        Returns:
+            dict: Mapping of product name to the first alias that matched it
+        """
+        if not message_text:
+            return {}
+
+        text_value = normalize_text(message_text)
+        matches = {}
+        state = 0
+        for end, ch in enumerate(text_value):
+            while state and ch not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(ch, 0)
+
+            for alias, product_name in self._output[state]:
+                if product_name in matches:
+                    continue
+                start = end - len(alias) + 1
+                before = text_value[start - 1] if start > 0 else " "
+                after = text_value[end + 1] if end + 1 < len(text_value) else " "
+                # Latin aliases must not be part of a longer Latin word
+                if _is_ascii_alnum(alias[0]) and _is_ascii_alnum(before):
+                    continue
+                if _is_ascii_alnum(alias[-1]) and _is_ascii_alnum(after):
+                    continue
+                matches[product_name] = alias
+        return matches
+
+
+class ProductMentionExtractor:
+    """Extract product mentions from raw messages into `raw_product_mentions`.
+
+    Extraction is incremental: each run only scans the raw messages not marked
+    as scanned yet (`mentions_extracted_at` is null), and marks them in the
+    transaction that stores their mentions. Unlike a row id watermark, this
+    also catches rows committed out of id order by concurrent loads, and
+    messages whose text was edited. A rescanned message's mentions replace
+    the ones stored before, under new ids, so `fct_product_mentions` picks
+    up the change and drops the mentions an edit removed.
+    """
+
+    def __init__(self, lexicon_path: Path = DEFAULT_LEXICON_PATH, batch_size: int = 5000):
+        """Initialize the extractor.
+
+        Args:
+            lexicon_path (Path): Path to the product lexicon CSV
+            batch_size (int): Number of raw messages scanned per database round trip
+        """
+        self.engine = get_engine()
+        self.matcher = ProductMatcher.from_csv(lexicon_path)
+        self.batch_size = batch_size
+        self.mentions = self._create_tables()
+        self.metrics = StageMetrics('extract_product_mentions')
+
+    def _create_tables(self):
+        """Create the mentions table if it doesn't exist.
+
+        Returns:
+            Table: The `raw_product_mentions` table
+        """
+        try:
+            metadata = MetaData()
+
+            mentions = Table('raw_product_mentions', metadata,
+                Column('id', Integer, primary_key=True),
+                Column('source_id', Integer, nullable=False),
+                Column('message_id', Integer, nullable=False),
+                Column('channel_name', String(100), nullable=False),
+                Column('product_name', String(200), nullable=False),
+                Column('matched_alias', String(200), nullable=False),
+                Column('message_date', DateTime),
+                Column('created_at', DateTime, default=datetime.utcnow),
+                UniqueConstraint('channel_name', 'message_id', 'product_name', name='uq_raw_product_mentions_message_product'),
+                Index('ix_raw_product_mentions_source_id', 'source_id')
+            )
+
+            metadata.create_all(self.engine)
+            return mentions
+
+        except SQLAlchemyError as e:
+            logger.error(f"Error creating product mention tables: {e}")
+            raise
+
+    def extract_mentions(self, rebuild: bool = False):
+        """Scan new raw messages and store the product mentions found.
+
+        Args:
+            rebuild (bool): Re-scan every message, e.g. after the lexicon changed.
+                The dbt mention models then need a `--full-refresh`.
+
+        Returns:
+            int: Number of mentions stored
+        """
+        try:
+            logger.info("Starting product mention extraction")
+
+            if rebuild:
+                with self.engine.begin() as conn:
+                    conn.execute(text("TRUNCATE raw_product_mentions"))
+                    conn.execute(text(
+                        "UPDATE raw_telegram_messages SET mentions_extracted_at = NULL WHERE mentions_extracted_at IS NOT NULL"
+                    ))
+
+            total_scanned = 0
+            total_mentions = 0
+            while True:
+                with self.engine.begin() as conn:
+                    rows = conn.execute(text("""
+                        SELECT id, message_id, channel_name, message_text, message_date
+                        FROM raw_telegram_messages
+                        WHERE mentions_extracted_at IS NULL
+                        ORDER BY id
+                        LIMIT :batch_size
+                        -- An edit being loaded waits until the scan is marked, then clears the mark
+                        FOR UPDATE SKIP LOCKED
+                    """), {'batch_size': self.batch_size}).fetchall()
+
+                    if not rows:
+                        break
+
+                    mentions = []
+                    for row in rows:
+                        for product_name, alias in self.matcher.find(row.message_text).items():
+                            mentions.append({
+                                'source_id': row.id,
+                                'message_id': row.message_id,
+                                'channel_name': row.channel_name,
+                                'product_name': product_name,
+                                'matched_alias': alias,
+                                'message_date': row.message_date,
+                                'created_at': datetime.utcnow()
+                            })
+
+                    ids = [row.id for row in rows]
+                    # Edited messages are rescanned; their old mentions may name products no longer there
+                    conn.execute(text("DELETE FROM raw_product_mentions WHERE source_id = ANY(:ids)"), {'ids': ids})
+                    if mentions:
+                        result = conn.execute(insert(self.mentions).on_conflict_do_nothing(), mentions)
+                        total_mentions += max(result.rowcount, 0)
+                        self.metrics.add(mentions=max(result.rowcount, 0))
+
+                    conn.execute(
+                        text("UPDATE raw_telegram_messages SET mentions_extracted_at = :now WHERE id = ANY(:ids)"),
+                        {'now': datetime.utcnow(), 'ids': ids}
+                    )
+
+                total_scanned += len(rows)
+                self.metrics.add(items=len(rows))
+
+            logger.info(f"Completed product mention extraction: {total_mentions} mentions from {total_scanned} messages")
+            return total_mentions
+
+        except SQLAlchemyError as e:
+            logger.error(f"Database error extracting product mentions: {e}")
+            raise
+
+
+def run_product_extraction(rebuild: bool = False):
+    """Run the product mention extraction.
+
+    Returns:
+        dict: Stage metrics of the run
+    """
+    extractor = ProductMentionExtractor()
+    with extractor.metrics.track():
+        extractor.extract_mentions(rebuild=rebuild)
+    return extractor.metrics.to_dict()
+
+
+def main():
+    """Main function to run the product mention extraction."""
+    run_product_extraction()
+
+
+if __name__ == "__main__":
+    main()
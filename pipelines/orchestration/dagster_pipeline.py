@@ -1,81 +1,248 @@
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
-from dagster import job, op, schedule, get_dagster_logger
-from pipelines.data_collection import telegram_scraper, image_downloader
-from pipelines.data_processing import database_loader, object_detection
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Tuple
+from dagster import (
+    AssetKey, AssetSelection, Backoff, DagsterEventType, DagsterRunStatus, DailyPartitionsDefinition, Definitions,
+    EventRecordsFilter, Field, MultiPartitionKey, MultiPartitionsDefinition, RetryPolicy, RunRequest, RunsFilter,
+    SkipReason, StaticPartitionsDefinition, asset, define_asset_job, multiprocess_executor, resource,
+    run_status_sensor, schedule, sensor
+)
+from pipelines.data_collection.telegram_utils import isolated_session
 from src.common.logger import get_logger
+from src.common.config import settings
+from src.common.stage_metrics import StageMetrics, write_run_report
+
+# Stage modules (telethon, pandas, ultralytics/torch, SQLAlchemy) are imported
+# inside the assets that run them: loading the code location and starting a step
+# subprocess then only pays for the stage actually executed.
 
 logger = get_logger(__name__)
 
-@op
-def scrape_telegram_data():
-    """Scrape data from Telegram channels."""
+# Ingestion is partitioned by UTC day and channel, so each (day, channel) pair
+# is scraped, loaded and enriched on its own and can be backfilled or retried alone
+PARTITIONS = MultiPartitionsDefinition({
+    "date": DailyPartitionsDefinition(start_date=settings.pipeline_start_date),
+    "channel": StaticPartitionsDefinition(settings.channels),
+})
+
+# Telegram flood waits and transient database errors usually clear on a later attempt
+RETRY_POLICY = RetryPolicy(max_retries=3, delay=60, backoff=Backoff.EXPONENTIAL)
+
+# Partitioned assets whose new materializations make the transformations stale
+INGESTED_ASSETS = ["raw_telegram_messages", "raw_image_detections"]
+
+IN_FLIGHT_STATUSES = [DagsterRunStatus.QUEUED, DagsterRunStatus.NOT_STARTED, DagsterRunStatus.STARTING,
+                      DagsterRunStatus.STARTED]
+
+@resource(config_schema={"weights": Field(str, default_value=settings.yolo_weights)})
+def yolo_model(init_context):
+    """YOLO model loaded once per process and shared by the detection steps running in it."""
+    from pipelines.data_processing.object_detection import get_model
+    return get_model(init_context.resource_config["weights"])
+
+def partition_of(context) -> Tuple[str, date]:
+    """Get the channel and day of the partition being materialized."""
+    keys = context.partition_key.keys_by_dimension
+    return keys["channel"], datetime.strptime(keys["date"], "%Y-%m-%d").date()
+
+def publish_stage_metrics(context, stage_metrics: dict):
+    """Attach a stage's run metrics to the materialization of its asset."""
+    if not stage_metrics:
+        return
+    context.add_output_metadata({key: value for key, value in stage_metrics.items() if value is not None})
+
+@asset(partitions_def=PARTITIONS, group_name="ingestion", retry_policy=RETRY_POLICY, compute_kind="telegram")
+def raw_message_files(context):
+    """Messages a channel posted on the partition's day, as JSON in the data lake."""
+    from pipelines.data_collection import telegram_scraper
+    channel_name, day = partition_of(context)
     try:
-        logger.info("Starting Telegram data scraping")
-        telegram_scraper.run_scraper()
+        logger.info(f"Starting Telegram data scraping for {channel_name} on {day}")
+        with isolated_session('medical_scraper') as session:
+            stage_metrics = telegram_scraper.run_scraper([channel_name], day, session)
+        publish_stage_metrics(context, stage_metrics)
     except Exception as e:
         logger.error(f"Error in Telegram scraping: {e}")
         raise
 
-@op
-def download_telegram_images():
-    """Download images from Telegram channels."""
+@asset(partitions_def=PARTITIONS, group_name="ingestion", retry_policy=RETRY_POLICY, compute_kind="telegram")
+def raw_image_files(context):
+    """Photos a channel posted on the partition's day, as files in the data lake."""
+    from pipelines.data_collection import image_downloader
+    channel_name, day = partition_of(context)
     try:
-        logger.info("Starting Telegram image download")
-        image_downloader.run_image_downloader()
+        logger.info(f"Starting Telegram image download for {channel_name} on {day}")
+        with isolated_session('image_downloader') as session:
+            stage_metrics = image_downloader.run_image_downloader([channel_name], day, session)
+        publish_stage_metrics(context, stage_metrics)
     except Exception as e:
         logger.error(f"Error in image download: {e}")
         raise
 
-@op
-def load_raw_to_postgres():
-    """Load raw data into PostgreSQL."""
+@asset(partitions_def=PARTITIONS, group_name="ingestion", retry_policy=RETRY_POLICY,
+       non_argument_deps={"raw_message_files"}, compute_kind="postgres")
+def raw_telegram_messages(context):
+    """Scraped messages of the partition, loaded into PostgreSQL."""
+    from pipelines.data_processing import database_loader
+    channel_name, day = partition_of(context)
     try:
-        logger.info("Starting database loading")
-        database_loader.run_database_loader()
+        logger.info(f"Starting database loading for {channel_name} on {day}")
+        stage_metrics = database_loader.run_database_loader(channel_name, day, images=False)
+        publish_stage_metrics(context, stage_metrics)
     except Exception as e:
         logger.error(f"Error in database loading: {e}")
         raise
 
-@op
-def run_dbt_transformations():
-    """Run DBT transformations."""
+@asset(partitions_def=PARTITIONS, group_name="ingestion", retry_policy=RETRY_POLICY,
+       non_argument_deps={"raw_image_files"}, compute_kind="postgres")
+def telegram_images(context):
+    """Metadata of the partition's downloaded images, loaded into PostgreSQL."""
+    from pipelines.data_processing import database_loader
+    channel_name, day = partition_of(context)
+    try:
+        logger.info(f"Starting image metadata loading for {channel_name} on {day}")
+        stage_metrics = database_loader.run_database_loader(channel_name, day, messages=False)
+        publish_stage_metrics(context, stage_metrics)
+    except Exception as e:
+        logger.error(f"Error in image metadata loading: {e}")
+        raise
+
+@asset(partitions_def=PARTITIONS, group_name="ingestion", retry_policy=RETRY_POLICY,
+       non_argument_deps={"raw_image_files"}, required_resource_keys={"yolo_model"}, compute_kind="yolo")
+def raw_image_detections(context):
+    """YOLO detections for the partition's images, run as soon as they are downloaded."""
+    from pipelines.data_processing import object_detection
+    channel_name, day = partition_of(context)
+    try:
+        logger.info(f"Starting YOLO object detection for {channel_name} on {day}")
+        stage_metrics = object_detection.run_object_detection(channel_name, day, model=context.resources.yolo_model)
+        publish_stage_metrics(context, stage_metrics)
+    except Exception as e:
+        logger.error(f"Error in YOLO object detection: {e}")
+        raise
+
+@asset(group_name="transformation", non_argument_deps={"raw_telegram_messages"}, compute_kind="python")
+def raw_product_mentions(context):
+    """Product mentions extracted from newly loaded messages."""
+    from pipelines.data_processing import product_extraction
+    try:
+        logger.info("Starting product mention extraction")
+        stage_metrics = product_extraction.run_product_extraction()
+        publish_stage_metrics(context, stage_metrics)
+    except Exception as e:
+        logger.error(f"Error in product mention extraction: {e}")
+        raise
+
+@asset(group_name="transformation", compute_kind="dbt",
+       non_argument_deps={"raw_telegram_messages", "raw_product_mentions", "raw_image_detections"})
+def dbt_marts(context):
+    """dbt models rebuilt over the raw sources that received new rows."""
+    from pipelines.data_processing import dbt_runner
     try:
         logger.info("Starting DBT transformations")
-        # In a real implementation, we would call dbt via subprocess or API
-        # For now, we'll just log this step
-        logger.info("DBT transformations would run here")
+        metrics = StageMetrics('run_dbt_transformations')
+        with metrics.track():
+            result = dbt_runner.run_dbt_transformations()
+            metrics.add(items=len(result['models']))
+        logger.info(f"DBT {result['mode']} run built {len(result['models'])} models")
+        publish_stage_metrics(context, dict(metrics.to_dict(), mode=result['mode']))
     except Exception as e:
         logger.error(f"Error in DBT transformations: {e}")
         raise
 
-@op
-def run_yolo_enrichment():
-    """Run YOLO object detection."""
+@asset(group_name="transformation", non_argument_deps={"dbt_marts"}, compute_kind="postgres")
+def api_data_version(context):
+    """Data version the API checks, bumped so its processes drop their cached responses."""
+    from src.common.database import get_engine
+    from src.common.data_version import mark_data_updated
     try:
-        logger.info("Starting YOLO object detection")
-        object_detection.run_object_detection()
+        logger.info("Publishing data version")
+        mark_data_updated(get_engine(), run_id=context.run_id)
     except Exception as e:
-        logger.error(f"Error in YOLO object detection: {e}")
+        logger.error(f"Error publishing data version: {e}")
+        raise
+
+ingestion_job = define_asset_job(
+    "ingestion_job", selection=AssetSelection.groups("ingestion"), partitions_def=PARTITIONS,
+    description="Scrape, download, load and enrich one (day, channel) partition."
+)
+
+transformation_job = define_asset_job(
+    "transformation_job", selection=AssetSelection.groups("transformation"),
+    description="Extract product mentions, run dbt and publish a new data version."
+)
+
+@schedule(cron_schedule="30 0 * * *", job=ingestion_job, execution_timezone="UTC")
+def daily_ingestion_schedule(context):
+    """Ingest the previous UTC day once it is complete, one run per channel."""
+    day = (context.scheduled_execution_time - timedelta(days=1)).strftime("%Y-%m-%d")
+    for channel_name in settings.channels:
+        yield RunRequest(
+            run_key=f"{day}|{channel_name}",
+            partition_key=MultiPartitionKey({"date": day, "channel": channel_name})
+        )
+
+@sensor(job=transformation_job, minimum_interval_seconds=300)
+def transformation_sensor(context):
+    """Run the transformations once new partitions have landed and ingestion is idle.
+
+    Waiting for idle means a backfill triggers a single dbt run at its end
+    rather than one per partition.
+    """
+    in_flight = context.instance.get_runs(
+        filters=RunsFilter(job_name=ingestion_job.name, statuses=IN_FLIGHT_STATUSES), limit=1
+    )
+    if in_flight:
+        return SkipReason("Ingestion runs are still in progress")
+
+    cursor = int(context.cursor) if context.cursor else None
+    latest = None
+    for asset_name in INGESTED_ASSETS:
+        records = context.instance.get_event_records(
+            EventRecordsFilter(
+                event_type=DagsterEventType.ASSET_MATERIALIZATION,
+                asset_key=AssetKey(asset_name),
+                after_cursor=cursor
+            ),
+            ascending=False,
+            limit=1
+        )
+        if records:
+            latest = max(latest or 0, records[0].storage_id)
+    if latest is None:
+        return SkipReason("No partitions materialized since the last transformation")
+
+    context.update_cursor(str(latest))
+    return RunRequest(run_key=str(latest))
+
+@run_status_sensor(run_status=DagsterRunStatus.SUCCESS, monitored_jobs=[ingestion_job, transformation_job])
+def run_report_sensor(context):
+    """Write the metrics of every stage in a successful run to a JSON report."""
+    try:
+        run_id = context.dagster_run.run_id
+        stages = []
+        for event in context.instance.all_logs(run_id, of_type=DagsterEventType.ASSET_MATERIALIZATION):
+            materialization = event.asset_materialization
+            metrics = {key: value.value for key, value in materialization.metadata.items()}
+            metrics['asset'] = materialization.asset_key.to_user_string()
+            if materialization.partition:
+                metrics['partition'] = materialization.partition
+            stages.append(metrics)
+        write_run_report(run_id, stages, Path(settings.data_dir) / "reports" / "runs")
+    except Exception as e:
+        logger.error(f"Error writing pipeline run report: {e}")
         raise
 
-@job
-def etl_pipeline():
-    """Main ETL pipeline job."""
-    # Run data collection
-    telegram_data = scrape_telegram_data()
-    images_data = download_telegram_images()
-    
-    # Process data
-    raw_data = load_raw_to_postgres()
-    
-    # Run transformations and enrichment
-    transformed_data = run_dbt_transformations()
-    enriched_data = run_yolo_enrichment()
-
-@schedule(cron_schedule="0 0 * * *", job=etl_pipeline, execution_timezone="Africa/Addis_Ababa")
-def daily_pipeline_schedule(context):
-    """Schedule the pipeline to run daily at midnight Addis Ababa time."""
-    logger.info("Running scheduled pipeline")
-    return {}
\ No newline at end of file
+defs = Definitions(
+    assets=[raw_message_files, raw_image_files, raw_telegram_messages, telegram_images, raw_image_detections,
+            raw_product_mentions, dbt_marts, api_data_version],
+    jobs=[ingestion_job, transformation_job],
+    schedules=[daily_ingestion_schedule],
+    sensors=[transformation_sensor, run_report_sensor],
+    resources={"yolo_model": yolo_model},
+    # Independent steps of a run (scraping and image download, loading and detection) run in parallel
+    executor=multiprocess_executor.configured({"max_concurrent": settings.pipeline_max_concurrent}),
+)
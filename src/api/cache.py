@@ -0,0 +1,136 @@
+import hashlib
+import time
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Awaitable, Callable, Optional
+from urllib.parse import urlencode
+import orjson
+from fastapi import Request, Response
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from src.common.cache import create_cache
+from src.common.config import settings
+from src.common.data_version import LATEST_VERSION_SQL
+from src.common.logger import get_logger
+from src.common.metrics import REGISTRY
+from src.api.database import engine
+
+logger = get_logger(__name__)
+
+CACHE_REQUESTS = REGISTRY.counter(
+    "api_cache_requests_total", "Cached endpoint lookups by result (hit, miss, not_modified).", ["result"]
+)
+
+
+class ResponseCache:
+    """Cache report responses until the pipeline publishes a new data version.
+
+    Keys combine the current data version, the request path and its query
+    parameters, so a new pipeline load makes every older entry unreachable. The
+    version is read from `pipeline_data_versions` at most once every
+    `version_check_seconds`, which bounds both the database traffic and the time
+    a finished load takes to become visible.
+    """
+
+    def __init__(self, backend, engine: AsyncEngine, version_check_seconds: float = 30):
+        """Initialize the response cache.
+
+        Args:
+            backend (TTLCache | RedisCache): Cache backend from `src.common.cache`
+            engine (AsyncEngine): Engine used to read the data version
+            version_check_seconds (float): Minimum interval between data version checks
+        """
+        self.backend = backend
+        self.engine = engine
+        self.version_check_seconds = version_check_seconds
+        self._version = None
+        self._version_checked_at = None
+
+    async def data_version(self) -> Optional[datetime]:
+        """Get the latest data version published by the pipeline.
+
+        Returns:
+            datetime: Time of the latest pipeline load (UTC), or None if none was recorded
+        """
+        now = time.monotonic()
+        if self._version_checked_at is not None and now - self._version_checked_at < self.version_check_seconds:
+            return self._version
+
+        try:
+            async with self.engine.connect() as conn:
+                version = (await conn.execute(text(LATEST_VERSION_SQL))).scalar()
+        except SQLAlchemyError as e:
+            # The table only exists once the pipeline has published a version
+            logger.debug(f"Could not read data version: {e}")
+            version = None
+
+        self._version_checked_at = now
+        if version != self._version:
+            if self._version is not None:
+                logger.info(f"Data version changed to {version}, invalidating response cache")
+            self._version = version
+            if not self.backend.shared:
+                await self.backend.clear()
+        return version
+
+    @staticmethod
+    def _key(request: Request, version: Optional[datetime]) -> str:
+        params = urlencode(sorted(request.query_params.multi_items()))
+        return f"{version.isoformat() if version else 'none'}:{request.url.path}?{params}"
+
+    @staticmethod
+    def _is_fresh(request: Request, etag: str, last_modified: Optional[str]) -> bool:
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            tags = [tag.strip() for tag in if_none_match.split(",")]
+            return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since and last_modified:
+            try:
+                return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    async def respond(self, request: Request, compute: Callable[[], Awaitable]) -> Response:
+        """Serve a response from the cache, computing and storing it on a miss.
+
+        The JSON body is rendered once and cached as is, so hits skip both
+        validation and serialization. Responses carry `ETag`, `Last-Modified` and
+        `Cache-Control`, and conditional requests that match the cached entry get
+        304 Not Modified.
+
+        Args:
+            request (Request): Incoming request
+            compute (Callable): Coroutine function producing the JSON-serializable payload
+
+        Returns:
+            Response: The JSON response, or a 304 response
+        """
+        version = await self.data_version()
+        key = self._key(request, version)
+
+        entry = await self.backend.get(key)
+        CACHE_REQUESTS.inc(result="miss" if entry is None else "hit")
+        if entry is None:
+            body = orjson.dumps(await compute())
+            entry = {
+                "body": body.decode("utf-8"),
+                "etag": f'"{hashlib.sha1(body).hexdigest()}"',
+                "last_modified": format_datetime(version.replace(tzinfo=timezone.utc), usegmt=True) if version else None
+            }
+            await self.backend.set(key, entry)
+
+        headers = {"ETag": entry["etag"], "Cache-Control": "no-cache"}
+        if entry["last_modified"]:
+            headers["Last-Modified"] = entry["last_modified"]
+
+        if self._is_fresh(request, entry["etag"], entry["last_modified"]):
+            CACHE_REQUESTS.inc(result="not_modified")
+            return Response(status_code=304, headers=headers)
+        return Response(content=entry["body"], media_type="application/json", headers=headers)
+
+
+response_cache = ResponseCache(create_cache(), engine, version_check_seconds=settings.cache_version_check_seconds)
@@ -1,50 +1,166 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_
-from datetime import datetime, timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, text, tuple_, literal_column
+from datetime import date, datetime, timedelta
+from typing import List, Optional
 from . import models, schemas
+from .pagination import encode_cursor, decode_cursor
+from .search import build_prefix_tsquery
+from .timeseries import BucketSize, bucket_starts
 
-def get_top_products(db: Session, limit: int = 10):
+async def get_top_products(db: AsyncSession, limit: int = 10, start_date: Optional[date] = None,
+                     end_date: Optional[date] = None, channel_name: Optional[str] = None):
     """Get the most frequently mentioned products in messages.
     
+    Reads the pre-aggregated `agg_product_mentions_daily` mart populated by the
+    product extraction stage, so no message text is scanned at request time.
+    A product is counted once per duplicate cluster: an advertisement reposted
+    in several channels counts once overall, and once in each channel's report.
+    
     Args:
-        db (Session): Database session
+        db (AsyncSession): Database session
         limit (int): Number of top products to return
+        start_date (date, optional): Only count mentions posted on or after this date
+        end_date (date, optional): Only count mentions posted on or before this date
+        channel_name (str, optional): Only count mentions from this channel
         
     Returns:
         List[dict]: List of product counts
     """
-    # This is a simplified example - you would need to implement proper product extraction
-    # from message text (e.g., using NLP or keyword matching)
+    filters = []
+    params = {'limit': limit}
+    if start_date:
+        filters.append("mention_date >= :start_date")
+        params['start_date'] = start_date
+    if end_date:
+        filters.append("mention_date <= :end_date")
+        params['end_date'] = end_date
+    if channel_name:
+        filters.append("channel_name = :channel_name")
+        params['channel_name'] = channel_name
+    where_clause = f"WHERE {' AND '.join(filters)}" if filters else ""
     
-    # Placeholder implementation - would need to be customized for your specific needs
-    result = db.execute("""
+    result = await db.execute(text(f"""
         SELECT 
-            trim(both ' ' from lower(substring(message_text from '([a-zA-Z]+)'))::text as product_name,
-            count(*) as count
-        FROM marts.fct_messages fm
-        JOIN marts.dim_messages dm ON fm.message_key = dm.message_key
-        WHERE message_text IS NOT NULL
+            product_name,
+            COUNT(DISTINCT duplicate_cluster_id) AS count
+        FROM marts.agg_product_mentions_daily
+        {where_clause}
         GROUP BY product_name
-        ORDER BY count DESC
+        ORDER BY count DESC, product_name
         LIMIT :limit
-    """, {'limit': limit})
+    """), params)
     
-    return [{"product_name": row[0], "count": row[1]} for row in result]
+    return [{"product_name": row[0], "count": int(row[1])} for row in result]
+
+# Width of the confidence buckets in agg_image_detections_daily
+CONFIDENCE_BUCKET_WIDTH = 0.05
 
-def get_channel_activity(db: Session, channel_name: str):
+async def get_detection_summary(db: AsyncSession, object_class: Optional[str] = None,
+                                channel_name: Optional[str] = None, min_confidence: Optional[float] = None,
+                                start_date: Optional[date] = None, end_date: Optional[date] = None):
+    """Count image detections per object class and per channel.
+    
+    Reads the daily `agg_image_detections_daily` mart whenever `min_confidence`
+    lies on its 0.05 bucket grid (e.g. 0.7), and falls back to the detection
+    facts for other thresholds. Both groupings come from one query.
+    
+    Args:
+        db (AsyncSession): Database session
+        object_class (str, optional): Only count detections of this object class
+        channel_name (str, optional): Only count detections from this channel
+        min_confidence (float, optional): Only count detections at or above this confidence
+        start_date (date, optional): Only count detections made on or after this date
+        end_date (date, optional): Only count detections made on or before this date
+        
+    Returns:
+        dict: Total count, and counts per class and per channel, largest first
+    """
+    bucket = min_confidence / CONFIDENCE_BUCKET_WIDTH if min_confidence is not None else 0
+    use_aggregate = abs(bucket - round(bucket)) < 1e-9
+    
+    filters = []
+    params = {}
+    if use_aggregate:
+        source = "marts.agg_image_detections_daily"
+        count_expr, confidence_expr = "SUM(detection_count)", "SUM(confidence_sum)"
+        if min_confidence is not None:
+            filters.append("confidence_bucket >= :confidence_bucket")
+            params['confidence_bucket'] = int(round(bucket))
+        if start_date:
+            filters.append("detection_date >= :start_date")
+            params['start_date'] = start_date
+        if end_date:
+            filters.append("detection_date <= :end_date")
+            params['end_date'] = end_date
+    else:
+        source = "marts.fct_image_detections"
+        count_expr, confidence_expr = "COUNT(*)", "SUM(confidence)"
+        filters.append("confidence >= :min_confidence")
+        params['min_confidence'] = min_confidence
+        if start_date:
+            filters.append("detected_at >= :start_date")
+            params['start_date'] = start_date
+        if end_date:
+            filters.append("detected_at < :end_date")
+            params['end_date'] = end_date + timedelta(days=1)
+    if object_class:
+        filters.append("object_class = :object_class")
+        params['object_class'] = object_class
+    if channel_name:
+        filters.append("channel_name = :channel_name")
+        params['channel_name'] = channel_name
+    where_clause = f"WHERE {' AND '.join(filters)}" if filters else ""
+    
+    result = await db.execute(text(f"""
+        SELECT
+            object_class,
+            channel_name,
+            {count_expr} AS detection_count,
+            {confidence_expr} AS confidence_sum,
+            GROUPING(object_class) = 0 AS by_class
+        FROM {source}
+        {where_clause}
+        GROUP BY GROUPING SETS ((object_class), (channel_name))
+    """), params)
+    
+    by_class, by_channel = [], []
+    for row in result:
+        count = int(row.detection_count)
+        # A NULL object_class may be real data, so the grouping set is read from GROUPING()
+        if row.by_class:
+            by_class.append({
+                "object_class": row.object_class,
+                "detection_count": count,
+                "avg_confidence": round(float(row.confidence_sum) / count, 4)
+            })
+        else:
+            by_channel.append({"channel_name": row.channel_name, "detection_count": count})
+    
+    by_class.sort(key=lambda item: (-item["detection_count"], item["object_class"]))
+    by_channel.sort(key=lambda item: (-item["detection_count"], item["channel_name"]))
+    
+    return {
+        "total_detections": sum(item["detection_count"] for item in by_class),
+        "by_class": by_class,
+        "by_channel": by_channel
+    }
+
+async def get_channel_activity(db: AsyncSession, channel_name: str):
     """Get posting activity for a specific channel.
     
     Args:
-        db (Session): Database session
+        db (AsyncSession): Database session
         channel_name (str): Name of the Telegram channel
         
     Returns:
         dict: Channel activity data
     """
     # Get channel info
-    channel = db.query(models.TelegramChannel).filter(
-        models.TelegramChannel.channel_name == channel_name
-    ).first()
+    channel = (await db.execute(
+        select(models.TelegramChannel).where(
+            models.TelegramChannel.channel_name == channel_name
+        )
+    )).scalars().first()
     
     if not channel:
         return None
@@ -53,31 +169,35 @@ def get_channel_activity(db: Session, channel_name: str):
     end_date = datetime.now()
     start_date = end_date - timedelta(days=30)
     
-    daily_activity = db.query(
-        func.date(models.TelegramMessage.message_date).label("date"),
-        func.count().label("message_count")
-    ).join(
-        models.TelegramChannel,
-        models.TelegramMessage.channel_key == models.TelegramChannel.channel_key
-    ).filter(
-        models.TelegramChannel.channel_name == channel_name,
-        models.TelegramMessage.message_date >= start_date,
-        models.TelegramMessage.message_date <= end_date
-    ).group_by(
-        func.date(models.TelegramMessage.message_date)
-    ).order_by(
-        func.date(models.TelegramMessage.message_date)
-    ).all()
+    daily_activity = (await db.execute(
+        select(
+            func.date(models.TelegramMessage.message_date).label("date"),
+            func.count().label("message_count")
+        ).join(
+            models.TelegramChannel,
+            models.TelegramMessage.channel_key == models.TelegramChannel.channel_key
+        ).where(
+            models.TelegramChannel.channel_name == channel_name,
+            models.TelegramMessage.message_date >= start_date,
+            models.TelegramMessage.message_date <= end_date
+        ).group_by(
+            func.date(models.TelegramMessage.message_date)
+        ).order_by(
+            func.date(models.TelegramMessage.message_date)
+        )
+    )).all()
     
     # Get total views
-    total_views = db.query(
-        func.sum(models.TelegramMessage.views)
-    ).join(
-        models.TelegramChannel,
-        models.TelegramMessage.channel_key == models.TelegramChannel.channel_key
-    ).filter(
-        models.TelegramChannel.channel_name == channel_name
-    ).scalar() or 0
+    total_views = (await db.execute(
+        select(
+            func.sum(models.TelegramMessage.views)
+        ).join(
+            models.TelegramChannel,
+            models.TelegramMessage.channel_key == models.TelegramChannel.channel_key
+        ).where(
+            models.TelegramChannel.channel_name == channel_name
+        )
+    )).scalar() or 0
     
     return {
         "channel_name": channel_name,
@@ -86,37 +206,309 @@ def get_channel_activity(db: Session, channel_name: str):
         "daily_activity": [{"date": str(date), "message_count": count} for date, count in daily_activity]
     }
 
-def search_messages(db: Session, query: str, limit: int = 20):
-    """Search for messages containing a specific keyword.
+async def get_channels_activity(db: AsyncSession, channel_names: List[str], start_date: date,
+                                end_date: date, bucket: BucketSize = BucketSize.day):
+    """Get bucketed posting activity for several channels with a single grouped query.
+    
+    Every channel gets a dense series covering the whole range; buckets without
+    messages are returned with zero counts.
     
     Args:
-        db (Session): Database session
-        query (str): Keyword to search for
+        db (AsyncSession): Database session
+        channel_names (List[str]): Channels to report on
+        start_date (date): First day of the range
+        end_date (date): Last day of the range (inclusive)
+        bucket (BucketSize): Bucket size of the series
+        
+    Returns:
+        dict: Per-channel totals and series
+    """
+    result = await db.execute(text("""
+        SELECT
+            channel_name,
+            date_trunc(:bucket, message_date) AS bucket_start,
+            COUNT(*) AS message_count,
+            COALESCE(SUM(views), 0) AS total_views
+        FROM marts.fct_messages
+        WHERE channel_name = ANY(:channel_names)
+          AND message_date >= :start_date
+          AND message_date < :end_date
+        GROUP BY channel_name, bucket_start
+    """), {
+        'bucket': bucket.value,
+        'channel_names': list(channel_names),
+        'start_date': start_date,
+        'end_date': end_date + timedelta(days=1)
+    })
+    
+    counts = {(row.channel_name, row.bucket_start): (int(row.message_count), int(row.total_views)) for row in result}
+    starts = bucket_starts(start_date, end_date, bucket)
+    
+    channels = []
+    for channel_name in channel_names:
+        series = []
+        for bucket_start in starts:
+            message_count, total_views = counts.get((channel_name, bucket_start), (0, 0))
+            series.append({
+                "bucket_start": bucket_start.isoformat(),
+                "message_count": message_count,
+                "total_views": total_views
+            })
+        channels.append({
+            "channel_name": channel_name,
+            "total_messages": sum(point["message_count"] for point in series),
+            "total_views": sum(point["total_views"] for point in series),
+            "series": series
+        })
+    
+    return {
+        "bucket": bucket.value,
+        "start_date": start_date.isoformat(),
+        "end_date": end_date.isoformat(),
+        "channels": channels
+    }
+
+async def search_messages(db: AsyncSession, query: str, limit: int = 20, channel_name: Optional[str] = None):
+    """Search messages by relevance using the full-text index on `fct_messages`.
+    
+    Every term is matched as a prefix against both the stemmed English and the
+    unstemmed form of the message text (and, at a lower weight, the channel
+    name). Only the returned rows get a highlighted snippet. Copies of a
+    message in the same duplicate cluster are returned once, as their best
+    ranked copy.
+    
+    Args:
+        db (AsyncSession): Database session
+        query (str): Search text
         limit (int): Maximum number of results to return
+        channel_name (str, optional): Only search messages from this channel
         
     Returns:
-        List[dict]: List of matching messages
+        List[dict]: List of matching messages, most relevant first
     """
-    # Simple case-insensitive search
-    messages = db.query(
-        models.TelegramMessage,
-        models.TelegramChannel.channel_name
-    ).join(
-        models.TelegramChannel,
-        models.TelegramMessage.channel_key == models.TelegramChannel.channel_key
-    ).filter(
-        or_(
-            models.TelegramMessage.message_text.ilike(f"%{query}%"),
-            models.TelegramChannel.channel_name.ilike(f"%{query}%")
+    tsquery = build_prefix_tsquery(query)
+    if not tsquery:
+        return []
+    
+    params = {'tsquery': tsquery, 'limit': limit}
+    channel_filter = ""
+    if channel_name:
+        channel_filter = "AND m.channel_name = :channel_name"
+        params['channel_name'] = channel_name
+    
+    result = await db.execute(text(f"""
+        WITH q AS (
+            SELECT to_tsquery('english', :tsquery) || to_tsquery('simple', :tsquery) AS query
+        ),
+        matches AS (
+            SELECT DISTINCT ON (m.duplicate_cluster_id)
+                m.message_key,
+                m.channel_name,
+                m.message_date,
+                m.message_text,
+                m.views,
+                ts_rank_cd(m.search_vector, q.query) AS rank
+            FROM marts.fct_messages m, q
+            WHERE m.search_vector @@ q.query {channel_filter}
+            ORDER BY m.duplicate_cluster_id, rank DESC, m.message_date DESC
+        ),
+        ranked AS (
+            SELECT * FROM matches
+            ORDER BY rank DESC, message_date DESC
+            LIMIT :limit
         )
-    ).order_by(
-        models.TelegramMessage.message_date.desc()
-    ).limit(limit).all()
+        SELECT
+            r.message_key,
+            r.channel_name,
+            r.message_date,
+            r.message_text,
+            r.views,
+            r.rank,
+            ts_headline('english', coalesce(r.message_text, ''), q.query,
+                        'StartSel=<b>, StopSel=</b>, MaxFragments=2, MaxWords=30, MinWords=10') AS snippet
+        FROM ranked r, q
+        ORDER BY r.rank DESC, r.message_date DESC
+    """), params)
     
     return [{
-        "message_id": msg.message_key,
-        "channel_name": channel_name,
-        "message_date": str(msg.message_date),
-        "message_text": msg.message_text,
-        "views": msg.views
-    } for msg, channel_name in messages]
\ No newline at end of file
+        "message_id": row.message_key,
+        "channel_name": row.channel_name,
+        "message_date": str(row.message_date),
+        "message_text": row.message_text or "",
+        "views": row.views,
+        "rank": float(row.rank),
+        "snippet": row.snippet
+    } for row in result]
+
+# Stands in for a missing date in pagination sort keys, so undated rows come last
+# and still get a cursor. asyncpg reads it as `datetime.min` and writes that back
+# as -infinity, so it survives the cursor. The marts index the same coalesce expression.
+MISSING_DATE_SQL = "'-infinity'::timestamp"
+
+def _sort_date(column):
+    """Non-null sort key of a date column for newest-first keyset pagination."""
+    return func.coalesce(column, literal_column(MISSING_DATE_SQL))
+
+async def get_all_messages(db: AsyncSession, limit: int = 100, cursor: Optional[str] = None,
+                           channel_name: Optional[str] = None, start_date: Optional[date] = None,
+                           end_date: Optional[date] = None):
+    """Get a page of messages, newest first.
+    
+    Uses keyset pagination on (message_date, message_key), so every page is an
+    index range scan no matter how deep it is. Messages without a date come last.
+    
+    Args:
+        db (AsyncSession): Database session
+        limit (int): Maximum number of messages to return
+        cursor (str, optional): Cursor returned with the previous page
+        channel_name (str, optional): Only return messages from this channel
+        start_date (date, optional): Only return messages posted on or after this date
+        end_date (date, optional): Only return messages posted on or before this date
+        
+    Returns:
+        dict: Page of messages and the cursor for the next page
+    """
+    message = models.TelegramMessage
+    sort_date = _sort_date(message.message_date)
+    query = select(
+        sort_date.label("sort_date"),
+        message.message_key,
+        message.message_id,
+        message.channel_name,
+        message.message_date,
+        message.message_text,
+        message.views,
+        message.forwards,
+        message.has_media
+    )
+    
+    if channel_name:
+        query = query.where(message.channel_name == channel_name)
+    if start_date:
+        query = query.where(message.message_date >= start_date)
+    if end_date:
+        query = query.where(message.message_date < end_date + timedelta(days=1))
+    if cursor:
+        last_date, last_key = decode_cursor(cursor, (datetime, str))
+        query = query.where(tuple_(sort_date, message.message_key) < (last_date, last_key))
+    
+    rows = (await db.execute(
+        query.order_by(sort_date.desc(), message.message_key.desc()).limit(limit + 1)
+    )).all()
+    
+    page = rows[:limit]
+    next_cursor = encode_cursor(page[-1].sort_date, page[-1].message_key) if len(rows) > limit else None
+    
+    return {
+        "items": [{
+            "id": row.message_id,
+            "channel_name": row.channel_name,
+            "date": row.message_date.isoformat() if row.message_date else None,
+            "message": row.message_text or "",
+            "views": row.views,
+            "forwards": row.forwards,
+            "media": bool(row.has_media)
+        } for row in page],
+        "next_cursor": next_cursor
+    }
+
+async def get_all_channels(db: AsyncSession, limit: int = 100, cursor: Optional[str] = None):
+    """Get a page of channels ordered by name.
+    
+    Args:
+        db (AsyncSession): Database session
+        limit (int): Maximum number of channels to return
+        cursor (str, optional): Cursor returned with the previous page
+        
+    Returns:
+        dict: Page of channels and the cursor for the next page
+    """
+    channel = models.TelegramChannel
+    query = select(channel.channel_key, channel.channel_name)
+    
+    if cursor:
+        (last_name,) = decode_cursor(cursor, (str,))
+        query = query.where(channel.channel_name > last_name)
+    
+    rows = (await db.execute(query.order_by(channel.channel_name).limit(limit + 1))).all()
+    
+    page = rows[:limit]
+    next_cursor = encode_cursor(page[-1].channel_name) if len(rows) > limit else None
+    
+    return {
+        "items": [{
+            "id": row.channel_key,
+            "name": row.channel_name,
+            "description": None
+        } for row in page],
+        "next_cursor": next_cursor
+    }
+
+async def get_all_image_detections(db: AsyncSession, limit: int = 100, cursor: Optional[str] = None,
+                                   channel_name: Optional[str] = None, object_class: Optional[str] = None,
+                                   min_confidence: Optional[float] = None, start_date: Optional[date] = None,
+                                   end_date: Optional[date] = None):
+    """Get a page of image detections, most recent first.
+    
+    Uses keyset pagination on (detected_at, detection_key). Detections without
+    a timestamp come last.
+    
+    Args:
+        db (AsyncSession): Database session
+        limit (int): Maximum number of detections to return
+        cursor (str, optional): Cursor returned with the previous page
+        channel_name (str, optional): Only return detections from this channel
+        object_class (str, optional): Only return detections of this object class
+        min_confidence (float, optional): Only return detections at or above this confidence
+        start_date (date, optional): Only return detections made on or after this date
+        end_date (date, optional): Only return detections made on or before this date
+        
+    Returns:
+        dict: Page of detections and the cursor for the next page
+    """
+    detection = models.ImageDetection
+    sort_date = _sort_date(detection.detected_at)
+    query = select(
+        sort_date.label("sort_date"),
+        detection.detection_key,
+        detection.message_id,
+        detection.channel_name,
+        detection.object_class,
+        detection.confidence,
+        detection.image_path,
+        detection.detected_at
+    )
+    
+    if channel_name:
+        query = query.where(detection.channel_name == channel_name)
+    if object_class:
+        query = query.where(detection.object_class == object_class)
+    if min_confidence is not None:
+        query = query.where(detection.confidence >= min_confidence)
+    if start_date:
+        query = query.where(detection.detected_at >= start_date)
+    if end_date:
+        query = query.where(detection.detected_at < end_date + timedelta(days=1))
+    if cursor:
+        last_detected_at, last_key = decode_cursor(cursor, (datetime, str))
+        query = query.where(tuple_(sort_date, detection.detection_key) < (last_detected_at, last_key))
+    
+    rows = (await db.execute(
+        query.order_by(sort_date.desc(), detection.detection_key.desc()).limit(limit + 1)
+    )).all()
+    
+    page = rows[:limit]
+    next_cursor = encode_cursor(page[-1].sort_date, page[-1].detection_key) if len(rows) > limit else None
+    
+    return {
+        "items": [{
+            "detection_id": row.detection_key,
+            "message_id": row.message_id,
+            "channel_name": row.channel_name,
+            "object_class": row.object_class,
+            "confidence": row.confidence,
+            "image_path": row.image_path,
+            "detected_at": row.detected_at.isoformat() if row.detected_at else None
+        } for row in page],
+        "next_cursor": next_cursor
+    }
@@ -1,27 +1,21 @@
-from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
 import sys
 from pathlib import Path
-# Add the 'src' directory to the system path
-sys.path.append(str((Path(__file__).resolve().parent.parent.parent / "src")))
-from common.config import settings
+# Add the project root to the system path
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from src.common.database import get_async_engine
 
-DATABASE_URL = f"postgresql://{settings.postgres_user}:{settings.postgres_password}@{settings.postgres_host}:{settings.postgres_port}/{settings.postgres_db}"
-
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+engine = get_async_engine()
+SessionLocal = async_sessionmaker(bind=engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
 
 Base = declarative_base()
 
-def get_db():
+async def get_db():
     """Get a database session.
-    
+
     Yields:
-        Session: Database session
+        AsyncSession: Database session
     """
-    db = SessionLocal()
-    try:
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
\ No newline at end of file
@@ -0,0 +1,229 @@
+import csv
+import io
+import json
+from datetime import date, datetime, timedelta
+from enum import Enum
+from typing import AsyncIterator, Optional
+from sqlalchemy import select
+from src.common.logger import get_logger
+from src.api import models
+from src.api.database import SessionLocal
+
+logger = get_logger(__name__)
+
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+    parquet = "parquet"
+
+
+MEDIA_TYPES = {
+    ExportFormat.ndjson: "application/x-ndjson",
+    ExportFormat.csv: "text/csv; charset=utf-8",
+    ExportFormat.parquet: "application/vnd.apache.parquet",
+}
+
+# Column name and Arrow type name of each exported dataset, in output order
+MESSAGE_COLUMNS = [
+    ("message_id", "int64"),
+    ("channel_name", "string"),
+    ("message_date", "timestamp"),
+    ("message_text", "string"),
+    ("views", "int64"),
+    ("forwards", "int64"),
+    ("has_media", "bool"),
+]
+
+IMAGE_DETECTION_COLUMNS = [
+    ("detection_id", "string"),
+    ("message_id", "int64"),
+    ("channel_name", "string"),
+    ("object_class", "string"),
+    ("confidence", "float64"),
+    ("image_path", "string"),
+    ("detected_at", "timestamp"),
+]
+
+
+def parquet_available() -> bool:
+    """Check whether the optional pyarrow dependency needed for Parquet is installed."""
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def messages_query(channel_name: Optional[str] = None, start_date: Optional[date] = None,
+                   end_date: Optional[date] = None):
+    """Build the message export query, in (message_date, message_key) index order.
+
+    Args:
+        channel_name (str, optional): Only export messages from this channel
+        start_date (date, optional): Only export messages posted on or after this date
+        end_date (date, optional): Only export messages posted on or before this date
+
+    Returns:
+        Select: Export query
+    """
+    message = models.TelegramMessage
+    query = select(
+        message.message_id,
+        message.channel_name,
+        message.message_date,
+        message.message_text,
+        message.views,
+        message.forwards,
+        message.has_media
+    )
+    if channel_name:
+        query = query.where(message.channel_name == channel_name)
+    if start_date:
+        query = query.where(message.message_date >= start_date)
+    if end_date:
+        query = query.where(message.message_date < end_date + timedelta(days=1))
+    return query.order_by(message.message_date, message.message_key)
+
+
+def image_detections_query(channel_name: Optional[str] = None, object_class: Optional[str] = None,
+                           start_date: Optional[date] = None, end_date: Optional[date] = None):
+    """Build the image detection export query, in (detected_at, detection_key) index order.
+
+    Args:
+        channel_name (str, optional): Only export detections from this channel
+        object_class (str, optional): Only export detections of this object class
+        start_date (date, optional): Only export detections made on or after this date
+        end_date (date, optional): Only export detections made on or before this date
+
+    Returns:
+        Select: Export query
+    """
+    detection = models.ImageDetection
+    query = select(
+        detection.detection_key.label("detection_id"),
+        detection.message_id,
+        detection.channel_name,
+        detection.object_class,
+        detection.confidence,
+        detection.image_path,
+        detection.detected_at
+    )
+    if channel_name:
+        query = query.where(detection.channel_name == channel_name)
+    if object_class:
+        query = query.where(detection.object_class == object_class)
+    if start_date:
+        query = query.where(detection.detected_at >= start_date)
+    if end_date:
+        query = query.where(detection.detected_at < end_date + timedelta(days=1))
+    return query.order_by(detection.detected_at, detection.detection_key)
+
+
+async def _row_batches(query, batch_size: int) -> AsyncIterator[list]:
+    # A dedicated session keeps the server-side cursor open for as long as the
+    # response streams, independent of the request's dependency lifecycle
+    async with SessionLocal() as db:
+        result = await db.stream(query.execution_options(yield_per=batch_size))
+        async for batch in result.mappings().partitions():
+            yield batch
+
+
+def _json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that hands the bytes written so far back in chunks."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _arrow_schema(columns: list):
+    import pyarrow as pa
+
+    types = {
+        "int64": pa.int64(),
+        "float64": pa.float64(),
+        "string": pa.string(),
+        "bool": pa.bool_(),
+        "timestamp": pa.timestamp("us"),
+    }
+    return pa.schema([(name, types[type_name]) for name, type_name in columns])
+
+
+async def stream_export(query, columns: list, export_format: ExportFormat, batch_size: int = 5000) -> AsyncIterator[bytes]:
+    """Stream the rows of an export query in the requested format.
+
+    Rows are fetched `batch_size` at a time from a server-side cursor and each
+    batch is encoded and sent before the next one is fetched, so memory use
+    doesn't grow with the size of the export. Parquet output writes one row
+    group per batch.
+
+    Args:
+        query (Select): Export query
+        columns (list): (name, Arrow type name) pairs of the exported columns
+        export_format (ExportFormat): Output format
+        batch_size (int): Rows fetched per database round trip
+
+    Yields:
+        bytes: Encoded chunks of the export
+    """
+    names = [name for name, _ in columns]
+    rows_sent = 0
+    try:
+        if export_format == ExportFormat.csv:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(names)
+            yield buffer.getvalue().encode("utf-8")
+            async for batch in _row_batches(query, batch_size):
+                buffer.seek(0)
+                buffer.truncate()
+                writer.writerows([row[name] for name in names] for row in batch)
+                rows_sent += len(batch)
+                yield buffer.getvalue().encode("utf-8")
+
+        elif export_format == ExportFormat.ndjson:
+            async for batch in _row_batches(query, batch_size):
+                lines = [json.dumps({name: row[name] for name in names}, default=_json_default, ensure_ascii=False)
+                         for row in batch]
+                rows_sent += len(batch)
+                yield ("\n".join(lines) + "\n").encode("utf-8")
+
+        else:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            schema = _arrow_schema(columns)
+            sink = _ChunkSink()
+            writer = pq.ParquetWriter(sink, schema, compression="snappy")
+            async for batch in _row_batches(query, batch_size):
+                table = pa.Table.from_pydict({name: [row[name] for row in batch] for name in names}, schema=schema)
+                writer.write_table(table)
+                rows_sent += len(batch)
+                yield sink.drain()
+            writer.close()
+            yield sink.drain()
+
+        logger.info(f"Exported {rows_sent} rows as {export_format.value}")
+
+    except Exception as e:
+        # Headers are already sent, so the client sees a truncated download
+        logger.error(f"Error streaming {export_format.value} export after {rows_sent} rows: {e}")
+        raise
@@ -1,23 +1,30 @@
-from fastapi import FastAPI, HTTPException
+from datetime import date, timedelta
+from typing import List, Optional
+from fastapi import Depends, FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from src.common.logger import get_logger
+from fastapi.responses import ORJSONResponse, PlainTextResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from src.common.config import settings
-from src.api import crud, schemas
+from src.common.database import pool_metrics
+from src.common.logger import get_logger
+from src.common.metrics import REGISTRY
+from src.api import crud, export, schemas
+from src.api.cache import response_cache
+from src.api.database import engine, get_db
+from src.api.middleware import TimingMiddleware
+from src.api.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursorError
+from src.api.timeseries import MAX_SERIES_POINTS, BucketSize, bucket_starts
 
 logger = get_logger(__name__)
 
-# Database setup
-DATABASE_URL = f"postgresql://{settings.postgres_user}:{settings.postgres_password}@{settings.postgres_host}:{settings.postgres_port}/{settings.postgres_db}"
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+MAX_ACTIVITY_CHANNELS = 50
 
 app = FastAPI(
     title="Ethiopian Medical Data API",
     description="REST API for accessing processed medical data from Telegram channels. Provides endpoints for messages, channels, and image detections.",
     version="1.0.0",
-    contact={"name": "Your Name", "email": "your@email.com"}
+    contact={"name": "Your Name", "email": "your@email.com"},
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware
@@ -29,83 +36,265 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-@app.get("/messages/", response_model=list[schemas.Message], tags=["Messages"], summary="Get all messages")
-def get_messages():
-    """Retrieve all processed Telegram messages."""
-    return crud.get_all_messages()
+# Per-route latency histograms, exposed on /metrics
+app.add_middleware(TimingMiddleware)
+
+POOL_CONNECTIONS = REGISTRY.gauge("db_pool_connections", "Connections in the API's database pool by state.", ["state"])
+POOL_EVENTS = REGISTRY.gauge("db_pool_checkouts", "Pool checkouts waiting for, or timed out waiting for, a connection.", ["state"])
+
+@app.get("/messages/", response_model=schemas.MessagePage, tags=["Messages"], summary="Get messages")
+async def get_messages(limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), cursor: Optional[str] = None,
+                       channel: Optional[str] = None, start_date: Optional[date] = None,
+                       end_date: Optional[date] = None, db: AsyncSession = Depends(get_db)):
+    """Retrieve processed Telegram messages, newest first, one page at a time.
+    
+    Pass the returned `next_cursor` as `cursor` to fetch the following page.
+    """
+    try:
+        page = await crud.get_all_messages(db, limit=limit, cursor=cursor, channel_name=channel,
+                                           start_date=start_date, end_date=end_date)
+        return ORJSONResponse(page)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error getting messages: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/channels/", response_model=schemas.ChannelPage, tags=["Channels"], summary="Get channels")
+async def get_channels(limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), cursor: Optional[str] = None,
+                       db: AsyncSession = Depends(get_db)):
+    """Retrieve Telegram channels ordered by name, one page at a time.
+    
+    Pass the returned `next_cursor` as `cursor` to fetch the following page.
+    """
+    try:
+        return ORJSONResponse(await crud.get_all_channels(db, limit=limit, cursor=cursor))
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error getting channels: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/image-detections/", response_model=schemas.ImageDetectionPage, tags=["Image Detections"], summary="Get image detections")
+async def get_image_detections(limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), cursor: Optional[str] = None,
+                               channel: Optional[str] = None, object_class: Optional[str] = None,
+                               min_confidence: Optional[float] = Query(None, ge=0, le=1),
+                               start_date: Optional[date] = None, end_date: Optional[date] = None,
+                               db: AsyncSession = Depends(get_db)):
+    """Retrieve image detections from processed images, most recent first, one page at a time.
+    
+    Pass the returned `next_cursor` as `cursor` to fetch the following page.
+    """
+    try:
+        page = await crud.get_all_image_detections(db, limit=limit, cursor=cursor, channel_name=channel,
+                                                   object_class=object_class, min_confidence=min_confidence,
+                                                   start_date=start_date, end_date=end_date)
+        return ORJSONResponse(page)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error getting image detections: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+def _export_response(query, columns: list, export_format: export.ExportFormat, name: str) -> StreamingResponse:
+    if export_format == export.ExportFormat.parquet and not export.parquet_available():
+        raise HTTPException(status_code=400, detail="Parquet export requires the pyarrow package")
+    return StreamingResponse(
+        export.stream_export(query, columns, export_format, batch_size=settings.export_batch_size),
+        media_type=export.MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{export_format.value}"'}
+    )
 
-@app.get("/channels/", response_model=list[schemas.Channel], tags=["Channels"], summary="Get all channels")
-def get_channels():
-    """Retrieve all Telegram channels."""
-    return crud.get_all_channels()
+@app.get("/export/messages", tags=["Export"], summary="Export messages")
+async def export_messages(format: export.ExportFormat = export.ExportFormat.ndjson, channel: Optional[str] = None,
+                          start_date: Optional[date] = None, end_date: Optional[date] = None):
+    """Stream every matching message as NDJSON, CSV or Parquet, oldest first.
+    
+    Rows are read from a server-side cursor and sent as they arrive, so exports
+    of any size use constant server memory.
+    """
+    query = export.messages_query(channel_name=channel, start_date=start_date, end_date=end_date)
+    return _export_response(query, export.MESSAGE_COLUMNS, format, "messages")
 
-@app.get("/image-detections/", response_model=list[schemas.ImageDetection], tags=["Image Detections"], summary="Get all image detections")
-def get_image_detections():
-    """Retrieve all image detections from processed images."""
-    return crud.get_all_image_detections()
+@app.get("/export/image-detections", tags=["Export"], summary="Export image detections")
+async def export_image_detections(format: export.ExportFormat = export.ExportFormat.ndjson,
+                                  channel: Optional[str] = None, object_class: Optional[str] = None,
+                                  start_date: Optional[date] = None, end_date: Optional[date] = None):
+    """Stream every matching image detection as NDJSON, CSV or Parquet, oldest first.
+    
+    Rows are read from a server-side cursor and sent as they arrive, so exports
+    of any size use constant server memory.
+    """
+    query = export.image_detections_query(channel_name=channel, object_class=object_class,
+                                          start_date=start_date, end_date=end_date)
+    return _export_response(query, export.IMAGE_DETECTION_COLUMNS, format, "image_detections")
+
+@app.get("/api/detections/summary", response_model=schemas.DetectionSummaryResponse, tags=["Image Detections"],
+         summary="Summarize image detections")
+async def get_detection_summary(request: Request, object_class: Optional[str] = None, channel: Optional[str] = None,
+                                min_confidence: Optional[float] = Query(None, ge=0, le=1),
+                                start_date: Optional[date] = None, end_date: Optional[date] = None,
+                                db: AsyncSession = Depends(get_db)):
+    """Count image detections per object class and per channel.
+    
+    Thresholds on the 0.05 grid (0.5, 0.7, 0.85, ...) are answered from the
+    daily detection aggregate; other thresholds scan the indexed detection facts.
+    
+    Args:
+        object_class (str, optional): Only count detections of this object class
+        channel (str, optional): Only count detections from this channel
+        min_confidence (float, optional): Only count detections at or above this confidence
+        start_date (date, optional): Only count detections made on or after this date
+        end_date (date, optional): Only count detections made on or before this date
+        
+    Returns:
+        DetectionSummaryResponse: Total, per-class and per-channel counts
+    """
+    async def compute():
+        return await crud.get_detection_summary(db, object_class=object_class, channel_name=channel,
+                                                min_confidence=min_confidence, start_date=start_date,
+                                                end_date=end_date)
+    
+    try:
+        return await response_cache.respond(request, compute)
+    except Exception as e:
+        logger.error(f"Error summarizing image detections: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/reports/top-products", response_model=schemas.TopProductsResponse)
-async def get_top_products(limit: int = 10):
+async def get_top_products(request: Request, limit: int = 10, start_date: Optional[date] = None,
+                           end_date: Optional[date] = None, channel: Optional[str] = None,
+                           db: AsyncSession = Depends(get_db)):
     """Get the most frequently mentioned products in messages.
     
+    Responses are cached until the next pipeline load and support conditional
+    requests via `ETag` / `Last-Modified`.
+    
     Args:
         limit (int): Number of top products to return
+        start_date (date, optional): Only count mentions posted on or after this date
+        end_date (date, optional): Only count mentions posted on or before this date
+        channel (str, optional): Only count mentions from this channel
         
     Returns:
         TopProductsResponse: List of top products with counts
     """
-    try:
-        db = SessionLocal()
-        products = crud.get_top_products(db, limit=limit)
+    async def compute():
+        products = await crud.get_top_products(db, limit=limit, start_date=start_date,
+                                               end_date=end_date, channel_name=channel)
         return {"products": products}
+    
+    try:
+        return await response_cache.respond(request, compute)
     except Exception as e:
         logger.error(f"Error getting top products: {e}")
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        db.close()
+
+@app.get("/api/channels/activity", response_model=schemas.ChannelsActivityResponse)
+async def get_channels_activity(request: Request, channels: List[str] = Query(...),
+                                start_date: Optional[date] = None, end_date: Optional[date] = None,
+                                bucket: BucketSize = BucketSize.day, db: AsyncSession = Depends(get_db)):
+    """Get bucketed posting activity for several channels in one call.
+    
+    All channels are answered by a single grouped query, and every series is
+    dense: buckets without messages are included with zero counts.
+    
+    Args:
+        channels (List[str]): Channel names, as repeated or comma-separated parameters
+        start_date (date, optional): First day of the range; defaults to 30 days before `end_date`
+        end_date (date, optional): Last day of the range (inclusive); defaults to today
+        bucket (BucketSize): Bucket size: hour, day, week or month
+        
+    Returns:
+        ChannelsActivityResponse: Totals and series for each requested channel
+    """
+    channel_names = list(dict.fromkeys(name.strip() for value in channels for name in value.split(",") if name.strip()))
+    end_date = end_date or date.today()
+    start_date = start_date or end_date - timedelta(days=30)
+    
+    if not channel_names:
+        raise HTTPException(status_code=400, detail="At least one channel is required")
+    if len(channel_names) > MAX_ACTIVITY_CHANNELS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_ACTIVITY_CHANNELS} channels can be requested at once")
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date must not be after end_date")
+    if len(bucket_starts(start_date, end_date, bucket)) > MAX_SERIES_POINTS:
+        raise HTTPException(status_code=400, detail=f"Range too long for {bucket.value} buckets (max {MAX_SERIES_POINTS} points)")
+    
+    async def compute():
+        return await crud.get_channels_activity(db, channel_names=channel_names, start_date=start_date,
+                                                end_date=end_date, bucket=bucket)
+    
+    try:
+        return await response_cache.respond(request, compute)
+    except Exception as e:
+        logger.error(f"Error getting activity for channels {channel_names}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/channels/{channel_name}/activity", response_model=schemas.ChannelActivityResponse)
-async def get_channel_activity(channel_name: str):
+async def get_channel_activity(channel_name: str, request: Request, db: AsyncSession = Depends(get_db)):
     """Get posting activity for a specific channel.
     
+    Responses are cached until the next pipeline load and support conditional
+    requests via `ETag` / `Last-Modified`.
+    
     Args:
         channel_name (str): Name of the Telegram channel
         
     Returns:
         ChannelActivityResponse: Activity data for the channel
     """
-    try:
-        db = SessionLocal()
-        activity = crud.get_channel_activity(db, channel_name=channel_name)
+    async def compute():
+        activity = await crud.get_channel_activity(db, channel_name=channel_name)
         if not activity:
             raise HTTPException(status_code=404, detail="Channel not found")
         return activity
+    
+    try:
+        return await response_cache.respond(request, compute)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting channel activity for {channel_name}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        db.close()
 
 @app.get("/api/search/messages", response_model=schemas.MessageSearchResponse)
-async def search_messages(query: str, limit: int = 20):
-    """Search for messages containing a specific keyword.
+async def search_messages(query: str, request: Request, limit: int = Query(20, ge=1, le=100),
+                          channel: Optional[str] = None, db: AsyncSession = Depends(get_db)):
+    """Search messages by relevance.
+    
+    Every word is matched as a prefix, in English or Amharic, and each result
+    carries a highlighted snippet. An advertisement copied across channels is
+    returned once. Responses are cached until the next pipeline load and
+    support conditional requests via `ETag` / `Last-Modified`.
     
     Args:
-        query (str): Keyword to search for
+        query (str): Search text
         limit (int): Maximum number of results to return
+        channel (str, optional): Only search messages from this channel
         
     Returns:
-        MessageSearchResponse: List of matching messages
+        MessageSearchResponse: List of matching messages, most relevant first
     """
-    try:
-        db = SessionLocal()
-        messages = crud.search_messages(db, query=query, limit=limit)
+    async def compute():
+        messages = await crud.search_messages(db, query=query, limit=limit, channel_name=channel)
         return {"messages": messages}
+    
+    try:
+        return await response_cache.respond(request, compute)
     except Exception as e:
         logger.error(f"Error searching messages for '{query}': {e}")
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        db.close()
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Expose request, query, cache and connection pool metrics in the Prometheus text format."""
+    stats = pool_metrics(engine)
+    for state in ("size", "checked_in", "checked_out", "overflow", "max_overflow"):
+        POOL_CONNECTIONS.set(stats[state], state=state)
+    POOL_EVENTS.set(stats["waiting"], state="waiting")
+    POOL_EVENTS.set(stats["timeouts"], state="timed_out")
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
 
 @app.on_event("startup")
 async def startup_event():
@@ -115,4 +304,5 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     """Clean up on shutdown."""
-    logger.info("Shutting down Ethiopian Medical Business Analytics API")
\ No newline at end of file
+    logger.info("Shutting down Ethiopian Medical Business Analytics API")
+    await engine.dispose()
\ No newline at end of file
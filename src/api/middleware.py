@@ -0,0 +1,60 @@
+import time
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from src.common.metrics import REGISTRY
+
+REQUEST_DURATION = REGISTRY.histogram(
+    "http_request_duration_seconds", "Time to fully send an HTTP response.", ["method", "route", "status"]
+)
+REQUESTS_IN_PROGRESS = REGISTRY.gauge(
+    "http_requests_in_progress", "Requests currently being handled.", ["method"]
+)
+
+
+class TimingMiddleware:
+    """ASGI middleware recording per-route request latency.
+
+    Requests are labelled with the route template (e.g.
+    '/api/channels/{channel_name}/activity') rather than the raw path, so the
+    number of series stays bounded. Streaming responses are timed until their
+    last chunk is sent.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._in_progress = {}
+
+    def _route(self, scope: Scope) -> str:
+        route = scope.get("route")
+        if route is not None:
+            return route.path
+        for candidate in getattr(scope.get("app"), "routes", []):
+            match, _ = candidate.matches(scope)
+            if match == Match.FULL:
+                return candidate.path
+        return "unmatched"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        self._in_progress[method] = self._in_progress.get(method, 0) + 1
+        REQUESTS_IN_PROGRESS.set(self._in_progress[method], method=method)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUEST_DURATION.observe(time.perf_counter() - started, method=method,
+                                     route=self._route(scope), status=status_code)
+            self._in_progress[method] -= 1
+            REQUESTS_IN_PROGRESS.set(self._in_progress[method], method=method)
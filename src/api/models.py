@@ -1,9 +1,10 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Date, Float, Text, Boolean, ForeignKey
 from sqlalchemy.sql import func
 from .database import Base
 
 class TelegramChannel(Base):
     __tablename__ = "dim_channels"
+    __table_args__ = {"schema": "marts"}
     
     channel_key = Column(String, primary_key=True)
     channel_name = Column(String)
@@ -13,22 +14,30 @@ class TelegramChannel(Base):
 
 class TelegramMessage(Base):
     __tablename__ = "fct_messages"
+    __table_args__ = {"schema": "marts"}
     
     message_key = Column(String, primary_key=True)
-    channel_key = Column(String, ForeignKey('dim_channels.channel_key'))
-    date_key = Column(DateTime)
+    channel_key = Column(String, ForeignKey('marts.dim_channels.channel_key'))
+    date_key = Column(Date)
+    message_id = Column(Integer)
+    channel_name = Column(String)
     message_date = Column(DateTime)
+    message_text = Column(Text)
     views = Column(Integer)
     forwards = Column(Integer)
-    has_media = Column(Integer)
+    has_media = Column(Boolean)
     loaded_at = Column(DateTime, server_default=func.now())
 
 class ImageDetection(Base):
     __tablename__ = "fct_image_detections"
+    __table_args__ = {"schema": "marts"}
     
     detection_key = Column(String, primary_key=True)
-    message_key = Column(String, ForeignKey('dim_messages.message_key'))
+    message_key = Column(String, ForeignKey('marts.dim_messages.message_key'))
+    message_id = Column(Integer)
+    channel_name = Column(String)
     object_class = Column(String)
     confidence = Column(Float)
     image_path = Column(String)
+    detected_at = Column(DateTime)
     loaded_at = Column(DateTime, server_default=func.now())
\ No newline at end of file
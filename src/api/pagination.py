@@ -0,0 +1,64 @@
+import base64
+import binascii
+import json
+from datetime import date, datetime
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+def encode_cursor(*values) -> str:
+    """Encode the sort key of the last row on a page as an opaque cursor.
+
+    Args:
+        *values: Sort key values of the last row, in sort order
+
+    Returns:
+        str: URL-safe cursor token
+    """
+    payload = [value.isoformat() if isinstance(value, (date, datetime)) else value for value in values]
+    encoded = base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+    return encoded.decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, types: tuple) -> list:
+    """Decode a cursor produced by `encode_cursor`.
+
+    Args:
+        cursor (str): Cursor token from a previous page
+        types (tuple): Expected type of each sort key value
+
+    Returns:
+        list: Sort key values of the last row of the previous page
+
+    Raises:
+        InvalidCursorError: If the token is malformed or doesn't match `types`
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, binascii.Error):
+        raise InvalidCursorError("Invalid cursor")
+
+    if not isinstance(values, list) or len(values) != len(types):
+        raise InvalidCursorError("Invalid cursor")
+
+    decoded = []
+    for value, expected_type in zip(values, types):
+        try:
+            if expected_type is datetime:
+                value = datetime.fromisoformat(value)
+            elif expected_type is date:
+                value = date.fromisoformat(value)
+            elif expected_type is float and isinstance(value, int):
+                value = float(value)
+        except (TypeError, ValueError):
+            raise InvalidCursorError("Invalid cursor")
+        if not isinstance(value, expected_type) or isinstance(value, bool):
+            raise InvalidCursorError("Invalid cursor")
+        decoded.append(value)
+    return decoded
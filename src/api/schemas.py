@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 from pydantic import BaseModel, Field
 
 class ProductCount(BaseModel):
@@ -18,32 +18,80 @@ class ChannelActivityResponse(BaseModel):
     total_views: int
     daily_activity: List[DailyActivity]
 
+class ActivityPoint(BaseModel):
+    bucket_start: str = Field(..., description="Start of the bucket in ISO format", example="2024-01-01T00:00:00")
+    message_count: int
+    total_views: int
+
+class ChannelActivitySeries(BaseModel):
+    channel_name: str
+    total_messages: int = Field(..., description="Messages posted in the requested range")
+    total_views: int = Field(..., description="Views of the messages posted in the requested range")
+    series: List[ActivityPoint]
+
+class ChannelsActivityResponse(BaseModel):
+    bucket: str = Field(..., description="Bucket size of the series", example="day")
+    start_date: str
+    end_date: str
+    channels: List[ChannelActivitySeries]
+
 class Message(BaseModel):
     id: int = Field(..., description="Unique message identifier", example=12345)
+    channel_name: str = Field(..., description="Channel the message was posted in", example="chemed")
     date: str = Field(..., description="Message date in ISO format", example="2024-01-01T12:00:00")
     message: str = Field(..., description="Message text", example="This is a sample message.")
-    views: int = Field(None, description="Number of views", example=100)
-    forwards: int = Field(None, description="Number of forwards", example=5)
+    views: Optional[int] = Field(None, description="Number of views", example=100)
+    forwards: Optional[int] = Field(None, description="Number of forwards", example=5)
     media: bool = Field(False, description="Whether the message contains media", example=True)
 
 class Channel(BaseModel):
-    id: int = Field(..., description="Unique channel identifier", example=1)
+    id: str = Field(..., description="Unique channel identifier", example="5d41402abc4b2a76b9719d911017c592")
     name: str = Field(..., description="Channel name", example="chemed")
-    description: str = Field(None, description="Channel description", example="Medical discussion group.")
+    description: Optional[str] = Field(None, description="Channel description", example="Medical discussion group.")
 
 class ImageDetection(BaseModel):
-    detection_id: int = Field(..., description="Unique detection identifier", example=1001)
+    detection_id: str = Field(..., description="Unique detection identifier", example="7d793037a0760186574b0282f2f435e7")
     message_id: int = Field(..., description="Associated message ID", example=12345)
+    channel_name: str = Field(..., description="Channel the image was posted in", example="chemed")
     object_class: str = Field(..., description="Detected object class", example="syringe")
     confidence: float = Field(..., description="Detection confidence score", example=0.98)
     image_path: str = Field(..., description="Path to the detected image", example="data/raw/telegram_images/2024-01-01/chemed/12345.jpg")
+    detected_at: Optional[str] = Field(None, description="Detection time in ISO format", example="2024-01-01T12:05:00")
+
+class ClassCount(BaseModel):
+    object_class: str = Field(..., example="syringe")
+    detection_count: int
+    avg_confidence: float = Field(..., description="Mean confidence of the counted detections", example=0.82)
+
+class ChannelCount(BaseModel):
+    channel_name: str = Field(..., example="chemed")
+    detection_count: int
+
+class DetectionSummaryResponse(BaseModel):
+    total_detections: int
+    by_class: List[ClassCount]
+    by_channel: List[ChannelCount]
+
+class MessagePage(BaseModel):
+    items: List[Message]
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page; null on the last page")
+
+class ChannelPage(BaseModel):
+    items: List[Channel]
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page; null on the last page")
+
+class ImageDetectionPage(BaseModel):
+    items: List[ImageDetection]
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page; null on the last page")
 
 class MessageResult(BaseModel):
     message_id: str
     channel_name: str
     message_date: str
     message_text: str
-    views: int
+    views: Optional[int] = None
+    rank: float = Field(..., description="Relevance score; higher is more relevant", example=0.2)
+    snippet: str = Field(..., description="Message excerpt with matched terms wrapped in <b></b>", example="Fresh stock of <b>paracetamol</b> 500mg")
 
 class MessageSearchResponse(BaseModel):
     messages: List[MessageResult]
\ No newline at end of file
@@ -0,0 +1,24 @@
+import re
+
+# Cap the number of terms so a pasted paragraph can't produce a huge query
+MAX_QUERY_TERMS = 8
+
+# Anything that isn't a letter or digit separates terms, which also strips every
+# tsquery operator (& | ! ( ) : * <->) from user input
+_TERM_SEPARATOR = re.compile(r"[\W_]+")
+
+
+def build_prefix_tsquery(query: str) -> str:
+    """Turn free text into a `to_tsquery` expression matching every term as a prefix.
+
+    'paracet 500' becomes 'paracet:* & 500:*', so results update while the user
+    is still typing the last word.
+
+    Args:
+        query (str): Search text as typed by the user
+
+    Returns:
+        str: tsquery expression, or an empty string if the text has no searchable terms
+    """
+    terms = [term for term in _TERM_SEPARATOR.split(query.casefold()) if term]
+    return " & ".join(f"{term}:*" for term in terms[:MAX_QUERY_TERMS])
@@ -0,0 +1,76 @@
+from datetime import date, datetime, timedelta
+from enum import Enum
+from typing import List
+
+# Upper bound on buckets per series, so one request can't ask for years of hourly points
+MAX_SERIES_POINTS = 2000
+
+
+class BucketSize(str, Enum):
+    hour = "hour"
+    day = "day"
+    week = "week"
+    month = "month"
+
+
+def truncate(value: datetime, bucket: BucketSize) -> datetime:
+    """Truncate a timestamp to the start of its bucket, matching Postgres `date_trunc`.
+
+    Weeks start on Monday, as in `date_trunc('week', ...)`.
+
+    Args:
+        value (datetime): Timestamp to truncate
+        bucket (BucketSize): Bucket size
+
+    Returns:
+        datetime: Start of the bucket containing `value`
+    """
+    if bucket == BucketSize.hour:
+        return value.replace(minute=0, second=0, microsecond=0)
+    value = value.replace(hour=0, minute=0, second=0, microsecond=0)
+    if bucket == BucketSize.week:
+        return value - timedelta(days=value.weekday())
+    if bucket == BucketSize.month:
+        return value.replace(day=1)
+    return value
+
+
+def next_bucket(value: datetime, bucket: BucketSize) -> datetime:
+    """Get the start of the bucket following the one starting at `value`.
+
+    Args:
+        value (datetime): Start of a bucket
+        bucket (BucketSize): Bucket size
+
+    Returns:
+        datetime: Start of the next bucket
+    """
+    if bucket == BucketSize.hour:
+        return value + timedelta(hours=1)
+    if bucket == BucketSize.day:
+        return value + timedelta(days=1)
+    if bucket == BucketSize.week:
+        return value + timedelta(weeks=1)
+    if value.month == 12:
+        return value.replace(year=value.year + 1, month=1)
+    return value.replace(month=value.month + 1)
+
+
+def bucket_starts(start_date: date, end_date: date, bucket: BucketSize) -> List[datetime]:
+    """List the start of every bucket overlapping the inclusive date range.
+
+    Args:
+        start_date (date): First day of the range
+        end_date (date): Last day of the range
+        bucket (BucketSize): Bucket size
+
+    Returns:
+        List[datetime]: Bucket starts in ascending order
+    """
+    end = datetime.combine(end_date + timedelta(days=1), datetime.min.time())
+    current = truncate(datetime.combine(start_date, datetime.min.time()), bucket)
+    starts = []
+    while current < end:
+        starts.append(current)
+        current = next_bucket(current, bucket)
+    return starts
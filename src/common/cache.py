@@ -0,0 +1,134 @@
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent.parent))  # Add project root to path
+from src.common.config import settings
+
+
+class TTLCache:
+    """In-process cache with per-entry expiry and least-recently-used eviction."""
+
+    # Entries live in this process only, so they must be cleared locally on invalidation
+    shared = False
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 3600, clock=time.monotonic):
+        """Initialize the cache.
+
+        Args:
+            max_entries (int): Maximum number of entries kept before evicting the least recently used
+            ttl_seconds (float): Seconds an entry stays valid after it was stored
+            clock (callable): Monotonic time source, in seconds
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Get a cached value.
+
+        Args:
+            key (str): Cache key
+
+        Returns:
+            Any: The cached value, or None if it is missing or expired
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Any):
+        """Store a value, evicting the least recently used entries if the cache is full.
+
+        Args:
+            key (str): Cache key
+            value (Any): Value to cache
+        """
+        self._entries[key] = (self._clock() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def clear(self):
+        """Drop every entry."""
+        self._entries.clear()
+
+
+class RedisCache:
+    """Cache shared by every API process through Redis.
+
+    Values are stored as JSON. Redis applies the TTL and, when configured with an
+    eviction policy such as `allkeys-lru`, the LRU eviction.
+    """
+
+    shared = True
+
+    def __init__(self, url: str, ttl_seconds: float = 3600, prefix: str = "api-cache:"):
+        """Initialize the cache.
+
+        Args:
+            url (str): Redis connection URL, e.g. 'redis://redis:6379/0'
+            ttl_seconds (float): Seconds an entry stays valid after it was stored
+            prefix (str): Prefix added to every key
+        """
+        try:
+            from redis import asyncio as aioredis
+        except ImportError:
+            raise ImportError("CACHE_BACKEND=redis requires the 'redis' package (pip install redis)")
+
+        self._client = aioredis.from_url(url)
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Get a cached value.
+
+        Args:
+            key (str): Cache key
+
+        Returns:
+            Any: The cached value, or None if it is missing or expired
+        """
+        value = await self._client.get(self.prefix + key)
+        return json.loads(value) if value is not None else None
+
+    async def set(self, key: str, value: Any):
+        """Store a JSON-serializable value.
+
+        Args:
+            key (str): Cache key
+            value (Any): Value to cache
+        """
+        await self._client.set(self.prefix + key, json.dumps(value), ex=max(int(self.ttl_seconds), 1))
+
+    async def clear(self):
+        """Drop every entry under this cache's prefix."""
+        async for key in self._client.scan_iter(match=f"{self.prefix}*"):
+            await self._client.delete(key)
+
+
+def create_cache():
+    """Create the cache backend selected by `CACHE_BACKEND` ('memory' or 'redis').
+
+    Returns:
+        TTLCache | RedisCache: Cache backend
+    """
+    if settings.cache_backend == "redis":
+        return RedisCache(settings.redis_url, ttl_seconds=settings.cache_ttl_seconds)
+    if settings.cache_backend != "memory":
+        raise ValueError(f"Unknown cache backend: {settings.cache_backend}")
+    return TTLCache(max_entries=settings.cache_max_entries, ttl_seconds=settings.cache_ttl_seconds)
@@ -1,4 +1,5 @@
 import os
+from typing import List, Optional
 from dotenv import load_dotenv
 from pydantic_settings import BaseSettings
 
@@ -10,6 +11,7 @@ class Settings(BaseSettings):
     telegram_api_id: str = os.getenv("TELEGRAM_API_ID")
     telegram_api_hash: str = os.getenv("TELEGRAM_API_HASH")
     telegram_phone: str = os.getenv("TELEGRAM_PHONE")
+    telegram_channels: str = os.getenv("TELEGRAM_CHANNELS", "chemed,lobelia4cosmetics,tikvahpharma")  # Comma-separated
     
     # Database configuration
     postgres_user: str = os.getenv("POSTGRES_USER")
@@ -18,10 +20,61 @@ class Settings(BaseSettings):
     postgres_host: str = os.getenv("POSTGRES_HOST")
     postgres_port: str = os.getenv("POSTGRES_PORT")
     
+    # Connection pool settings (per process, shared by every engine user in it)
+    db_pool_size: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    db_max_overflow: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    db_pool_timeout: int = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+    db_pool_recycle: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    db_pool_pre_ping: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    db_statement_timeout_ms: int = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000"))
+    db_prepared_statement_cache_size: int = int(os.getenv("DB_PREPARED_STATEMENT_CACHE_SIZE", "100"))
+    
+    # Query timing: statements slower than this are logged with their plan
+    db_slow_query_ms: int = int(os.getenv("DB_SLOW_QUERY_MS", "500"))
+    db_slow_query_explain: bool = os.getenv("DB_SLOW_QUERY_EXPLAIN", "true").lower() == "true"
+    
     # Application settings
+    environment: str = os.getenv("ENVIRONMENT", "development")  # 'development' or 'production'
     log_level: str = os.getenv("LOG_LEVEL", "INFO")
+    log_format: str = os.getenv("LOG_FORMAT", "text")  # 'text' or 'json'
+    log_file: Optional[str] = os.getenv("LOG_FILE")
+    log_rate_limit: int = int(os.getenv("LOG_RATE_LIMIT", "20"))  # Records per call site and window, 0 = unlimited
+    log_rate_window_seconds: float = float(os.getenv("LOG_RATE_WINDOW_SECONDS", "60"))
     data_dir: str = os.getenv("DATA_DIR", "./data")
     
+    # Response cache settings
+    cache_backend: str = os.getenv("CACHE_BACKEND", "memory")  # 'memory' or 'redis'
+    redis_url: Optional[str] = os.getenv("REDIS_URL")
+    cache_ttl_seconds: int = int(os.getenv("CACHE_TTL_SECONDS", "3600"))
+    cache_max_entries: int = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+    cache_version_check_seconds: int = int(os.getenv("CACHE_VERSION_CHECK_SECONDS", "30"))
+    
+    # Bulk export settings
+    export_batch_size: int = int(os.getenv("EXPORT_BATCH_SIZE", "5000"))
+    
+    # Streaming listener settings: a micro-batch is written when either limit is reached
+    listener_batch_size: int = int(os.getenv("LISTENER_BATCH_SIZE", "200"))
+    listener_flush_seconds: float = float(os.getenv("LISTENER_FLUSH_SECONDS", "5"))
+    
+    # Near-duplicate detection: lowest estimated Jaccard similarity of two copies of a message
+    dedupe_threshold: float = float(os.getenv("DEDUPE_THRESHOLD", "0.8"))
+    
+    # Object detection settings
+    yolo_weights: str = os.getenv("YOLO_WEIGHTS", "yolov8n.pt")
+    
+    # Orchestration settings
+    pipeline_start_date: str = os.getenv("PIPELINE_START_DATE", "2024-01-01")  # First daily partition
+    pipeline_max_concurrent: int = int(os.getenv("PIPELINE_MAX_CONCURRENT", "4"))  # Parallel steps per run
+    
+    # dbt settings
+    dbt_project_dir: str = os.getenv("DBT_PROJECT_DIR", "./dbt_project")
+    dbt_state_dir: str = os.getenv("DBT_STATE_DIR", "./dbt_project/state")
+    
+    @property
+    def channels(self) -> List[str]:
+        """Channels to collect, parsed from `telegram_channels`."""
+        return [channel.strip() for channel in self.telegram_channels.split(",") if channel.strip()]
+    
     class Config:
         env_file = ".env"
 
@@ -0,0 +1,48 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import MetaData, Table, Column, Integer, String, DateTime
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent.parent))  # Add project root to path
+from src.common.logger import get_logger
+
+logger = get_logger(__name__)
+
+metadata = MetaData()
+
+# One row per completed pipeline load; the newest `updated_at` is the current data version
+data_versions = Table('pipeline_data_versions', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('run_id', String(64)),
+    Column('updated_at', DateTime, nullable=False, default=datetime.utcnow)
+)
+
+LATEST_VERSION_SQL = "SELECT MAX(updated_at) FROM pipeline_data_versions"
+
+
+def mark_data_updated(engine: Engine, run_id: Optional[str] = None) -> datetime:
+    """Record that the pipeline finished loading new data into the marts.
+
+    API processes poll the latest version and drop their cached responses when it
+    changes.
+
+    Args:
+        engine (Engine): Database engine
+        run_id (str, optional): Identifier of the pipeline run that loaded the data
+
+    Returns:
+        datetime: The new data version (UTC)
+    """
+    try:
+        updated_at = datetime.utcnow()
+        metadata.create_all(engine, tables=[data_versions])
+        with engine.begin() as conn:
+            conn.execute(data_versions.insert().values(run_id=run_id, updated_at=updated_at))
+        logger.info(f"Published data version {updated_at.isoformat()}")
+        return updated_at
+
+    except SQLAlchemyError as e:
+        logger.error(f"Error publishing data version: {e}")
+        raise
@@ -0,0 +1,220 @@
+import threading
+import time
+from functools import lru_cache
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent.parent))  # Add project root to path
+from src.common.config import settings
+from src.common.logger import get_logger
+from src.common.metrics import REGISTRY
+
+logger = get_logger(__name__)
+
+QUERY_DURATION = REGISTRY.histogram(
+    "db_query_duration_seconds", "Database statement execution time.", ["operation"]
+)
+SLOW_QUERIES = REGISTRY.counter(
+    "db_slow_queries_total", "Statements slower than DB_SLOW_QUERY_MS.", ["operation"]
+)
+
+
+class _PoolStatsMixin:
+    """Track checkouts that had to wait for a connection, and those that timed out."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.waiting = 0
+        self.timeouts = 0
+
+    def _exhausted(self) -> bool:
+        return self.checkedin() == 0 and self._max_overflow > -1 and self.overflow() >= self._max_overflow
+
+    def _do_get(self):
+        if not self._exhausted():
+            return super()._do_get()
+
+        with self._stats_lock:
+            self.waiting += 1
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            with self._stats_lock:
+                self.waiting -= 1
+
+
+class InstrumentedQueuePool(_PoolStatsMixin, QueuePool):
+    """QueuePool that reports waiting and timed-out checkouts."""
+
+
+class InstrumentedAsyncQueuePool(_PoolStatsMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that reports waiting and timed-out checkouts."""
+
+
+def database_url(driver: str = "psycopg2") -> str:
+    """Build the PostgreSQL connection URL.
+
+    Args:
+        driver (str): SQLAlchemy driver name (e.g. 'psycopg2' or 'asyncpg')
+
+    Returns:
+        str: Connection URL
+    """
+    return (
+        f"postgresql+{driver}://{settings.postgres_user}:{settings.postgres_password}@"
+        f"{settings.postgres_host}:{settings.postgres_port}/{settings.postgres_db}"
+    )
+
+
+def _pool_options(**overrides) -> dict:
+    options = {
+        'pool_size': settings.db_pool_size,
+        'max_overflow': settings.db_max_overflow,
+        'pool_timeout': settings.db_pool_timeout,
+        'pool_recycle': settings.db_pool_recycle,
+        'pool_pre_ping': settings.db_pool_pre_ping,
+    }
+    options.update(overrides)
+    return options
+
+
+def create_db_engine(**overrides) -> Engine:
+    """Create a synchronous (psycopg2) engine with the configured pool settings.
+
+    psycopg2 has no server-side prepared statements, so
+    `db_prepared_statement_cache_size` only applies to the async engine.
+
+    Args:
+        **overrides: Keyword arguments overriding the configured pool options
+
+    Returns:
+        Engine: SQLAlchemy engine
+    """
+    return create_engine(
+        database_url("psycopg2"),
+        poolclass=InstrumentedQueuePool,
+        connect_args={'options': f"-c statement_timeout={settings.db_statement_timeout_ms}"},
+        **_pool_options(**overrides)
+    )
+
+
+def create_async_db_engine(**overrides) -> AsyncEngine:
+    """Create an asyncpg engine with the configured pool settings.
+
+    asyncpg prepares statements server-side and keeps up to
+    `db_prepared_statement_cache_size` of them per connection; set it to 0 when
+    connecting through a transaction-pooling proxy such as PgBouncer.
+
+    Args:
+        **overrides: Keyword arguments overriding the configured pool options
+
+    Returns:
+        AsyncEngine: SQLAlchemy async engine
+    """
+    return create_async_engine(
+        f"{database_url('asyncpg')}?prepared_statement_cache_size={settings.db_prepared_statement_cache_size}",
+        poolclass=InstrumentedAsyncQueuePool,
+        connect_args={'server_settings': {'statement_timeout': str(settings.db_statement_timeout_ms)}},
+        **_pool_options(**overrides)
+    )
+
+
+def _explain(conn, statement: str, parameters) -> str:
+    # Plan only (no ANALYZE), on a separate cursor so the original result set is untouched
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(f"EXPLAIN {statement}", parameters)
+        return "\n".join(row[0] for row in cursor.fetchall())
+    finally:
+        cursor.close()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['query_start_time'].pop()
+    operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "UNKNOWN"
+    QUERY_DURATION.observe(elapsed, operation=operation)
+
+    elapsed_ms = elapsed * 1000
+    if elapsed_ms < settings.db_slow_query_ms:
+        return
+
+    SLOW_QUERIES.inc(operation=operation)
+    plan = None
+    if settings.db_slow_query_explain and operation in ("SELECT", "WITH") and not executemany:
+        try:
+            plan = _explain(conn, statement, parameters)
+        except Exception as e:
+            plan = f"EXPLAIN failed: {e}"
+    logger.warning(f"Slow query ({elapsed_ms:.0f} ms): {statement.strip()}" + (f"\nPlan:\n{plan}" if plan else ""))
+
+
+def _handle_error(exception_context):
+    # Failed statements never reach after_cursor_execute; drop their start time
+    conn = exception_context.connection
+    if conn is not None and conn.info.get('query_start_time'):
+        conn.info['query_start_time'].pop()
+
+
+def instrument_engine(engine):
+    """Time every statement run through an engine and log the slow ones.
+
+    Durations feed the `db_query_duration_seconds` histogram. Statements taking
+    longer than `db_slow_query_ms` are logged, with their query plan for reads.
+
+    Args:
+        engine (Engine | AsyncEngine): Engine to instrument
+
+    Returns:
+        Engine | AsyncEngine: The same engine
+    """
+    target = engine.sync_engine if isinstance(engine, AsyncEngine) else engine
+    event.listen(target, "before_cursor_execute", _before_cursor_execute)
+    event.listen(target, "after_cursor_execute", _after_cursor_execute)
+    event.listen(target, "handle_error", _handle_error)
+    return engine
+
+
+@lru_cache(maxsize=None)
+def get_engine() -> Engine:
+    """Get the process-wide synchronous engine."""
+    return instrument_engine(create_db_engine())
+
+
+@lru_cache(maxsize=None)
+def get_async_engine() -> AsyncEngine:
+    """Get the process-wide async engine."""
+    return instrument_engine(create_async_db_engine())
+
+
+def pool_metrics(engine) -> dict:
+    """Report the state of an engine's connection pool.
+
+    Args:
+        engine (Engine | AsyncEngine): Engine created by this module
+
+    Returns:
+        dict: Pool size and the checked-in, checked-out, overflow, waiting and timed-out counts
+    """
+    pool = engine.pool
+    return {
+        'size': pool.size(),
+        'checked_in': pool.checkedin(),
+        'checked_out': pool.checkedout(),
+        'overflow': max(pool.overflow(), 0),
+        'max_overflow': pool._max_overflow,
+        'waiting': getattr(pool, 'waiting', 0),
+        'timeouts': getattr(pool, 'timeouts', 0),
+    }
@@ -1,27 +1,170 @@
-import sys
+import logging
+import queue
+import threading
+import time
 from loguru import logger
 import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent.parent))  # Add project root to path
 from src.common.config import settings
 
+ERROR_LEVEL_NO = logger.level("ERROR").no
+
+TEXT_FORMAT = "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>"
+
+class RateLimitFilter:
+    """Loguru filter passing at most `burst` records per call site in each window.
+
+    Per-item messages in hot loops (a warning for every malformed message, a
+    debug line for every image) are cut to a handful per window; the first
+    record passed after a window notes how many were dropped. ERROR and above
+    always pass.
+
+    Records are shared by every sink, so the dropped count is not written
+    into them; the sink's formatter reads it with `suppressed_count()`, which
+    loguru calls right after the filter, in the same thread.
+    """
+
+    def __init__(self, burst: int, window_seconds: float, clock=time.monotonic):
+        """Initialize the filter.
+
+        Args:
+            burst (int): Records passed per call site and window; 0 disables the limit
+            window_seconds (float): Window length in seconds
+            clock (callable): Monotonic time source, replaceable in tests
+        """
+        self.burst = burst
+        self.window_seconds = window_seconds
+        self.clock = clock
+        self._sites = {}
+        self._lock = threading.Lock()
+        self._last = threading.local()
+
+    def __call__(self, record) -> bool:
+        self._last.suppressed = 0
+        if self.burst <= 0 or record["level"].no >= ERROR_LEVEL_NO:
+            return True
+        site = (record["name"], record["function"], record["line"])
+        now = self.clock()
+        with self._lock:
+            # [window start, records passed, records dropped]
+            state = self._sites.get(site)
+            if state is None or now - state[0] >= self.window_seconds:
+                if state:
+                    self._last.suppressed = state[2]
+                self._sites[site] = [now, 1, 0]
+                return True
+            if state[1] < self.burst:
+                state[1] += 1
+                return True
+            state[2] += 1
+            return False
+
+    def suppressed_count(self) -> int:
+        """Get how many records were dropped before the one last passed in this thread."""
+        return getattr(self._last, "suppressed", 0)
+
+class BackgroundSink:
+    """Stream sink that hands formatted records to a writer thread.
+
+    The calling thread only enqueues a string; the write (and its flush) to a
+    slow terminal or pipe happens in the background. Unlike loguru's
+    `enqueue=True`, records are not pickled through a multiprocessing queue,
+    which costs more per record than the write it avoids. Each process
+    configures its own sink, so no cross-process queue is needed.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def isatty(self) -> bool:
+        return self.stream.isatty()
+
+    def write(self, message: str):
+        self._queue.put(message)
+
+    def _run(self):
+        while True:
+            message = self._queue.get()
+            if message is None:
+                break
+            self.stream.write(message)
+            if self._queue.empty():
+                self.stream.flush()
+
+    def stop(self):
+        """Write out the queued records; loguru calls this when the sink is removed, including at exit."""
+        self._queue.put(None)
+        self._thread.join()
+
+def _text_format(rate_limit: RateLimitFilter):
+    """Build a sink's formatter, noting the records its rate limit dropped."""
+    def format_record(record) -> str:
+        suppressed = rate_limit.suppressed_count()
+        if suppressed:
+            return TEXT_FORMAT + f" <dim>({suppressed} similar messages suppressed)</dim>\n{{exception}}"
+        return TEXT_FORMAT + "\n{exception}"
+    return format_record
+
+class InterceptHandler(logging.Handler):
+    """Route standard-library log records (telethon, dagster, ...) into loguru's sinks."""
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            level = logger.level(record.levelname).name
+        except ValueError:
+            level = record.levelno
+        # Skip the logging module's own frames so the record points at the caller
+        frame, depth = sys._getframe(), 0
+        while frame and (depth == 0 or frame.f_code.co_filename == logging.__file__):
+            frame = frame.f_back
+            depth += 1
+        logger.opt(depth=depth, exception=record.exc_info).log(level, record.getMessage())
+
+def configure_logging():
+    """Configure the loguru sinks from the settings.
+
+    Records are formatted in the calling thread and written by a background
+    thread, so a slow stdout or disk never blocks a stage.
+    `LOG_FORMAT=json` writes one JSON object per record. Variable values are
+    only dumped into tracebacks (`diagnose`) outside production.
+    """
+    development = settings.environment != "production"
+    sink_options = dict(
+        level=settings.log_level,
+        serialize=settings.log_format == "json",
+        backtrace=development,
+        diagnose=development
+    )
+
+    def rate_limited():
+        # Each sink counts its own records, so every sink gets its own filter
+        rate_limit = RateLimitFilter(settings.log_rate_limit, settings.log_rate_window_seconds)
+        return dict(filter=rate_limit, format=_text_format(rate_limit))
+
+    logger.remove()  # Remove default handler
+    logger.add(BackgroundSink(sys.stdout), **rate_limited(), **sink_options)
+    if settings.log_file:
+        # loguru's own queue keeps file rotation; the file sink is opt-in
+        logger.add(settings.log_file, rotation="50 MB", retention=10, enqueue=True,
+                   **rate_limited(), **sink_options)
+
+    # Library warnings go through the same sinks instead of their own handlers
+    logging.basicConfig(handlers=[InterceptHandler()], level=logging.WARNING)
+
 # Configure logger
-logger.remove()  # Remove default handler
-logger.add(
-    sys.stdout,
-    level=settings.log_level,
-    format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>",
-    backtrace=True,
-    diagnose=True
-)
+configure_logging()
 
 def get_logger(name: str):
     """Get a configured logger instance for a module.
-    
+
     Args:
         name (str): Name of the module (usually __name__)
-        
+
     Returns:
         Logger: Configured logger instance
     """
-    return logger.bind(module=name)
\ No newline at end of file
+    return logger.bind(module=name)
@@ -0,0 +1,142 @@
+import json
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+sys.path.append(str(Path(__file__).parent.parent.parent))  # Add project root to path
+from src.common.logger import get_logger
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+logger = get_logger(__name__)
+
+
+def peak_memory_mb() -> Optional[float]:
+    """Get the peak resident memory of the current process.
+
+    Returns:
+        float: Peak RSS in MiB, or None where the platform doesn't report it
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+class StageMetrics:
+    """Duration, volume, throughput and memory of one pipeline stage run.
+
+    Stages call `add()` as they process items and wrap their work in `track()`.
+    Peak memory is the process high-water mark, which is per stage when each
+    stage runs in its own process (as with Dagster's multiprocess executor).
+    """
+
+    def __init__(self, stage: str):
+        """Initialize the metrics.
+
+        Args:
+            stage (str): Stage name, e.g. 'load_raw_to_postgres'
+        """
+        self.stage = stage
+        self.items = 0
+        self.bytes = 0
+        self.counts = {}
+        self.started_at = None
+        self.duration_seconds = None
+        self.peak_memory_mb = None
+
+    def add(self, items: int = 0, bytes: int = 0, **counts):
+        """Record processed volume.
+
+        Args:
+            items (int): Number of items processed (messages, images, ...)
+            bytes (int): Number of bytes read or written
+            **counts: Additional named counts, e.g. detections=12
+        """
+        self.items += items
+        self.bytes += bytes
+        for name, value in counts.items():
+            self.counts[name] = self.counts.get(name, 0) + value
+
+    @contextmanager
+    def track(self):
+        """Time the enclosed block and record the peak memory when it ends."""
+        self.started_at = datetime.utcnow()
+        started = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.duration_seconds = round(time.perf_counter() - started, 3)
+            self.peak_memory_mb = peak_memory_mb()
+            logger.info(
+                f"Stage {self.stage}: {self.items} items, {self.bytes} bytes in {self.duration_seconds}s "
+                f"({self.items_per_second} items/s), peak memory {self.peak_memory_mb} MiB"
+            )
+
+    @property
+    def items_per_second(self) -> Optional[float]:
+        if not self.duration_seconds:
+            return None
+        return round(self.items / self.duration_seconds, 2)
+
+    @property
+    def bytes_per_second(self) -> Optional[float]:
+        if not self.duration_seconds:
+            return None
+        return round(self.bytes / self.duration_seconds, 2)
+
+    def to_dict(self) -> dict:
+        """Get the metrics as a JSON-serializable dict.
+
+        Returns:
+            dict: Stage name, timing, volume, throughput and memory
+        """
+        return {
+            'stage': self.stage,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'duration_seconds': self.duration_seconds,
+            'items': self.items,
+            'bytes': self.bytes,
+            'items_per_second': self.items_per_second,
+            'bytes_per_second': self.bytes_per_second,
+            'peak_memory_mb': self.peak_memory_mb,
+            **self.counts
+        }
+
+
+def write_run_report(run_id: str, stages: List[dict], report_dir: Path) -> Path:
+    """Write the stage metrics of a pipeline run to `<report_dir>/<run_id>.json`.
+
+    Args:
+        run_id (str): Pipeline run identifier
+        stages (List[dict]): Metrics of each stage, as returned by `StageMetrics.to_dict`
+        report_dir (Path): Directory for run reports
+
+    Returns:
+        Path: Path of the report file
+    """
+    try:
+        stages = [stage for stage in stages if stage]
+        report = {
+            'run_id': run_id,
+            'generated_at': datetime.utcnow().isoformat(),
+            'total_duration_seconds': round(sum(stage.get('duration_seconds') or 0 for stage in stages), 3),
+            'stages': stages
+        }
+        report_dir = Path(report_dir)
+        report_dir.mkdir(parents=True, exist_ok=True)
+        report_path = report_dir / f"{run_id}.json"
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        logger.info(f"Wrote run report to {report_path}")
+        return report_path
+
+    except OSError as e:
+        logger.error(f"Error writing run report for {run_id}: {e}")
+        raise
@@ -1,17 +1,86 @@
+from datetime import datetime
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import text
 from src.api.main import app
+from src.common.database import get_engine
 
-client = TestClient(app)
+@pytest.fixture(scope="module")
+def client():
+    # Keep one event loop for the whole module so pooled async connections stay usable
+    with TestClient(app) as test_client:
+        yield test_client
 
-def test_get_messages():
+def test_get_messages(client):
     response = client.get("/messages/")
     assert response.status_code == 200
 
-def test_get_channels():
+def test_get_channels(client):
     response = client.get("/channels/")
     assert response.status_code == 200
 
-def test_get_image_detections():
+def test_get_image_detections(client):
     response = client.get("/image-detections/")
-    assert response.status_code == 200 
\ No newline at end of file
+    assert response.status_code == 200
+
+def test_top_products_conditional_request(client):
+    response = client.get("/api/reports/top-products", params={"limit": 5})
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    cached = client.get("/api/reports/top-products", params={"limit": 5}, headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
+
+def test_export_messages_csv(client):
+    response = client.get("/export/messages", params={"format": "csv"})
+    assert response.status_code == 200
+    assert response.text.splitlines()[0].startswith("message_id,channel_name,message_date")
+
+def test_detection_summary(client):
+    response = client.get("/api/detections/summary", params={"min_confidence": 0.7})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total_detections"] == sum(item["detection_count"] for item in body["by_channel"])
+
+def test_metrics(client):
+    client.get("/channels/")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert 'http_request_duration_seconds_count{method="GET",route="/channels/",status="200"}' in response.text
+    assert 'db_pool_connections{state="size"}' in response.text
+
+@pytest.fixture
+def undated_rows():
+    # One dated and two undated rows in a channel of their own, removed afterwards
+    engine = get_engine()
+    channel = "pagination_test_channel"
+    with engine.begin() as conn:
+        for key, posted_at in [("k3", datetime(2024, 1, 1)), ("k2", None), ("k1", None)]:
+            conn.execute(text(
+                "INSERT INTO marts.fct_messages (message_key, message_id, channel_name, message_date, message_text) "
+                "VALUES (:key, 1, :channel, :posted_at, 'text')"
+            ), {"key": key, "channel": channel, "posted_at": posted_at})
+            conn.execute(text(
+                "INSERT INTO marts.fct_image_detections (detection_key, message_id, channel_name, object_class, detected_at) "
+                "VALUES (:key, 1, :channel, 'bottle', :posted_at)"
+            ), {"key": key, "channel": channel, "posted_at": posted_at})
+    yield channel
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM marts.fct_messages WHERE channel_name = :channel"), {"channel": channel})
+        conn.execute(text("DELETE FROM marts.fct_image_detections WHERE channel_name = :channel"), {"channel": channel})
+
+@pytest.mark.parametrize("path,date_field", [("/messages/", "date"), ("/image-detections/", "detected_at")])
+def test_pagination_across_undated_rows(client, undated_rows, path, date_field):
+    dates, cursor = [], None
+    for _ in range(4):
+        params = {"limit": 1, "channel": undated_rows}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get(path, params=params)
+        assert response.status_code == 200
+        dates += [item[date_field] for item in response.json()["items"]]
+        cursor = response.json()["next_cursor"]
+        if cursor is None:
+            break
+    # Dated rows first, then every undated row exactly once
+    assert dates == ["2024-01-01T00:00:00", None, None]
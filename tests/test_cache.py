@@ -0,0 +1,28 @@
+import asyncio
+from src.common.cache import TTLCache
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_ttl_cache_expires_entries():
+    clock = FakeClock()
+    cache = TTLCache(max_entries=10, ttl_seconds=60, clock=clock)
+    asyncio.run(cache.set("a", {"count": 1}))
+    assert asyncio.run(cache.get("a")) == {"count": 1}
+    clock.now = 61
+    assert asyncio.run(cache.get("a")) is None
+    assert len(cache) == 0
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(max_entries=2, ttl_seconds=60)
+    asyncio.run(cache.set("a", 1))
+    asyncio.run(cache.set("b", 2))
+    asyncio.run(cache.get("a"))
+    asyncio.run(cache.set("c", 3))
+    assert asyncio.run(cache.get("b")) is None
+    assert asyncio.run(cache.get("a")) == 1
+    assert asyncio.run(cache.get("c")) == 3
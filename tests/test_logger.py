@@ -0,0 +1,54 @@
+from loguru import logger
+from src.common.logger import RateLimitFilter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_rate_limit_filter_per_call_site():
+    clock = FakeClock()
+    records = []
+    handler_id = logger.add(records.append, filter=RateLimitFilter(burst=3, window_seconds=60, clock=clock),
+                            format="{message}")
+    try:
+        for i in range(10):
+            logger.warning(f"bad message {i}")
+        logger.error("errors always pass")
+        for i in range(2):
+            logger.info(f"other call site {i}")
+
+        clock.now = 61
+        logger.warning("after the window")
+        logger.complete()
+    finally:
+        logger.remove(handler_id)
+
+    messages = [record.record["message"] for record in records]
+    assert messages == ["bad message 0", "bad message 1", "bad message 2", "errors always pass",
+                        "other call site 0", "other call site 1", "after the window"]
+
+
+def test_rate_limit_filter_reports_suppressed_count():
+    clock = FakeClock()
+    rate_limit = RateLimitFilter(burst=1, window_seconds=10, clock=clock)
+    records, other_sink = [], []
+    handler_id = logger.add(records.append, filter=rate_limit,
+                            format=lambda record: f"{{message}} ({rate_limit.suppressed_count()})\n")
+    other_id = logger.add(other_sink.append, format="{message}")
+    try:
+        for _ in range(2):
+            for i in range(5):
+                logger.warning(f"item {i}")
+            clock.now += 10
+    finally:
+        logger.remove(handler_id)
+        logger.remove(other_id)
+
+    assert records == ["item 0 (0)\n", "item 0 (4)\n"]
+    # The count stays with the limited sink; other sinks see the record unchanged
+    assert all("suppressed" not in message.record["extra"] for message in other_sink)
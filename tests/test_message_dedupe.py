@@ -0,0 +1,36 @@
+from pipelines.data_processing.message_dedupe import LSHIndex, MinHasher, band_keys, similarity
+
+hasher = MinHasher()
+
+AD = ("ፓራሲታሞል 500mg አለ። Panadol Extra and Amoxil 250mg capsules in stock, original products, "
+      "delivery all over Addis Ababa, Bole branch open 24 hours. Price 350 birr, call 0911 123456")
+
+def test_formatting_differences_give_identical_signatures():
+    copy = AD.upper().replace("።", " ! ").replace(",", " ,")
+    assert (hasher.signature(AD) == hasher.signature(copy)).all()
+
+def test_changed_price_stays_similar():
+    assert similarity(hasher.signature(AD), hasher.signature(AD.replace("350", "420"))) >= 0.8
+
+def test_unrelated_messages_are_dissimilar():
+    other = "Vitamin C 1000mg effervescent tablets and face masks, new arrival at our Piassa pharmacy"
+    assert similarity(hasher.signature(AD), hasher.signature(other)) < 0.3
+
+def test_messages_without_text_have_no_signature():
+    assert hasher.signature("") is None
+    assert hasher.signature(None) is None
+    assert hasher.signature(" ።፣ ") is None
+
+def test_index_matches_copies_only():
+    index = LSHIndex()
+    index.add(1, hasher.signature(AD))
+    index.add(2, hasher.signature("Insulin pens and glucose test strips available, free delivery"))
+
+    assert index.match(hasher.signature(AD.replace("350", "420")), 0.8) == 1
+    assert index.match(hasher.signature("INSULIN pens & glucose test-strips available... free delivery!"), 0.8) == 2
+    assert index.match(hasher.signature("Sunscreen SPF 50 and moisturizers for dry skin"), 0.8) is None
+
+def test_band_keys_are_shared_by_identical_signatures():
+    signature = hasher.signature(AD)
+    assert band_keys(signature) == band_keys(hasher.signature(AD.lower()))
+    assert len(set(band_keys(signature))) == 16
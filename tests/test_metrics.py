@@ -0,0 +1,18 @@
+from src.common.metrics import MetricsRegistry
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    latency = registry.histogram("request_seconds", "Request latency.", ["route"], buckets=(0.1, 1.0))
+    latency.observe(0.05, route="/a")
+    latency.observe(0.5, route="/a")
+    latency.observe(5, route="/a")
+    text = registry.render()
+    assert 'request_seconds_bucket{route="/a",le="0.1"} 1' in text
+    assert 'request_seconds_bucket{route="/a",le="1"} 2' in text
+    assert 'request_seconds_bucket{route="/a",le="+Inf"} 3' in text
+    assert 'request_seconds_count{route="/a"} 3' in text
+
+def test_counter_escapes_label_values():
+    registry = MetricsRegistry()
+    registry.counter("errors_total", "Errors.", ["detail"]).inc(detail='bad "quote"')
+    assert 'errors_total{detail="bad \\"quote\\""} 1' in registry.render()
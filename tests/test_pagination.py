@@ -0,0 +1,24 @@
+from datetime import datetime
+import pytest
+from src.api.pagination import InvalidCursorError, decode_cursor, encode_cursor
+
+def test_cursor_round_trip():
+    last_date = datetime(2024, 1, 1, 12, 30, 15, 123456)
+    cursor = encode_cursor(last_date, "abc123")
+    assert "=" not in cursor
+    assert decode_cursor(cursor, (datetime, str)) == [last_date, "abc123"]
+
+def test_cursor_round_trip_unicode():
+    cursor = encode_cursor("ቲክቫህ")
+    assert decode_cursor(cursor, (str,)) == ["ቲክቫህ"]
+
+@pytest.mark.parametrize("cursor,types", [
+    ("not-a-cursor!", (str,)),
+    (encode_cursor("only-one"), (datetime, str)),
+    (encode_cursor("yesterday", "abc"), (datetime, str)),
+    (encode_cursor(1, "abc"), (datetime, str)),
+    (encode_cursor(True), (int,)),
+])
+def test_invalid_cursor(cursor, types):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor, types)
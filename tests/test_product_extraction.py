@@ -0,0 +1,32 @@
+import pytest
+from pipelines.data_processing.product_extraction import ProductMatcher, normalize_text
+
+LEXICON = {
+    "panadol": "paracetamol",
+    "ፓራሲታሞል": "paracetamol",
+    "amoxil": "amoxicillin",
+    "vitamin c": "vitamin c",
+    "ቫይታሚን ሲ": "vitamin c",
+    "mask": "face mask",
+}
+
+matcher = ProductMatcher(LEXICON)
+
+def test_normalize_text_strips_ethiopic_punctuation():
+    assert normalize_text("ፓራሲታሞል፣ Vitamin  C።") == "ፓራሲታሞል vitamin c"
+
+@pytest.mark.parametrize("message,expected", [
+    ("PANADOL 500mg in stock", {"paracetamol": "panadol"}),
+    ("የፓራሲታሞል ዋጋ", {"paracetamol": "ፓራሲታሞል"}),
+    ("Vitamin-C and amoxil", {"vitamin c": "vitamin c", "amoxicillin": "amoxil"}),
+    ("ቫይታሚን ሲ አለ።", {"vitamin c": "ቫይታሚን ሲ"}),
+    ("transmask damask", {}),
+    ("", {}),
+    (None, {}),
+])
+def test_find_products(message, expected):
+    assert matcher.find(message) == expected
+
+def test_from_csv_loads_seed_lexicon():
+    seeded = ProductMatcher.from_csv()
+    assert seeded.find("Amoxil and ኢንሱሊን") == {"amoxicillin": "amoxil", "insulin": "ኢንሱሊን"}
@@ -0,0 +1,12 @@
+from src.api.search import MAX_QUERY_TERMS, build_prefix_tsquery
+
+def test_prefix_query_from_mixed_script_text():
+    assert build_prefix_tsquery("Paracet 500mg") == "paracet:* & 500mg:*"
+    assert build_prefix_tsquery("ፓራሲታሞል። አለ") == "ፓራሲታሞል:* & አለ:*"
+
+def test_prefix_query_strips_tsquery_operators():
+    assert build_prefix_tsquery("amox & (!panadol) | 'x':*") == "amox:* & panadol:* & x:*"
+    assert build_prefix_tsquery("  !!  ") == ""
+
+def test_prefix_query_caps_terms():
+    assert build_prefix_tsquery(" ".join(f"t{i}" for i in range(20))).count(":*") == MAX_QUERY_TERMS
@@ -0,0 +1,18 @@
+import json
+from src.common.stage_metrics import StageMetrics, write_run_report
+
+def test_stage_metrics_track(tmp_path):
+    metrics = StageMetrics("load_raw_to_postgres")
+    with metrics.track():
+        metrics.add(items=10, bytes=2048, messages=10)
+        metrics.add(items=2, images=2)
+    result = metrics.to_dict()
+    assert result["items"] == 12
+    assert result["bytes"] == 2048
+    assert result["messages"] == 10 and result["images"] == 2
+    assert result["duration_seconds"] is not None
+
+    report_path = write_run_report("run-1", [result, None], tmp_path)
+    report = json.loads(report_path.read_text())
+    assert report["run_id"] == "run-1"
+    assert [stage["stage"] for stage in report["stages"]] == ["load_raw_to_postgres"]
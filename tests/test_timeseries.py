@@ -0,0 +1,18 @@
+from datetime import date, datetime
+from src.api.timeseries import BucketSize, bucket_starts, truncate
+
+def test_truncate_matches_date_trunc():
+    value = datetime(2024, 3, 14, 15, 9, 26)
+    assert truncate(value, BucketSize.hour) == datetime(2024, 3, 14, 15)
+    assert truncate(value, BucketSize.day) == datetime(2024, 3, 14)
+    assert truncate(value, BucketSize.week) == datetime(2024, 3, 11)
+    assert truncate(value, BucketSize.month) == datetime(2024, 3, 1)
+
+def test_bucket_starts_cover_inclusive_range():
+    assert len(bucket_starts(date(2024, 1, 1), date(2024, 1, 2), BucketSize.hour)) == 48
+    assert bucket_starts(date(2023, 11, 15), date(2024, 1, 1), BucketSize.month) == [
+        datetime(2023, 11, 1), datetime(2023, 12, 1), datetime(2024, 1, 1)
+    ]
+    assert bucket_starts(date(2024, 1, 3), date(2024, 1, 8), BucketSize.week) == [
+        datetime(2024, 1, 1), datetime(2024, 1, 8)
+    ]